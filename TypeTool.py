@@ -5,153 +5,2582 @@ if hasattr(sys, 'frozen'):
     import ctypes
     ctypes.windll.user32.ShowWindow(ctypes.windll.kernel32.GetConsoleWindow(), 0)
 
-import pyperclip
-import keyboard
 import time
-import pystray
-from PIL import Image, ImageDraw, ImageFont
+
+# Zeitmessung der Startphasen (mit --profile-startup)
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = '--profile-startup' in sys.argv
+        self.start = self.last = time.perf_counter()
+        self.phases = []
+        self.reported = False
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        lines = [f"  {phase:<20} {duration * 1000:8.1f} ms" for phase, duration in self.phases]
+        lines.append(f"  {'gesamt':<20} {(self.last - self.start) * 1000:8.1f} ms")
+        print("Startzeit nach Phasen:\n" + "\n".join(lines), flush=True)
+
+startup_profiler = StartupProfiler()
+
+import keyboard
 import threading
-import tkinter as tk
+import queue
 import json
-import subprocess
 import logging
+import logging.handlers
 import signal
 import atexit
+import hashlib
+import socket
+import select
+import secrets
+import argparse
+import re
+import importlib
+import bisect
+import random
+import hmac
+from array import array
+from collections import OrderedDict, deque
+
+# Platzhalter für ein Modul, das erst beim ersten Attributzugriff importiert wird
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# Schwere Module erst laden, wenn Popup, Icon, Dialog oder Zwischenablage gebraucht werden
+pyperclip = LazyModule('pyperclip')
+pystray = LazyModule('pystray')
+tk = LazyModule('tkinter')
+subprocess = LazyModule('subprocess')
+http_server = LazyModule('http.server')
+
+startup_profiler.mark("imports")
+
+logger = logging.getLogger(__name__)
+
+# Pfad zur Konfigurationsdatei
+config_file = 'config.json'
+
+# Standardkonfiguration
+default_config = {
+    'enter_key_enabled': False,  # Standardmäßig deaktiviert
+    'hotkey': 'ctrl+b',
+    'toggle_enter_hotkey': 'ctrl+alt+b',
+    'pause_hotkey': None,  # Pausieren/Fortsetzen des laufenden Tippvorgangs, z.B. 'ctrl+alt+p' (None = aus)
+    'resume_timeout': 300,  # Sekunden, in denen ein abgebrochener Tippvorgang fortgesetzt werden kann
+    'typing_delay': 0.001,  # Schnellere Tippgeschwindigkeit
+    'typing_batch_size': 8,  # Zeichen pro Tastenblock (nur ohne typing_delay oder mit batch_delay)
+    'batch_delay': None,  # Pause zwischen Blöcken (None = typing_delay pro Zeichen)
+    'output_backend': 'keyboard',  # keyboard, xdotool oder recording
+    'streaming_threshold': 64 * 1024,  # Ab dieser Länge wird blockweise gestreamt
+    'stream_chunk_size': 4096,  # Zeichen pro gestreamtem Block
+    'stream_queue_size': 4,  # Maximal vorbereitete Blöcke (begrenzt den Speicher)
+    'typing_policy': 'cancel',  # Hotkey während eines Tippvorgangs: cancel, queue oder replace
+    'typing_queue_size': 10,  # Maximal wartende Tippaufträge
+    'typing_coalesce': True,  # Doppelte Aufträge mit gleichem Inhalt zusammenfassen
+    'calibration_probe_length': 200,  # Länge des Prüftextes für die Kalibrierung
+    'calibration_min_delay': 0.001,  # Suchbereich der Kalibrierung in Sekunden pro Zeichen
+    'calibration_max_delay': 0.05,
+    'calibration_steps': 6,  # Schritte der Binärsuche
+    'calibration_trials': 2,  # Fehlerfreie Durchläufe pro geprüfter Verzögerung
+    'calibration_margin': 0.25,  # Sicherheitsaufschlag auf die gefundene Verzögerung
+    # Profile je Zielanwendung, z.B. {"name": "TeamViewer", "match": {"process": "teamviewer"},
+    # "typing_delay": 0.02}; match vergleicht class/title/process per regulärem Ausdruck
+    'profiles': [],
+    'active_window_ttl': 2.0,  # Windows: Sekunden bis zum erneuten Lesen desselben Fensters (Titelwechsel)
+    'metrics_http_port': 0,  # Prometheus-Metriken unter http://127.0.0.1:<port>/metrics (0 = aus)
+    'metrics_textfile': None,  # Pfad für eine regelmäßig geschriebene Prometheus-Textdatei
+    'metrics_interval': 15,  # Sekunden zwischen zwei Schreibvorgängen der Textdatei
+    'trace_enabled': False,  # Pro Auftrag eine JSONL-Zeile mit Zeitstempeln der Phasen
+    'trace_file': 'typetool_trace.jsonl',
+    'trace_max_bytes': 5 * 1024 * 1024,
+    'trace_sample_rate': 1.0,  # Anteil der Aufträge, die aufgezeichnet werden
+    'trace_batch_interval': 100,  # Jeder n-te Block wird als Phase festgehalten
+    'plan_cache_enabled': True,  # Kompilierte Tastenpläne wiederverwenden
+    'plan_cache_max_entries': 64,
+    'plan_cache_max_bytes': 4 * 1024 * 1024,
+    'logging_enabled': True,
+    'log_file': 'typetool.log',
+    'log_max_bytes': 1024 * 1024,  # Größe pro Logdatei
+    'log_backup_count': 3,  # Gesamter Platz: log_max_bytes * (log_backup_count + 1)
+    'log_rotate_hours': 0,  # Zusätzlich zeitbasiert rotieren (0 = nur nach Größe)
+    'animations_enabled': True,  # Fade-in der Overlays (während des Tippens immer aus)
+    'config_hot_reload': True,  # Extern geänderte config.json live übernehmen
+    'soft_restart': True,  # Neustart im laufenden Prozess statt über starter.py
+    'icon_theme': 'light',  # light oder dark
+    'icon_size': None,  # None = automatisch (HiDPI-abhängig)
+    'clipboard_backend': 'auto',  # auto, tk oder pyperclip
+    'clipboard_monitor_enabled': False,  # Zwischenablage im Hintergrund vorab lesen
+    'clipboard_poll_interval': 0.25,  # Sekunden zwischen zwei Prüfungen der Änderungsnummer
+    'clipboard_history_size': 10,
+    'clipboard_history_max_bytes': 1024 * 1024,
+    'history_hotkeys': []  # z.B. ["ctrl+alt+1", "ctrl+alt+2"] für ältere Einträge
+}
+
+# Funktion zum Lesen der Konfigurationsdatei (Fehler werden an den Aufrufer weitergegeben)
+def read_config_file(path):
+    merged_config = default_config.copy()
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            loaded_config = json.load(file)
+        # Merge mit default_config um neue Einstellungen hinzuzufügen
+        merged_config.update(loaded_config)
+    return merged_config
+
+# Funktion zum Laden der Konfiguration
+def load_config():
+    try:
+        return read_config_file(config_file)
+    except (OSError, ValueError) as e:
+        logger.error("Konfiguration konnte nicht gelesen werden, verwende Standardwerte: %s", e)
+        return default_config.copy()
+
+# Konfigurationsspeicher: hält den Zustand im Speicher, fasst schnell aufeinanderfolgende
+# Änderungen zusammen und schreibt atomar (temporäre Datei + Umbenennen) im Hintergrund
+class ConfigStore:
+    DEBOUNCE = 0.5  # Sekunden ohne weitere Änderung bis zum Schreiben
+
+    def __init__(self, path):
+        self.path = path
+        self.data = load_config()
+        self.disk_data = dict(self.data)  # Zuletzt gelesener bzw. geschriebener Stand der Datei
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # Hält Schreibvorgänge in Reihenfolge, ohne save() zu blockieren
+        self.timer = None
+        self.dirty = False
+
+    # Merkt eine Änderung vor; geschrieben wird erst nach dem Debounce-Fenster
+    def save(self):
+        with self.lock:
+            self.dirty = True
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.DEBOUNCE, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    # Schreibt ausstehende Änderungen sofort (z.B. beim Beenden). Unter self.lock wird nur
+    # der Stand kopiert; Schreiben und fsync laufen außerhalb, damit save() nie auf die Platte wartet
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                if self.timer:
+                    self.timer.cancel()
+                    self.timer = None
+                if not self.dirty:
+                    return
+                self.dirty = False
+                snapshot = dict(self.data)
+            content = json.dumps(snapshot, indent=2, ensure_ascii=False)
+            temp_path = f"{self.path}.tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as file:
+                    file.write(content)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.error("Fehler beim Speichern der Konfiguration: %s", e)
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                return
+            with self.lock:
+                self.disk_data = snapshot
+
+    # Verwirft den Speicherstand und lädt die Datei komplett neu (für den Soft-Neustart)
+    def load(self):
+        with self.lock:
+            self.data.clear()
+            self.data.update(load_config())
+            self.disk_data = dict(self.data)
+            self.dirty = False
+
+    # Liest die Datei neu ein und übernimmt nur Schlüssel, die sich dort geändert haben.
+    # Eigene Schreibvorgänge ergeben so keinen Unterschied, noch nicht gespeicherte
+    # Änderungen im Speicher bleiben erhalten.
+    def reload(self):
+        # Nicht mitten in einen eigenen Schreibvorgang hinein lesen (disk_data wäre noch alt)
+        with self.write_lock:
+            new_disk_data = read_config_file(self.path)
+            with self.lock:
+                changes = {key: value for key, value in new_disk_data.items()
+                           if self.disk_data.get(key) != value}
+                self.disk_data = new_disk_data
+                self.data.update(changes)
+        return changes
+
+# Überwacht config.json auf externe Änderungen (inotify unter Linux, sonst mtime-Abfrage)
+class ConfigWatcher:
+    POLL_INTERVAL = 1.0
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+
+    def __init__(self, path, on_change):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="TypeTool-ConfigWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2 * self.POLL_INTERVAL)
+        self.thread = None
+
+    def run(self):
+        if sys.platform.startswith('linux'):
+            try:
+                self.watch_inotify()
+                return
+            except (OSError, AttributeError) as e:
+                logger.warning("inotify nicht verfügbar, überwache config.json per Abfrage: %s", e)
+        self.watch_polling()
+
+    def notify(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            logger.error("Fehler beim Übernehmen der Konfiguration: %s", e)
+
+    def watch_inotify(self):
+        import ctypes
+        import select
+        import struct
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init()
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init fehlgeschlagen")
+        try:
+            # Das Verzeichnis beobachten, damit auch atomares Ersetzen (Umbenennen) erkannt wird
+            directory = os.path.dirname(self.path).encode()
+            if libc.inotify_add_watch(fd, directory, self.IN_CLOSE_WRITE | self.IN_MOVED_TO) < 0:
+                raise OSError(ctypes.get_errno(), "inotify_add_watch fehlgeschlagen")
+            name = os.path.basename(self.path).encode()
+            while not self.stop_event.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if not ready:
+                    continue
+                data = os.read(fd, 4096)
+                offset = 0
+                changed = False
+                while offset < len(data):
+                    _, _, _, length = struct.unpack_from('iIII', data, offset)
+                    event_name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+                    offset += 16 + length
+                    changed = changed or event_name == name
+                if changed:
+                    self.notify()
+        finally:
+            os.close(fd)
+
+    def watch_polling(self):
+        last_mtime = self.mtime()
+        while not self.stop_event.wait(self.POLL_INTERVAL):
+            mtime = self.mtime()
+            if mtime != last_mtime:
+                last_mtime = mtime
+                self.notify()
+
+    def mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+# Übergibt Log-Einträge unformatiert an die Warteschlange; formatiert und geschrieben
+# wird erst im Listener-Thread, damit der Tipp-Pfad nie auf die Festplatte wartet
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+# Rotiert nach Größe und optional nach Zeit; die Anzahl der Backups begrenzt den Platzbedarf
+class CappedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    def __init__(self, filename, max_bytes, backup_count, rotate_interval=0):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=max(1, backup_count),
+                         encoding='utf-8', delay=True)
+        self.rotate_interval = rotate_interval
+        self.next_rollover = time.time() + rotate_interval if rotate_interval else None
+
+    def shouldRollover(self, record):
+        if self.next_rollover is not None and time.time() >= self.next_rollover:
+            self.next_rollover = time.time() + self.rotate_interval
+            return True
+        return super().shouldRollover(record)
+
+log_listener = None
+
+# Funktion zum Einrichten des Loggings über Warteschlange und Hintergrund-Listener
+# (erneuter Aufruf ersetzt den bisherigen Listener samt Log-Datei)
+def setup_logging(config):
+    global log_listener
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler = CappedRotatingFileHandler(config.get('log_file', 'typetool.log'),
+                                             config.get('log_max_bytes', 1024 * 1024),
+                                             config.get('log_backup_count', 3),
+                                             config.get('log_rotate_hours', 0) * 3600)
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    root_logger = logging.getLogger()
+    root_logger.handlers.clear()
+    stop_logging()
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO if config.get('logging_enabled', True) else logging.ERROR)
+    log_listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    log_listener.start()
+
+# Funktion zum Leeren der Log-Warteschlange (beim Beenden)
+def stop_logging():
+    global log_listener
+    if log_listener:
+        log_listener.stop()
+        for handler in log_listener.handlers:
+            handler.close()
+        log_listener = None
+
+# Trace pro Tippauftrag: Phasen werden im Tippthread nur als Zeitstempel gesammelt,
+# Hash und JSON entstehen erst im Listener-Thread. Der Text selbst wird nie geschrieben
+trace_logger = logging.getLogger('TypeTool.trace')
+trace_logger.propagate = False
+trace_logger.setLevel(logging.INFO)
+trace_listener = None
+
+class JobTrace:
+    __slots__ = ('trace_id', 'started', 'origin', 'events')
+
+    def __init__(self, origin=None):
+        self.trace_id = secrets.token_hex(6)
+        self.started = time.time()
+        self.origin = time.perf_counter() if origin is None else origin
+        self.events = []
+
+    # Zeitstempel relativ zum Auftragsbeginn (monotone Uhr) in Millisekunden
+    def mark(self, phase, **fields):
+        event = {'phase': phase, 't_ms': round((time.perf_counter() - self.origin) * 1000, 3)}
+        event.update(fields)
+        self.events.append(event)
+
+# Formatiert einen Trace als JSON-Zeile; der Inhaltshash wird hier (im Listener) berechnet
+class TraceFormatter(logging.Formatter):
+    def __init__(self, hash_key):
+        super().__init__()
+        self.hash_key = hash_key
+
+    def format(self, record):
+        payload = dict(record.msg)
+        digest = hmac.new(self.hash_key, digestmod=hashlib.sha256)
+        text = getattr(record, 'trace_text', None)
+        path = getattr(record, 'trace_path', None)
+        try:
+            if text is not None:
+                digest.update(text.encode('utf-8', 'surrogatepass'))
+            elif path is not None:
+                for chunk in iter_file_chunks(path, 64 * 1024):
+                    digest.update(chunk.encode('utf-8', 'replace'))
+            payload['content_hash'] = digest.hexdigest()
+        except (OSError, ValueError):
+            payload['content_hash'] = None
+        return json.dumps(payload, ensure_ascii=False)
+
+# Funktion zum Einrichten des Trace-Schreibers (eigene Warteschlange, eigener Listener)
+def setup_tracing(config):
+    global trace_listener
+    stop_tracing()
+    if not config.get('trace_enabled', False):
+        return
+    # Hashes mit geheimem Schlüssel, damit kurze Inhalte (z.B. Passwörter) nicht
+    # aus dem Trace zurückgerechnet werden können
+    if not config.get('trace_hash_key'):
+        config['trace_hash_key'] = secrets.token_hex(16)
+        config_store.save()
+    handler = CappedRotatingFileHandler(config.get('trace_file', 'typetool_trace.jsonl'),
+                                        config.get('trace_max_bytes', 5 * 1024 * 1024),
+                                        config.get('log_backup_count', 3))
+    handler.setFormatter(TraceFormatter(bytes.fromhex(config['trace_hash_key'])))
+    trace_queue = queue.Queue(-1)
+    trace_logger.addHandler(DeferredQueueHandler(trace_queue))
+    trace_listener = logging.handlers.QueueListener(trace_queue, handler)
+    trace_listener.start()
+
+def stop_tracing():
+    global trace_listener
+    for handler in list(trace_logger.handlers):
+        trace_logger.removeHandler(handler)
+    if trace_listener:
+        trace_listener.stop()
+        for handler in trace_listener.handlers:
+            handler.close()
+        trace_listener = None
+
+# Funktion zum Starten eines Traces (None, wenn Tracing aus ist oder nicht gesampelt wird)
+def start_trace(origin=None):
+    if trace_listener is None:
+        return None
+    if random.random() >= float(config.get('trace_sample_rate', 1.0)):
+        return None
+    return JobTrace(origin)
+
+# Funktion zum Abschließen und Übergeben eines Traces an den Schreiber
+def finish_trace(job, **fields):
+    trace = job.trace
+    if trace is None:
+        return
+    job.trace = None
+    trace.mark(job.state, offset=job.offset)
+    payload = {
+        'trace_id': trace.trace_id,
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(trace.started)),
+        'source': 'file' if job.path is not None else 'text',
+        'length': job.length,
+        'state': job.state,
+        'phases': trace.events,
+    }
+    payload.update(fields)
+    trace_logger.info(payload, extra={'trace_text': job.text, 'trace_path': job.path})
+
+# Konfiguration laden
+config_store = ConfigStore(config_file)
+config = config_store.data
+setup_logging(config)
+setup_tracing(config)
+startup_profiler.mark("config")
+
+# Funktion zum Übernehmen der Konfiguration in die globalen Einstellungen
+def apply_config_globals():
+    global press_enter, hotkey, toggle_enter_hotkey, typing_delay
+    press_enter = config.get('enter_key_enabled', False)
+    hotkey = config.get('hotkey', 'ctrl+b')
+    toggle_enter_hotkey = config.get('toggle_enter_hotkey', 'ctrl+alt+b')
+    typing_delay = config.get('typing_delay', 0.01)
+
+apply_config_globals()
+tray_icon = None  # Globale Variable für das Tray-Icon
+running = True
+soft_restart_requested = threading.Event()
+restart_started = None  # Startzeitpunkt eines laufenden Soft-Neustarts
+
+# Tray-Icon: gerenderte Varianten werden auf der Festplatte zwischengespeichert
+# (Schlüssel: Größe, Text, Theme, Zustand, Quelle) und beim Start für alle Zustände geladen
+icon_cache_dir = 'icon_cache'
+ICON_TEXT = "Type\nTool"
+ICON_THEMES = {
+    'light': {'background': (255, 255, 255, 255), 'foreground': 'black'},
+    'dark': {'background': (32, 32, 32, 255), 'foreground': 'white'},
+}
+# Farbe der Zustandsmarkierung unten rechts (None = keine Markierung)
+ICON_STATES = {'idle': None, 'typing': (46, 125, 50, 255), 'paused': (249, 168, 37, 255)}
+ICON_FONTS = ("arial", "DejaVuSans.ttf", "LiberationSans-Regular.ttf", "FreeSans.ttf")
+ICON_SIZES = (16, 32, 48)  # Weitere Auflösungen für die Fenstersymbole (Titelleiste, Taskleiste, Alt+Tab)
+tray_icon_images = {}  # Zustand -> vorgerendertes Bild
+tray_icon_state = None
+# Umschalten übernimmt ein eigener Thread: pystray serialisiert das Icon unter Windows bei jeder
+# Zuweisung neu und baut das Menü neu auf, darauf soll der Tipp-Thread nicht warten
+tray_state_requested = None
+tray_state_event = threading.Event()
+tray_state_thread = None
+tray_state_lock = threading.Lock()
+
+# Pfad zum mitgelieferten Icon (neben dem Skript bzw. im PyInstaller-Bundle)
+def bundled_icon_path():
+    base = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(sys.argv[0])))
+    path = os.path.join(base, 'typetoolicon.ico')
+    return path if os.path.exists(path) else None
+
+def load_icon_font(size):
+    from PIL import ImageFont
+    for name in ICON_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    # Linux ohne Arial und ohne die üblichen Ersatzschriften
+    return ImageFont.load_default()
+
+# Funktion zum Laden des kleinsten Frames aus dem mitgelieferten Icon, der mindestens die
+# Zielgröße hat (None, wenn es keinen gibt: hochskaliert würde das Icon unscharf)
+def load_icon_frame(source, size):
+    from PIL import Image
+    with Image.open(source) as bundled:
+        sizes = sorted(frame for frame in bundled.info.get('sizes', {bundled.size}) if min(frame) >= size)
+        if not sizes:
+            return None
+        frame = bundled.ico.getimage(sizes[0]) if hasattr(bundled, 'ico') else bundled
+        frame = frame.convert('RGBA')
+    return frame if frame.size == (size, size) else frame.resize((size, size), Image.LANCZOS)
+
+# Funktion zum Rendern eines Icons (nur bei einem Cache-Fehlschlag)
+def render_icon(size, theme, state, source):
+    from PIL import Image, ImageDraw
+    colors = ICON_THEMES.get(theme, ICON_THEMES['light'])
+    # Schneller Weg: passender Frame des mitgelieferten Icons, keine Schrift nötig
+    image = load_icon_frame(source, size) if source else None
+    if image is None:
+        image = Image.new('RGBA', (size, size), colors['background'])
+        dc = ImageDraw.Draw(image)
+        font = load_icon_font(max(6, size * 14 // 64))
+        text_bbox = dc.textbbox((0, 0), ICON_TEXT, font=font)
+        text_width = text_bbox[2] - text_bbox[0]
+        text_height = text_bbox[3] - text_bbox[1]
+        text_x = (size - text_width) // 2
+        text_y = (size - text_height) // 2
+        dc.text((text_x, text_y), ICON_TEXT, fill=colors['foreground'], font=font, align="center")
+    marker = ICON_STATES.get(state)
+    if marker:
+        dc = ImageDraw.Draw(image)
+        radius = max(2, size // 6)
+        dc.ellipse((size - 2 * radius - 1, size - 2 * radius - 1, size - 1, size - 1), fill=marker)
+    return image
+
+# Funktion zum Holen eines Icons aus dem Festplatten-Cache (rendert und speichert bei Bedarf)
+def get_icon_image(size, theme, state):
+    from PIL import Image
+    source = bundled_icon_path()
+    source_key = f"ico:{os.path.getmtime(source)}" if source else "text"
+    key = hashlib.sha256(f"{size}|{ICON_TEXT}|{theme}|{state}|{source_key}".encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(icon_cache_dir, f"{state}_{size}_{key}.png")
+    try:
+        with Image.open(path) as cached:
+            cached.load()
+            return cached.copy()
+    except (OSError, ValueError):
+        pass
+    image = render_icon(size, theme, state, source)
+    try:
+        os.makedirs(icon_cache_dir, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        image.save(temp_path, format='PNG')
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning("Icon konnte nicht zwischengespeichert werden: %s", e)
+    return image
+
+# Funktion zum Ermitteln der Icon-Größe (bei HiDPI unter Windows entsprechend größer)
+def tray_icon_size():
+    size = config.get('icon_size')
+    if size:
+        return int(size)
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            scale = ctypes.windll.user32.GetDpiForSystem() / 96
+            return max(64, int(64 * scale))
+        except Exception:
+            pass
+    return 64
+
+# Funktion zum Vorrendern aller Zustände, damit das Umschalten nichts kostet
+def prepare_tray_icons():
+    size = tray_icon_size()
+    theme = config.get('icon_theme', 'light')
+    for state in ICON_STATES:
+        tray_icon_images[state] = get_icon_image(size, theme, state)
+
+# Funktion zum Setzen der Fenstersymbole aller Popups in mehreren Auflösungen (im UI-Thread;
+# der Fenstermanager wählt je nach Verwendung und DPI die passende)
+def set_window_icons():
+    try:
+        from PIL import ImageTk
+        theme = config.get('icon_theme', 'light')
+        sizes = sorted(set(ICON_SIZES) | {tray_icon_size()})
+        ui_root.window_icons = [ImageTk.PhotoImage(get_icon_image(size, theme, 'idle')) for size in sizes]
+        ui_root.iconphoto(True, *ui_root.window_icons)
+    except Exception as e:
+        logger.debug("Fenstersymbole konnten nicht gesetzt werden: %s", e)
+
+# Funktion zum Erstellen des Tray-Icons
+def create_image():
+    if not tray_icon_images:
+        prepare_tray_icons()
+    return tray_icon_images['idle']
+
+# Funktion zum Umschalten des Tray-Icons (idle, typing, paused); kehrt sofort zurück
+def set_tray_state(state):
+    global tray_state_requested, tray_state_thread
+    if tray_icon is None or state not in tray_icon_images:
+        return
+    with tray_state_lock:
+        tray_state_requested = state
+        if tray_state_thread is None or not tray_state_thread.is_alive():
+            tray_state_thread = threading.Thread(target=run_tray_state_switcher, name="TypeTool-TrayState", daemon=True)
+            tray_state_thread.start()
+    tray_state_event.set()
+
+# Thread zum Umschalten des Tray-Icons (schnelle Wechsel werden zum letzten Zustand zusammengefasst)
+def run_tray_state_switcher():
+    global tray_icon_state
+    while True:
+        tray_state_event.wait()
+        tray_state_event.clear()
+        state = tray_state_requested
+        icon = tray_icon
+        if state == tray_icon_state or icon is None:
+            continue
+        tray_icon_state = state
+        try:
+            icon.icon = tray_icon_images[state]
+            # Pausieren/Fortsetzen im Menü hängt vom Zustand ab
+            icon.update_menu()
+        except Exception as e:
+            logger.debug("Tray-Icon konnte nicht umgeschaltet werden: %s", e)
+
+# Event zum Abbrechen des Tippvorgangs
+stop_typing_event = threading.Event()
+# Gesetzt, solange ein Tippvorgang läuft (Overlays verzichten dann auf Animationen)
+typing_active = threading.Event()
+# Gesetzt, solange eine Kalibrierung vorbereitet wird oder läuft (neue Aufträge werden abgelehnt)
+calibration_active = threading.Event()
+
+# Metriken im Prometheus-Textformat. Gemessen wird immer (nur am Anfang und Ende eines
+# Auftrags, nie pro Tastendruck); exportiert wird optional per HTTP oder Textdatei
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0)
+RATE_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 100000)
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, values)) + '}'
+
+class MetricCounter:
+    kind = 'counter'
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self, lines):
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{format_labels(self.labels, label_values)} {value}")
+
+class MetricHistogram:
+    kind = 'histogram'
+
+    def __init__(self, name, description, buckets, labels=()):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labels = labels
+        self.values = {}  # Label-Werte -> [Zähler je Bucket (+Inf am Ende), Summe, Anzahl]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(label_values)
+            if state is None:
+                state = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self, lines):
+        with self.lock:
+            for label_values, (counts, total, count) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += bucket_count
+                    labels = format_labels(self.labels + ('le',), label_values + (bound,))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+
+# Funktion zum Ermitteln des Arbeitsspeichers (RSS) des eigenen Prozesses in Bytes
+def process_rss():
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                     ctypes.byref(counters), counters.cb)
+            return counters.WorkingSetSize
+        with open('/proc/self/statm', encoding='ascii') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return None
+
+class Metrics:
+    def __init__(self):
+        self.hotkey_latency = MetricHistogram(
+            'typetool_hotkey_first_key_seconds', "Zeit vom Hotkey bis zum ersten Tastendruck", LATENCY_BUCKETS)
+        self.chars_per_second = MetricHistogram(
+            'typetool_job_chars_per_second', "Erreichte Zeichen pro Sekunde je Auftrag", RATE_BUCKETS)
+        self.job_duration = MetricHistogram(
+            'typetool_job_duration_seconds', "Dauer eines Tippauftrags", DURATION_BUCKETS, ('state',))
+        self.jobs = MetricCounter('typetool_jobs_total', "Beendete Tippaufträge", ('state',))
+        self.chars = MetricCounter('typetool_typed_chars_total', "Getippte Zeichen")
+        self.cancellations = MetricCounter('typetool_cancellations_total', "Abgebrochene Tippaufträge")
+        self.clipboard_fetch = MetricHistogram(
+            'typetool_clipboard_fetch_seconds', "Dauer des Lesens der Zwischenablage", LATENCY_BUCKETS)
+        self.popup_creation = MetricHistogram(
+            'typetool_popup_creation_seconds', "Aufbau eines Overlays im UI-Thread", LATENCY_BUCKETS, ('window',))
+        self.instruments = [self.hotkey_latency, self.chars_per_second, self.job_duration, self.jobs,
+                            self.chars, self.cancellations, self.clipboard_fetch, self.popup_creation]
+
+    # Abschluss eines Auftrags (wird einmal pro Auftrag aufgerufen)
+    def observe_job(self, state, chars, duration):
+        self.jobs.inc(1, state)
+        self.chars.inc(chars)
+        self.job_duration.observe(duration, state)
+        if duration > 0 and chars:
+            self.chars_per_second.observe(chars / duration)
+        if state == JOB_CANCELLED:
+            self.cancellations.inc()
+
+    def render(self):
+        lines = []
+        for instrument in self.instruments:
+            lines.append(f"# HELP {instrument.name} {instrument.description}")
+            lines.append(f"# TYPE {instrument.name} {instrument.kind}")
+            instrument.render(lines)
+        gauges = [
+            ('typetool_threads', "Laufende Threads", threading.active_count()),
+            ('typetool_resident_memory_bytes', "Belegter Arbeitsspeicher (RSS)", process_rss()),
+            ('typetool_queue_depth', "Wartende Tippaufträge", typing_scheduler.depth),
+            ('typetool_typing_active', "1, solange getippt wird", int(typing_active.is_set())),
+        ]
+        for name, description, value in gauges:
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+
+# Export der Metriken: HTTP nur auf 127.0.0.1 und/oder Textdatei für den node_exporter
+class MetricsExporter:
+    def __init__(self):
+        self.server = None
+        self.server_thread = None
+        self.writer_thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        port = int(config.get('metrics_http_port') or 0)
+        if port and self.server is None:
+            try:
+                self.server = http_server.ThreadingHTTPServer(('127.0.0.1', port), make_metrics_handler())
+            except OSError as e:
+                logger.error("Metrik-Endpunkt konnte nicht gestartet werden: %s", e)
+            else:
+                self.server.daemon_threads = True
+                self.server_thread = threading.Thread(target=self.server.serve_forever,
+                                                      name="TypeTool-Metrics", daemon=True)
+                self.server_thread.start()
+                logger.info("Metriken unter http://127.0.0.1:%d/metrics", port)
+        if config.get('metrics_textfile') and self.writer_thread is None:
+            self.stop_event.clear()
+            self.writer_thread = threading.Thread(target=self.run_writer, name="TypeTool-MetricsFile", daemon=True)
+            self.writer_thread.start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            self.server_thread = None
+        if self.writer_thread is not None:
+            self.stop_event.set()
+            if self.writer_thread is not threading.current_thread():
+                self.writer_thread.join(timeout=2)
+            self.writer_thread = None
+
+    def run_writer(self):
+        interval = max(1.0, float(config.get('metrics_interval', 15)))
+        while True:
+            self.write_textfile()
+            if self.stop_event.wait(interval):
+                # Letzter Stand beim Beenden
+                self.write_textfile()
+                return
+
+    # Atomar schreiben, damit der Collector nie eine halbe Datei liest
+    def write_textfile(self):
+        path = config.get('metrics_textfile')
+        if not path:
+            return
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.write(metrics.render())
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("Metrik-Datei konnte nicht geschrieben werden: %s", e)
+
+def make_metrics_handler():
+    class MetricsHandler(http_server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("Metrik-Abfrage: " + format, *args)
+
+    return MetricsHandler
+
+metrics_exporter = MetricsExporter()
+
+# Taktgeber für das Tippen: rechnet mit absoluten Deadlines auf der monotonen Uhr,
+# damit zu lange Sleeps des Betriebssystems beim nächsten Schritt aufgeholt werden
+class TypingPacer:
+    # Restzeiten unterhalb dieser Schwelle werden aktiv abgewartet statt geschlafen
+    SPIN_THRESHOLD = 0.002
+    # Größerer Rückstand wird nicht mehr aufgeholt, sondern neu synchronisiert
+    MAX_LAG = 0.25
+
+    def __init__(self, interval):
+        self.interval = max(0.0, float(interval))  # Sekunden pro Einheit (Zeichen oder Block)
+        self.start_time = None
+        self.base_time = None
+        self.units = 0
+        self.base_units = 0
+        self.resyncs = 0
+
+    def start(self):
+        self.start_time = self.base_time = time.perf_counter()
+        self.units = self.base_units = 0
+        _set_timer_resolution(True)
+
+    def stop(self):
+        _set_timer_resolution(False)
+
+    def wait(self, units=1):
+        self.units += units
+        deadline = self.base_time + (self.units - self.base_units) * self.interval
+        now = time.perf_counter()
+        if now - deadline > self.MAX_LAG:
+            # Nach langen Hängern (z.B. Systemlast) nicht im Burst nachtippen
+            self.base_time = now
+            self.base_units = self.units
+            self.resyncs += 1
+            return
+        sleep_until(deadline, self.SPIN_THRESHOLD)
+
+    def rebase(self):
+        # Nach einer Pause ohne Nachholen der verlorenen Zeit weitertakten
+        self.base_time = time.perf_counter()
+        self.base_units = self.units
+
+    @property
+    def target_rate(self):
+        return 1.0 / self.interval if self.interval > 0 else float('inf')
+
+    @property
+    def achieved_rate(self):
+        if self.start_time is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.start_time
+        return self.units / elapsed if elapsed > 0 else 0.0
+
+# Funktion zum genauen Warten bis zu einem Zeitpunkt (erst schlafen, dann kurz aktiv warten)
+def sleep_until(deadline, spin_threshold=TypingPacer.SPIN_THRESHOLD):
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        if remaining > spin_threshold:
+            time.sleep(remaining - spin_threshold)
+        else:
+            time.sleep(0)  # Nur die Zeitscheibe abgeben
+
+# Funktion zum Erhöhen der Windows-Timerauflösung während des Tippens
+def _set_timer_resolution(enabled):
+    if sys.platform != 'win32':
+        return
+    try:
+        import ctypes
+        if enabled:
+            ctypes.windll.winmm.timeBeginPeriod(1)
+        else:
+            ctypes.windll.winmm.timeEndPeriod(1)
+    except Exception as e:
+        logger.debug("Timerauflösung konnte nicht gesetzt werden: %s", e)
+
+# Aktionen eines kompilierten Tastenplans
+ACTION_TAP = 0      # Scancode mit Modifikatoren drücken und loslassen
+ACTION_UNICODE = 1  # Zeichen per Unicode-Eingabe senden (Codepoint statt Scancode)
+ACTION_DEAD = 2     # Zeichen liegt auf einer Tottaste: Taste und danach Leertaste tippen
+
+# Steuerzeichen, die als benannte Tasten getippt werden
+SPECIAL_KEY_NAMES = {'\n': 'enter', '\t': 'tab', '\b': 'backspace'}
+
+# Kompilierter Tastenplan: drei Einträge pro Zeichen (Code, Modifikator-Index, Aktion)
+# plus Abschnitte (Runs) mit gleicher Aktion, die jeweils am Stück gesendet werden
+class KeystrokePlan:
+    __slots__ = ('events', 'modifier_sets', 'layout', 'run_starts', 'run_actions')
+
+    def __init__(self, events, modifier_sets, layout, run_starts, run_actions):
+        self.events = events
+        self.modifier_sets = modifier_sets  # Tupel von Modifikator-Scancodes
+        self.layout = layout
+        self.run_starts = run_starts  # Zeichenindex, an dem ein Run beginnt
+        self.run_actions = run_actions  # Aktion des jeweiligen Runs
+
+    def __len__(self):
+        return len(self.events) // 3
+
+    @property
+    def nbytes(self):
+        return (self.events.itemsize * len(self.events) + self.run_starts.itemsize * len(self.run_starts)
+                + self.run_actions.itemsize * len(self.run_actions))
+
+    # Liefert (Start, Ende, Aktion) für alle Runs im Bereich start bis stop
+    def iter_runs(self, start, stop):
+        run_starts = self.run_starts
+        index = bisect.bisect_right(run_starts, start) - 1
+        while start < stop:
+            run_stop = run_starts[index + 1] if index + 1 < len(run_starts) else len(self)
+            end = min(run_stop, stop)
+            yield start, end, self.run_actions[index]
+            start = end
+            index += 1
+
+# Funktion zum Ermitteln des aktiven Tastaturlayouts (Teil des Cache-Schlüssels)
+def get_active_layout():
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            user32 = ctypes.windll.user32
+            # HKL ist ein Handle in Zeigerbreite; als int abgeschnitten würden Handles mit
+            # gesetztem oberen Bit (z.B. 0xF0020409, IMEs 0xE00...) ungültig
+            user32.GetKeyboardLayout.argtypes = (ctypes.c_uint,)
+            user32.GetKeyboardLayout.restype = ctypes.c_void_p
+            thread_id = user32.GetWindowThreadProcessId(user32.GetForegroundWindow(), None)
+            return f"{user32.GetKeyboardLayout(thread_id) or 0:x}"
+        except Exception:
+            return 'default'
+    # Unter Linux liest keyboard die Tastenbelegung einmalig beim Start ein
+    return os.environ.get('XKB_DEFAULT_LAYOUT', 'default')
+
+# Funktion zum Ermitteln des Windows-Layout-Handles aus dem Layout-Schlüssel (sonst None)
+def layout_handle(layout):
+    if sys.platform != 'win32':
+        return None
+    try:
+        return int(layout.rsplit(':', 1)[-1], 16) or None
+    except ValueError:
+        return None
+
+# Modifikatoren als (Bit im Umschaltzustand von VkKeyScanEx, virtueller Tastencode, Scancode)
+MODIFIER_KEYS = ((0x01, 0x10, 0x2A), (0x02, 0x11, 0x1D), (0x04, 0x12, 0x38))  # Umschalt, Strg, Alt
+
+# Virtuelle Tastencodes der benannten Tasten (unabhängig vom Layout)
+SPECIAL_VIRTUAL_KEYS = {'\n': 0x0D, '\t': 0x09, '\b': 0x08}
+
+# Funktion zum Auflösen eines Zeichens gegen das Layout des Zielfensters unter Windows.
+# keyboard baut seine Tabellen einmalig für das Layout beim Start auf; VkKeyScanEx und
+# MapVirtualKeyEx fragen dagegen genau das übergebene Layout. Codes werden als
+# Scancode << 8 | virtueller Tastencode abgelegt, damit beim Senden nichts mehr nachgeschlagen
+# wird. Ohne Layout-Handle gibt es keine sichere Zuordnung, dann wird per Unicode gesendet
+def resolve_windows_char(char, hkl):
+    import ctypes
+    user32 = ctypes.windll.user32
+    user32.MapVirtualKeyExW.argtypes = (ctypes.c_uint, ctypes.c_uint, ctypes.c_void_p)
+    user32.MapVirtualKeyExW.restype = ctypes.c_uint
+    if char in SPECIAL_VIRTUAL_KEYS:
+        virtual_key = SPECIAL_VIRTUAL_KEYS[char]
+        return user32.MapVirtualKeyExW(virtual_key, 0, hkl) << 8 | virtual_key, (), ACTION_TAP
+    if hkl is None:
+        return ord(char), (), ACTION_UNICODE
+    user32.VkKeyScanExW.argtypes = (ctypes.c_wchar, ctypes.c_void_p)
+    user32.VkKeyScanExW.restype = ctypes.c_short
+    result = user32.VkKeyScanExW(char, hkl) & 0xFFFF
+    virtual_key, shift_state = result & 0xFF, result >> 8
+    # Keine Taste, Sonderzustände (Kana usw.) oder nur Strg bzw. nur Alt (Steuerzeichen, Menükürzel)
+    if result == 0xFFFF or shift_state & ~0x07 or shift_state & 0x06 in (0x02, 0x04):
+        return ord(char), (), ACTION_UNICODE
+    scan_code = user32.MapVirtualKeyExW(virtual_key, 0, hkl)  # MAPVK_VK_TO_VSC
+    if not scan_code:
+        return ord(char), (), ACTION_UNICODE
+    modifier_codes = tuple(modifier_scan << 8 | modifier_key
+                           for bit, modifier_key, modifier_scan in MODIFIER_KEYS if shift_state & bit)
+    # Tottaste erkennen, ohne den Tastaturzustand zu verändern (Flag 0x4)
+    state = (ctypes.c_ubyte * 256)()
+    for bit, modifier_key, _ in MODIFIER_KEYS:
+        if shift_state & bit:
+            state[modifier_key] = 0x80
+    buffer = ctypes.create_unicode_buffer(8)
+    user32.ToUnicodeEx.argtypes = (ctypes.c_uint, ctypes.c_uint, ctypes.c_void_p, ctypes.c_wchar_p,
+                                   ctypes.c_int, ctypes.c_uint, ctypes.c_void_p)
+    dead = user32.ToUnicodeEx(virtual_key, scan_code, state, buffer, len(buffer), 0x4, hkl) < 0
+    return scan_code << 8 | virtual_key, modifier_codes, ACTION_DEAD if dead else ACTION_TAP
+
+# Funktion zum Auflösen eines Zeichens in (Code, Modifikator-Codes, Aktion)
+def resolve_char(char, hkl=None):
+    if sys.platform == 'win32':
+        try:
+            return resolve_windows_char(char, hkl)
+        except Exception as e:
+            # Ohne sichere Zuordnung lieber per Unicode senden als ein falsches Zeichen zu tippen
+            logger.debug("Zeichen %r nicht auflösbar: %s", char, e)
+            return ord(char), (), ACTION_UNICODE
+    name = SPECIAL_KEY_NAMES.get(char, char)
+    try:
+        scan_code, modifiers = next(iter(keyboard._os_keyboard.map_name(keyboard.normalize_name(name))))
+        modifier_codes = tuple(keyboard.key_to_scan_codes(modifier)[0] for modifier in modifiers)
+    except (KeyError, ValueError, StopIteration):
+        return ord(char), (), ACTION_UNICODE
+    return scan_code, modifier_codes, ACTION_TAP
+
+# Auflösungstabelle pro Tastaturlayout: ASCII und Latin-1 werden beim ersten Gebrauch
+# eines Layouts vorab aufgelöst, alle anderen Zeichen beim ersten Auftreten. Unter Windows
+# gehört jede Tabelle zu einem Layout-Handle, alle Einträge werden gegen genau dieses
+# Layout aufgelöst; ohne Handle (Linux) gibt es nur die Tabelle der keyboard-Belegung
+class LayoutTable:
+    PRELOAD = ''.join(map(chr, range(32, 256))) + ''.join(SPECIAL_KEY_NAMES)
+    MAX_ENTRIES = 4096  # Seltene Zeichen (z.B. Emoji) nicht unbegrenzt sammeln
+
+    def __init__(self, hkl):
+        self.hkl = hkl
+        self.entries = {}
+        for char in self.PRELOAD:
+            self.lookup(char)
+
+    def lookup(self, char):
+        entry = self.entries.get(char)
+        if entry is None:
+            entry = resolve_char(char, self.hkl)
+            if len(self.entries) < self.MAX_ENTRIES:
+                self.entries[char] = entry
+        return entry
+
+MAX_LAYOUT_TABLES = 8  # Bei häufigem Wechsel zwischen vielen Layouts die ältesten verwerfen
+layout_tables = {}
+layout_tables_lock = threading.Lock()
+
+# Funktion zum Holen der Tabelle eines Layouts (wird nur beim ersten Gebrauch eines Layouts
+# aufgebaut); Schlüssel ist das Layout-Handle, nicht der Layout-Schlüssel des Backends
+def get_layout_table(layout):
+    hkl = layout_handle(layout)
+    table = layout_tables.get(hkl)
+    if table is None:
+        with layout_tables_lock:
+            table = layout_tables.get(hkl)
+            if table is None:
+                start = time.perf_counter()
+                table = LayoutTable(hkl)
+                while len(layout_tables) >= MAX_LAYOUT_TABLES:
+                    layout_tables.pop(next(iter(layout_tables)))
+                layout_tables[hkl] = table
+                logger.debug("Layout-Tabelle für %s in %.1f ms aufgebaut", layout, (time.perf_counter() - start) * 1000)
+    return table
+
+# Funktion zum Kompilieren eines Textes in einen Tastenplan; benachbarte Zeichen mit
+# gleicher Aktion werden zu Runs zusammengefasst
+def compile_keystroke_plan(text, layout):
+    lookup = get_layout_table(layout).lookup
+    events = array('i')
+    run_starts = array('i')
+    run_actions = array('b')
+    modifier_sets = [()]
+    modifier_index = {(): 0}
+    resolved = {}
+    last_action = -1
+    for position, char in enumerate(text):
+        entry = resolved.get(char)
+        if entry is None:
+            code, modifier_codes, action = lookup(char)
+            index = modifier_index.get(modifier_codes)
+            if index is None:
+                index = modifier_index[modifier_codes] = len(modifier_sets)
+                modifier_sets.append(modifier_codes)
+            entry = resolved[char] = (code, index, action)
+        events.extend(entry)
+        if entry[2] != last_action:
+            last_action = entry[2]
+            run_starts.append(position)
+            run_actions.append(last_action)
+    return KeystrokePlan(events, tuple(modifier_sets), layout, run_starts, run_actions)
+
+# LRU-Cache für Tastenpläne, Schlüssel ist der Hash des Textes plus Tastaturlayout
+class KeystrokePlanCache:
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def get(self, text, layout, compile_plan=compile_keystroke_plan):
+        key = (self.text_hash(text), layout)
+        with self.lock:
+            plan = self.entries.get(key)
+            if plan is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+        plan = compile_plan(text, layout)
+        if plan.nbytes <= self.max_bytes:
+            with self.lock:
+                if key not in self.entries:
+                    self.entries[key] = plan
+                    self.total_bytes += plan.nbytes
+                    self._shrink()
+        return plan
+
+    def resize(self, max_entries, max_bytes):
+        with self.lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._shrink()
+
+    def _shrink(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, plan = self.entries.popitem(last=False)
+            self.total_bytes -= plan.nbytes
+
+    # Entfernt alle Pläne zu einem Text (z.B. nach dem Tippen eines Passworts)
+    def evict(self, text):
+        digest = self.text_hash(text)
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == digest]:
+                self.total_bytes -= self.entries.pop(key).nbytes
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+keystroke_plan_cache = KeystrokePlanCache(config.get('plan_cache_max_entries', 64),
+                                          config.get('plan_cache_max_bytes', 4 * 1024 * 1024))
+
+# Funktion zum Kompilieren eines Textes in einen reinen Unicode-Plan (für Backends ohne Scancodes)
+def compile_unicode_plan(text, layout):
+    events = array('i')
+    for char in text:
+        events.extend((ord(char), 0, ACTION_UNICODE))
+    run_starts = array('i', [0] if text else [])
+    run_actions = array('b', [ACTION_UNICODE] if text else [])
+    return KeystrokePlan(events, ((),), layout, run_starts, run_actions)
+
+# Basisklasse für Ausgabe-Backends: alle Tastendrücke laufen über das aktive Backend
+class OutputBackend:
+    name = 'basis'
+
+    def compile(self, text, layout):
+        return compile_unicode_plan(text, layout)
+
+    def send(self, plan, start, stop):
+        raise NotImplementedError
+
+    def press_key(self, key):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+# Ausgabe über die keyboard-Bibliothek (Standard unter Windows)
+class KeyboardBackend(OutputBackend):
+    name = 'keyboard'
+
+    def compile(self, text, layout):
+        return compile_keystroke_plan(text, layout)
+
+    def __init__(self):
+        self.space_code = None
+
+    def send(self, plan, start, stop):
+        # Vom Benutzer gehaltene Modifikatoren (z.B. Strg vom Hotkey) vorübergehend lösen
+        state = keyboard.stash_state()
+        try:
+            for run_start, run_stop, action in plan.iter_runs(start, stop):
+                if action == ACTION_TAP:
+                    self.send_taps(plan, run_start, run_stop)
+                elif action == ACTION_DEAD:
+                    self.send_dead_keys(plan, run_start, run_stop)
+                else:
+                    self.send_unicode(plan, run_start, run_stop)
+        finally:
+            keyboard.restore_modifiers(state)
+
+    # Sendet Tastenereignisse (Code, losgelassen) am Stück: unter Windows als ein SendInput-Aufruf
+    # mit virtuellem Tastencode und Scancode aus resolve_windows_char, sonst über keyboard
+    @staticmethod
+    def send_key_events(key_events):
+        os_keyboard = keyboard._os_keyboard
+        if not hasattr(os_keyboard, 'SendInput'):
+            for code, up in key_events:
+                if up:
+                    os_keyboard.release(code)
+                else:
+                    os_keyboard.press(code)
+            return
+        import ctypes
+        key_up = os_keyboard.KEYEVENTF_KEYUP
+        inputs = [os_keyboard.INPUT(os_keyboard.INPUT_KEYBOARD, os_keyboard._INPUTunion(
+                      ki=os_keyboard.KEYBDINPUT(code & 0xFF, code >> 8, key_up if up else 0, 0, None)))
+                  for code, up in key_events]
+        os_keyboard.SendInput(len(inputs), (os_keyboard.INPUT * len(inputs))(*inputs),
+                              ctypes.c_int(ctypes.sizeof(os_keyboard.INPUT)))
+
+    # Zeichen des Layouts: Modifikatoren bleiben gedrückt, solange Folgezeichen sie brauchen
+    def send_taps(self, plan, start, stop):
+        events = plan.events
+        modifier_sets = plan.modifier_sets
+        key_events = []
+        held = 0
+        for i in range(start * 3, stop * 3, 3):
+            index = events[i + 1]
+            if index != held:
+                key_events.extend((modifier, True) for modifier in reversed(modifier_sets[held]))
+                key_events.extend((modifier, False) for modifier in modifier_sets[index])
+                held = index
+            key_events.append((events[i], False))
+            key_events.append((events[i], True))
+        key_events.extend((modifier, True) for modifier in reversed(modifier_sets[held]))
+        self.send_key_events(key_events)
+
+    # Tottasten: Taste plus Leertaste erzeugt das Zeichen selbst, ohne das Folgezeichen zu verändern
+    def send_dead_keys(self, plan, start, stop):
+        events = plan.events
+        modifier_sets = plan.modifier_sets
+        if self.space_code is None:
+            # Leertaste unter Windows als Scancode 0x39 mit VK_SPACE, wie in resolve_windows_char kodiert
+            self.space_code = 0x39 << 8 | 0x20 if sys.platform == 'win32' else keyboard.key_to_scan_codes('space')[0]
+        key_events = []
+        for i in range(start * 3, stop * 3, 3):
+            modifier_codes = modifier_sets[events[i + 1]]
+            key_events.extend((modifier, False) for modifier in modifier_codes)
+            key_events.append((events[i], False))
+            key_events.append((events[i], True))
+            key_events.extend((modifier, True) for modifier in reversed(modifier_codes))
+            key_events.append((self.space_code, False))
+            key_events.append((self.space_code, True))
+        self.send_key_events(key_events)
+
+    # Unicode-Zeichen: unter Windows ein einziger SendInput-Aufruf für den ganzen Run
+    @staticmethod
+    def send_unicode(plan, start, stop):
+        os_keyboard = keyboard._os_keyboard
+        events = plan.events
+        if not hasattr(os_keyboard, 'SendInput'):
+            for i in range(start * 3, stop * 3, 3):
+                os_keyboard.type_unicode(chr(events[i]))
+            return
+        import ctypes
+        inputs = []
+        key_down = os_keyboard.KEYEVENTF_UNICODE
+        key_up = os_keyboard.KEYEVENTF_UNICODE | os_keyboard.KEYEVENTF_KEYUP
+        for i in range(start * 3, stop * 3, 3):
+            encoded = chr(events[i]).encode('utf-16-le', 'surrogatepass')
+            units = [encoded[j] | encoded[j + 1] << 8 for j in range(0, len(encoded), 2)]
+            for flags in (key_down, key_up):
+                for unit in units:
+                    structure = os_keyboard.KEYBDINPUT(0, unit, flags, 0, None)
+                    inputs.append(os_keyboard.INPUT(os_keyboard.INPUT_KEYBOARD, os_keyboard._INPUTunion(ki=structure)))
+        os_keyboard.SendInput(len(inputs), (os_keyboard.INPUT * len(inputs))(*inputs),
+                              ctypes.c_int(ctypes.sizeof(os_keyboard.INPUT)))
+
+    def press_key(self, key):
+        keyboard.press_and_release(key)
+
+# Ausgabe über xdotool (Linux/X11, ohne Root-Rechte für globale Hooks). Bevorzugt wird
+# libxdo, die Bibliothek hinter xdotool: ein Handle für die ganze Sitzung statt eines
+# Prozesses pro Block. Ohne libxdo wird wie bisher pro Block xdotool gestartet
+class XdotoolBackend(OutputBackend):
+    name = 'xdotool'
+    KEY_NAMES = {'enter': 'Return', 'tab': 'Tab', 'backspace': 'BackSpace', 'esc': 'Escape'}
+    LIBRARY_NAMES = ('libxdo.so.3', 'libxdo.so')
+
+    def __init__(self):
+        self.libxdo = None
+        self.xdo = None
+        self.loaded = False
+        self.lock = threading.Lock()  # Worker und Kalibrierung teilen sich das Handle
+
+    # Lädt libxdo beim ersten Tastendruck (nicht beim Start) und öffnet die X-Verbindung
+    def open_xdo(self):
+        self.loaded = True
+        try:
+            import ctypes
+            import ctypes.util
+            libxdo = None
+            for name in self.LIBRARY_NAMES:
+                try:
+                    libxdo = ctypes.CDLL(name)
+                    break
+                except OSError:
+                    continue
+            if libxdo is None:
+                path = ctypes.util.find_library('xdo')
+                if path is None:
+                    raise OSError("libxdo nicht gefunden")
+                libxdo = ctypes.CDLL(path)
+            libxdo.xdo_new.argtypes = (ctypes.c_char_p,)
+            libxdo.xdo_new.restype = ctypes.c_void_p
+            for function in (libxdo.xdo_enter_text_window, libxdo.xdo_send_keysequence_window):
+                function.argtypes = (ctypes.c_void_p, ctypes.c_ulong, ctypes.c_char_p, ctypes.c_uint)
+                function.restype = ctypes.c_int
+            libxdo.xdo_free.argtypes = (ctypes.c_void_p,)
+            xdo = libxdo.xdo_new(None)
+            if not xdo:
+                raise OSError("keine Verbindung zum X-Server")
+            self.libxdo, self.xdo = libxdo, xdo
+        except (OSError, AttributeError) as e:
+            logger.info("libxdo nicht verfügbar, xdotool wird pro Block gestartet: %s", e)
+
+    def send(self, plan, start, stop):
+        events = plan.events
+        chunk = ''.join(chr(events[i]) for i in range(start * 3, stop * 3, 3))
+        with self.lock:
+            if not self.loaded:
+                self.open_xdo()
+            if self.xdo is not None:
+                # Fenster 0 = fokussiertes Fenster, keine Verzögerung (das Tempo regelt der Pacer)
+                self.libxdo.xdo_enter_text_window(self.xdo, 0, chunk.encode('utf-8', 'replace'), 0)
+                return
+        subprocess.run(['xdotool', 'type', '--delay', '0', '--', chunk], check=False)
+
+    def press_key(self, key):
+        name = self.KEY_NAMES.get(key, key)
+        with self.lock:
+            if not self.loaded:
+                self.open_xdo()
+            if self.xdo is not None:
+                self.libxdo.xdo_send_keysequence_window(self.xdo, 0, name.encode('utf-8'), 0)
+                return
+        subprocess.run(['xdotool', 'key', name], check=False)
+
+    def close(self):
+        with self.lock:
+            if self.xdo is not None:
+                self.libxdo.xdo_free(self.xdo)
+            self.libxdo = self.xdo = None
+            self.loaded = False
+
+# Aufzeichnendes Backend ohne echte Tastendrücke (für Tests und Benchmarks ohne Desktop)
+class RecordingBackend(OutputBackend):
+    name = 'recording'
+
+    def __init__(self):
+        self.key_names = []
+        self.reset()
+
+    # Zeitstempel und Codepoints in kompakten Arrays; benannte Tasten als negativer Index
+    def reset(self):
+        self.timestamps = array('d')
+        self.codes = array('i')
+
+    def send(self, plan, start, stop):
+        events = plan.events
+        timestamps = self.timestamps
+        codes = self.codes
+        for i in range(start * 3, stop * 3, 3):
+            codes.append(events[i])
+            timestamps.append(time.perf_counter())
+
+    def press_key(self, key):
+        if key not in self.key_names:
+            self.key_names.append(key)
+        self.codes.append(-1 - self.key_names.index(key))
+        self.timestamps.append(time.perf_counter())
+
+    def __len__(self):
+        return len(self.codes)
+
+    # Rekonstruiert den getippten Text (benannte Tasten als <name>, Enter als Zeilenumbruch)
+    def text(self):
+        parts = []
+        for code in self.codes:
+            if code >= 0:
+                parts.append(chr(code))
+            else:
+                key = self.key_names[-1 - code]
+                parts.append('\n' if key == 'enter' else f"<{key}>")
+        return ''.join(parts)
+
+output_backends = {
+    KeyboardBackend.name: KeyboardBackend,
+    XdotoolBackend.name: XdotoolBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+# Funktion zum Erzeugen des konfigurierten Ausgabe-Backends
+def create_output_backend(name):
+    backend_class = output_backends.get(name)
+    if backend_class is None:
+        logger.warning("Unbekanntes Ausgabe-Backend '%s', verwende keyboard", name)
+        backend_class = KeyboardBackend
+    return backend_class()
+
+output_backend = create_output_backend(config.get('output_backend', 'keyboard'))
+
+# Funktion zum Holen des Tastenplans für einen Text (aus dem Cache, falls aktiviert)
+def get_keystroke_plan(text, backend):
+    layout = f"{backend.name}:{get_active_layout()}"
+    if config.get('plan_cache_enabled', True):
+        return keystroke_plan_cache.get(text, layout, backend.compile)
+    return backend.compile(text, layout)
+
+# Messwerte des letzten Tippvorgangs (Zeichen, Dauer, Zeichen pro Sekunde)
+last_typing_stats = {}
+
+# Länge des Präfixes, das Vorschau und Log zu sehen bekommen
+PREVIEW_PREFIX = 100
+
+# Funktion zum Aufteilen eines Textes in Blöcke fester Größe
+def iter_text_chunks(text, chunk_size, offset=0):
+    for start in range(offset, len(text), chunk_size):
+        yield text[start:start + chunk_size]
+
+# Funktion zum blockweisen Lesen einer Datei (der Inhalt liegt nie komplett im Speicher)
+def iter_file_chunks(path, chunk_size, offset=0):
+    with open(path, 'r', encoding='utf-8') as file:
+        # Bereits getippte Zeichen überspringen (Fortsetzen ab Offset)
+        while offset > 0:
+            skipped = len(file.read(min(offset, chunk_size)))
+            if not skipped:
+                return
+            offset -= skipped
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+# Funktion zum Zählen der Zeichen einer Datei ohne sie komplett zu laden
+def count_file_chars(path, chunk_size=64 * 1024):
+    return sum(len(chunk) for chunk in iter_file_chunks(path, chunk_size))
+
+# Erzeuger: wandelt Textblöcke in Tastenpläne um und legt sie in die begrenzte Warteschlange
+def produce_plans(chunks, backend, plan_queue, cancel_event):
+    layout = f"{backend.name}:{get_active_layout()}"
+
+    def put(item):
+        while not cancel_event.is_set():
+            try:
+                plan_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for chunk in chunks:
+            if not put(backend.compile(chunk, layout)):
+                return
+    except Exception as e:
+        put(e)
+    finally:
+        put(None)
+
+# Verbraucher-Seite des Streamings: liefert die vom Erzeuger-Thread vorbereiteten Pläne
+def iter_streamed_plans(chunks, backend):
+    plan_queue = queue.Queue(maxsize=max(1, int(config.get('stream_queue_size', 4))))
+    cancel_event = threading.Event()
+    producer = threading.Thread(target=produce_plans, args=(chunks, backend, plan_queue, cancel_event),
+                                name="TypeTool-Producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = plan_queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Bei Abbruch den Erzeuger anhalten
+        cancel_event.set()
+        producer.join(timeout=1)
+
+# Einstellungen, die ein Anwendungsprofil für seine Tippaufträge überschreiben kann
+PROFILE_SETTINGS = ('typing_delay', 'typing_batch_size', 'batch_delay', 'enter_key_enabled', 'show_preview_window')
+
+# Funktion zum Ermitteln des Fenster-Handles im Vordergrund (nur unter Windows billig)
+def foreground_window_handle():
+    if sys.platform != 'win32':
+        return None
+    try:
+        import ctypes
+        return ctypes.windll.user32.GetForegroundWindow()
+    except Exception:
+        return None
+
+# Funktion zum Ermitteln von Fensterklasse, Titel und Prozessname des aktiven Fensters
+def query_active_window():
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        hwnd = user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+        buffer = ctypes.create_unicode_buffer(256)
+        user32.GetClassNameW(hwnd, buffer, 256)
+        window_class = buffer.value
+        title = ctypes.create_unicode_buffer(user32.GetWindowTextLengthW(hwnd) + 1)
+        user32.GetWindowTextW(hwnd, title, len(title))
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        process = ''
+        handle = kernel32.OpenProcess(0x1000, False, pid.value)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if handle:
+            try:
+                path = ctypes.create_unicode_buffer(260)
+                size = wintypes.DWORD(len(path))
+                if kernel32.QueryFullProcessImageNameW(handle, 0, path, ctypes.byref(size)):
+                    process = os.path.basename(path.value)
+            finally:
+                kernel32.CloseHandle(handle)
+        return window_class, title.value, process
+    # X11: Fenster-ID über xdotool, Eigenschaften über xprop
+    window_id = subprocess.run(['xdotool', 'getactivewindow'], capture_output=True, text=True,
+                               timeout=0.5, check=True).stdout.strip()
+    return query_x11_window(window_id)
+
+# Muster für den Fenstertitel in der Ausgabe von xprop (auch bei xprop -spy)
+X11_TITLE_PATTERN = re.compile(r'^_NET_WM_NAME\(\w+\) = "(.*)"$', re.M)
+
+# Funktion zum Lesen von Fensterklasse, Titel und Prozessname eines X11-Fensters
+def query_x11_window(window_id):
+    properties = subprocess.run(['xprop', '-id', str(window_id), 'WM_CLASS', '_NET_WM_NAME', '_NET_WM_PID'],
+                                capture_output=True, text=True, timeout=0.5, check=True).stdout
+    window_class = re.search(r'^WM_CLASS\(\w+\) = (?:"[^"]*", )?"([^"]*)"', properties, re.M)
+    title = X11_TITLE_PATTERN.search(properties)
+    pid = re.search(r'^_NET_WM_PID\(\w+\) = (\d+)', properties, re.M)
+    process = ''
+    if pid:
+        try:
+            with open(f"/proc/{pid.group(1)}/comm", encoding='utf-8') as file:
+                process = file.read().strip()
+        except OSError:
+            pass
+    return (window_class.group(1) if window_class else '', title.group(1) if title else '', process)
+
+# Aktives Fenster für die Profilauswahl, ohne den Hotkey-Thread zu blockieren. Unter Windows
+# sind die Abfragen reine API-Aufrufe und werden pro Fenster-Handle zwischengespeichert. Unter
+# X11 hält ein Hintergrundthread den Wert aktuell, ausschließlich über Ereignisse: ein
+# xprop -spy meldet jeden Fensterwechsel, ein zweites die Titel des fokussierten Fensters
+class ActiveWindowMonitor:
+    SPY_WINDOW_PATTERN = re.compile(rb'window id # (0x[0-9a-fA-F]+)')
+
+    def __init__(self):
+        self.value = None
+        self.handle = None
+        self.timestamp = 0.0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.process = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if sys.platform == 'win32' or self.running:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="TypeTool-Window", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        process = self.process
+        if process is not None:
+            process.terminate()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.thread = None
+        self.clear()
+
+    def get(self):
+        if sys.platform != 'win32':
+            # Keine Subprozesse auf dem Hotkey-Thread: letzter bekannter Stand aus dem Hintergrund
+            self.start()
+            with self.lock:
+                return self.value
+        now = time.perf_counter()
+        handle = foreground_window_handle()
+        ttl = float(config.get('active_window_ttl', 2.0))
+        with self.lock:
+            if self.value is not None and handle == self.handle and now - self.timestamp < ttl:
+                return self.value
+        value = self.query()
+        with self.lock:
+            self.value, self.handle, self.timestamp = value, handle, now
+        return value
+
+    @staticmethod
+    def query():
+        try:
+            return query_active_window()
+        except Exception as e:
+            logger.debug("Aktives Fenster konnte nicht ermittelt werden: %s", e)
+            return None
+
+    # Eigenschaften des neu fokussierten X11-Fensters lesen (None = kein aktives Fenster)
+    def refresh(self, window_id):
+        value = None
+        if window_id:
+            try:
+                value = query_x11_window(hex(window_id))
+            except Exception as e:
+                logger.debug("Aktives Fenster konnte nicht ermittelt werden: %s", e)
+        with self.lock:
+            self.value, self.timestamp = value, time.perf_counter()
+
+    # Titelwechsel im fokussierten Fenster aus einer Zeile von xprop -spy übernehmen
+    def update_title(self, line):
+        match = X11_TITLE_PATTERN.search(line.decode('utf-8', 'replace').rstrip('\n'))
+        with self.lock:
+            if self.value is not None:
+                window_class, _, process = self.value
+                self.value = (window_class, match.group(1) if match else '', process)
+
+    @staticmethod
+    def spy(*args):
+        return subprocess.Popen(['xprop', '-spy', *args], bufsize=0,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    @staticmethod
+    def close_spy(process):
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    def run(self):
+        try:
+            self.process = self.spy('-root', '_NET_ACTIVE_WINDOW')
+        except OSError as e:
+            logger.warning("xprop nicht verfügbar, Profile werden nicht nach Fenster gewählt: %s", e)
+            return
+        title_spy = None
+        try:
+            while not self.stop_event.is_set():
+                streams = [self.process.stdout] + ([title_spy.stdout] if title_spy is not None else [])
+                # Das Intervall dient nur dem Beenden; gelesen wird allein bei Ereignissen
+                ready, _, _ = select.select(streams, [], [], 1.0)
+                if self.process.stdout in ready:
+                    line = self.process.stdout.readline()
+                    if not line:
+                        logger.warning("xprop -spy beendet, aktives Fenster wird nicht mehr verfolgt")
+                        break
+                    match = self.SPY_WINDOW_PATTERN.search(line)
+                    window_id = int(match.group(1), 16) if match else 0
+                    self.close_spy(title_spy)
+                    title_spy = None
+                    self.refresh(window_id)
+                    if window_id:
+                        title_spy = self.spy('-id', hex(window_id), '_NET_WM_NAME')
+                elif title_spy is not None and title_spy.stdout in ready:
+                    line = title_spy.stdout.readline()
+                    if line:
+                        self.update_title(line)
+                    else:
+                        # Fenster geschlossen, der nächste Fensterwechsel startet ein neues
+                        self.close_spy(title_spy)
+                        title_spy = None
+        finally:
+            self.close_spy(title_spy)
+            self.close_spy(self.process)
+            self.process = None
+
+    def clear(self):
+        with self.lock:
+            self.value = None
+
+active_window_monitor = ActiveWindowMonitor()
+
+# Funktion zum Finden des ersten passenden Profils (alle angegebenen Kriterien müssen passen)
+def match_profile(window, profiles):
+    if window is None:
+        return None
+    fields = dict(zip(('class', 'title', 'process'), window))
+    for profile in profiles:
+        match = profile.get('match') or {}
+        if not match:
+            continue
+        try:
+            if all(re.search(pattern, fields.get(key, ''), re.IGNORECASE) for key, pattern in match.items()):
+                return profile
+        except re.error as e:
+            logger.warning("Ungültiges Muster im Profil '%s': %s", profile.get('name', '?'), e)
+    return None
+
+# Funktion zum Festlegen der Einstellungen eines Auftrags (globale Werte plus passendes Profil)
+def resolve_job_settings():
+    settings = {
+        'profile': None,
+        'typing_delay': typing_delay,
+        'typing_batch_size': config.get('typing_batch_size', 8),
+        'batch_delay': config.get('batch_delay'),
+        'enter_key_enabled': press_enter,
+        'show_preview_window': config.get('show_preview_window', True),
+    }
+    profiles = config.get('profiles')
+    if profiles:
+        profile = match_profile(active_window_monitor.get(), profiles)
+        if profile is not None:
+            settings.update((key, profile[key]) for key in PROFILE_SETTINGS if key in profile)
+            settings['profile'] = profile.get('name', '?')
+    return settings
+
+# Zustände eines Tippauftrags
+JOB_RUNNING = 'running'
+JOB_PAUSED = 'paused'
+JOB_CANCELLED = 'cancelled'
+JOB_DONE = 'done'
+
+# Tippauftrag mit Zustandsautomat. offset zählt die bereits gesendeten Zeichen, damit ein
+# pausierter oder abgebrochener Auftrag genau an dieser Stelle fortgesetzt werden kann
+class TypingJob:
+    def __init__(self, text=None, path=None):
+        self.text = text
+        self.path = path
+        if text is not None:
+            self.length = len(text)
+            self.prefix = text[:PREVIEW_PREFIX]
+        else:
+            self.length = count_file_chars(path)
+            with open(path, 'r', encoding='utf-8') as file:
+                self.prefix = file.read(PREVIEW_PREFIX)
+        self.state = JOB_RUNNING
+        self.offset = 0
+        self.submitted_at = self.not_before = self.cancelled_at = None
+        self.settings = None  # Wird beim Hotkey bzw. beim Start aufgelöst (Profil des Zielfensters)
+        self.hotkey_time = None  # perf_counter beim Auslösen per Hotkey (für die Latenzmessung)
+        self.trace = None  # JobTrace, falls dieser Auftrag aufgezeichnet wird
+        self.trace_sampled = False  # Sampling bereits entschieden (auch wenn dagegen)
+        self._key = None
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+        self.lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.state in (JOB_RUNNING, JOB_PAUSED)
+
+    # Schlüssel zum Erkennen doppelter Aufträge (wird erst bei Bedarf berechnet)
+    @property
+    def key(self):
+        if self._key is None:
+            if self.path is not None:
+                self._key = ('file', os.path.abspath(self.path))
+            else:
+                self._key = ('text', KeystrokePlanCache.text_hash(self.text))
+        return self._key
+
+    # Abgebrochene Aufträge bleiben nur kurz fortsetzbar, sonst tippt ein viel späterer
+    # Tastendruck noch alten Inhalt der Zwischenablage
+    @property
+    def resumable(self):
+        if self.offset >= self.length:
+            return False
+        if self.state == JOB_CANCELLED:
+            return time.perf_counter() - self.cancelled_at < float(config.get('resume_timeout', 300))
+        return self.state == JOB_PAUSED
+
+    def pause(self):
+        with self.lock:
+            if self.state != JOB_RUNNING:
+                return False
+            self.state = JOB_PAUSED
+            self.resume_event.clear()
+        return True
+
+    def resume(self):
+        with self.lock:
+            if self.state != JOB_PAUSED:
+                return False
+            self.state = JOB_RUNNING
+            self.resume_event.set()
+        return True
+
+    # Abgebrochenen Auftrag ab dem Offset erneut starten
+    def restart(self):
+        with self.lock:
+            if self.state != JOB_CANCELLED or not self.resumable:
+                return False
+            self.state = JOB_RUNNING
+            self.trace_sampled = False  # Neuer Lauf, neue Sampling-Entscheidung
+            self.resume_event.set()
+        return True
+
+    def cancel(self):
+        with self.lock:
+            if not self.active:
+                return False
+            self.state = JOB_CANCELLED
+            self.cancelled_at = time.perf_counter()
+            self.resume_event.set()
+        return True
+
+    def finish(self):
+        with self.lock:
+            if self.state == JOB_RUNNING:
+                self.state = JOB_DONE
+
+    # Wartet, bis der Auftrag fortgesetzt oder abgebrochen wird (auch per ESC)
+    def wait_while_paused(self):
+        start = time.perf_counter()
+        while not self.resume_event.wait(0.05):
+            if stop_typing_event.is_set():
+                break
+        return time.perf_counter() - start
+
+    # Tastenpläne ab dem Offset und Startindex im ersten Plan: kurze Texte aus dem Plan-Cache
+    # (beim Fortsetzen derselbe Plan des ganzen Textes), lange Texte und Dateien gestreamt
+    def plans(self, backend):
+        chunk_size = max(1, int(config.get('stream_chunk_size', 4096)))
+        if self.path is not None:
+            return iter_streamed_plans(iter_file_chunks(self.path, chunk_size, self.offset), backend), 0
+        if self.length - self.offset > config.get('streaming_threshold', 64 * 1024):
+            return iter_streamed_plans(iter_text_chunks(self.text, chunk_size, self.offset), backend), 0
+        return [get_keystroke_plan(self.text, backend)], self.offset
+
+# Zuletzt gestarteter Tippauftrag (bleibt nach Abbruch zum Fortsetzen erhalten)
+current_job = None
+
+# Funktion zum Schreiben von Text
+def type_text(text):
+    run_typing_job(TypingJob(text=text))
+
+def run_typing_job(job):
+    global current_job
+    current_job = job
+    if job.settings is None:
+        job.settings = resolve_job_settings()
+    backend = output_backend
+    stop_typing_event.clear()
+    typing_active.set()
+    set_tray_state('typing')
+    plans, start = job.plans(backend)
+    try:
+        _type_plans(job, plans, start, backend)
+    finally:
+        # Generator schließen, damit ein laufender Erzeuger sofort endet
+        if hasattr(plans, 'close'):
+            plans.close()
+        if job.active:
+            # Unerwarteter Fehler: Offset bleibt zum Fortsetzen erhalten
+            job.cancel()
+        finish_trace(job, profile=job.settings['profile'], backend=backend.name)
+        typing_active.clear()
+        set_tray_state('idle')
+
+def _type_plans(job, plans, start, backend):
+    global last_typing_stats
+    resumed = job.offset > 0
+    settings = job.settings
+    # Nur ein Präfix loggen und nur, wenn das Logging überhaupt aktiv ist
+    if logger.isEnabledFor(logging.INFO):
+        if settings['profile']:
+            logger.info("Verwende Profil: %s", settings['profile'])
+        if resumed:
+            logger.info("Setze Tippvorgang fort ab Zeichen %d von %d", job.offset, job.length)
+        else:
+            logger.info("Tippe Text: %s%s (%d Zeichen)", job.prefix[:50], '...' if job.length > 50 else '', job.length)
+    
+    # Zeige Vorschau-Fenster an
+    trace = job.trace
+    if settings['show_preview_window'] and not resumed:
+        show_preview_window(job.prefix, job.length)
+        if trace is not None:
+            trace.mark('preview')
+    
+    delay = settings['typing_delay']
+    batch_size = max(1, int(settings['typing_batch_size']))
+    batch_delay = settings['batch_delay']
+    # Ohne batch_delay wird jeder Tastendruck einzeln getaktet, Blöcke nur mit eigener Blockpause
+    if batch_delay is None and delay > 0:
+        batch_size = 1
+    pacer = TypingPacer(delay if batch_delay is None else batch_delay)
+    trace_interval = max(1, int(config.get('trace_batch_interval', 100)))
+    batches = 0
+    typed_chars = 0
+    paused_time = 0.0
+    pacer.start()
+    try:
+        for plan in plans:
+            while start < len(plan):
+                # Pause und Abbruch werden zwischen den Blöcken geprüft (Latenz höchstens ein Block)
+                if job.state == JOB_PAUSED:
+                    logger.info("Tippvorgang pausiert bei Zeichen %d von %d", job.offset, job.length)
+                    set_tray_state('paused')
+                    if trace is not None:
+                        trace.mark('paused', offset=job.offset)
+                    paused_time += job.wait_while_paused()
+                    pacer.rebase()
+                    set_tray_state('typing')
+                    if trace is not None:
+                        trace.mark('resumed')
+                if stop_typing_event.is_set() or job.state == JOB_CANCELLED:
+                    break
+                stop = min(start + batch_size, len(plan))
+                backend.send(plan, start, stop)
+                if not typed_chars:
+                    if job.hotkey_time is not None and not resumed:
+                        metrics.hotkey_latency.observe(time.perf_counter() - job.hotkey_time)
+                    if trace is not None:
+                        trace.mark('first_key')
+                batches += 1
+                if trace is not None and batches % trace_interval == 0:
+                    trace.mark('batch', batch=batches, offset=job.offset + stop - start)
+                typed_chars += stop - start
+                job.offset += stop - start
+                pacer.wait(1)
+                start = stop
+            if stop_typing_event.is_set() or job.state == JOB_CANCELLED:
+                break
+            start = 0
+    finally:
+        pacer.stop()
+    elapsed = time.perf_counter() - pacer.start_time - paused_time
+    
+    if stop_typing_event.is_set():
+        job.cancel()
+    else:
+        job.finish()
+    metrics.observe_job(job.state, typed_chars, elapsed)
+    
+    last_typing_stats = {
+        'chars': typed_chars,
+        'duration': elapsed,
+        'chars_per_sec': typed_chars / elapsed if elapsed > 0 else 0.0,
+        'target_chars_per_sec': 1.0 / delay if batch_delay is None and delay > 0 else None,
+        'resyncs': pacer.resyncs,
+        'state': job.state,
+        'profile': settings['profile'],
+        'offset': job.offset,
+    }
+    if job.state == JOB_CANCELLED:
+        logger.info("Tippvorgang abgebrochen bei Zeichen %d von %d", job.offset, job.length)
+    logger.info("Tippvorgang beendet: %d Zeichen in %.3fs (%.0f Zeichen/s, Ziel %.0f %s/s)",
+                typed_chars, elapsed, last_typing_stats['chars_per_sec'], pacer.target_rate,
+                'Zeichen' if batch_delay is None else 'Blöcke')
+    
+    if settings['enter_key_enabled'] and job.state == JOB_DONE:
+        backend.press_key('enter')
+        if trace is not None:
+            trace.mark('enter')
+        logger.info("Enter-Taste gedrückt")
+
+# Zugriff auf die Zwischenablage über austauschbare Backends
+class ClipboardBackend:
+    name = 'basis'
+
+    def paste(self):
+        raise NotImplementedError
+
+    # Schreiben läuft bei allen Backends über pyperclip (selten, nicht zeitkritisch)
+    def copy(self, text):
+        pyperclip.copy(text)
+
+# pyperclip (unter Linux ein xclip/xsel-Prozess pro Aufruf)
+class PyperclipClipboard(ClipboardBackend):
+    name = 'pyperclip'
+
+    def paste(self):
+        return pyperclip.paste()
+
+# Liest über das Tk-Hauptfenster des UI-Threads, das eine dauerhafte Verbindung zum
+# Fenstersystem hält; fällt bei Fehlern auf pyperclip zurück
+class TkClipboard(ClipboardBackend):
+    name = 'tk'
+    TIMEOUT = 1.0
+
+    def __init__(self):
+        self.fallback = PyperclipClipboard()
+        self.available = True
+
+    def paste(self):
+        if self.available:
+            try:
+                return call_on_ui(self.read, timeout=self.TIMEOUT)
+            except TimeoutError as e:
+                logger.debug("Tk-Zwischenablage antwortet nicht, verwende pyperclip: %s", e)
+            except RuntimeError as e:
+                # Ohne UI-Thread (z.B. kein Display) dauerhaft auf pyperclip ausweichen
+                logger.warning("Tk-Zwischenablage nicht verfügbar, verwende pyperclip: %s", e)
+                self.available = False
+        return self.fallback.paste()
+
+    @staticmethod
+    def read():
+        if ui_root is None:
+            raise RuntimeError("UI-Thread läuft nicht")
+        try:
+            # UTF8_STRING liefert unter X11 Umlaute und Emoji korrekt
+            return ui_root.clipboard_get(type='UTF8_STRING')
+        except tk.TclError:
+            try:
+                return ui_root.clipboard_get()
+            except tk.TclError:
+                return ''  # Leer oder kein Text
+
+clipboard_backends = {
+    PyperclipClipboard.name: PyperclipClipboard,
+    TkClipboard.name: TkClipboard,
+}
+
+# Funktion zum Erzeugen des konfigurierten Zwischenablage-Backends
+def create_clipboard_backend(name):
+    if name == 'auto':
+        # Unter Windows ist pyperclip bereits ein direkter API-Aufruf
+        name = 'pyperclip' if sys.platform == 'win32' else 'tk'
+    backend_class = clipboard_backends.get(name)
+    if backend_class is None:
+        logger.warning("Unbekanntes Zwischenablage-Backend '%s', verwende pyperclip", name)
+        backend_class = PyperclipClipboard
+    return backend_class()
+
+clipboard_backend = create_clipboard_backend(config.get('clipboard_backend', 'auto'))
+
+# Verlauf der Zwischenablage als Ring: begrenzt nach Anzahl und Bytes, älteste Einträge zuerst raus
+class ClipboardHistory:
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = deque()  # (Text, Größe in Bytes), neuester Eintrag rechts
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def add(self, text):
+        size = len(text.encode('utf-8', 'surrogatepass'))
+        if size > self.max_bytes:
+            return False
+        with self.lock:
+            if self.entries and self.entries[-1][0] == text:
+                return False
+            self.entries.append((text, size))
+            self.total_bytes += size
+            self._shrink()
+        return True
+
+    # Neue Grenzen übernehmen; überzählige ältere Einträge fallen sofort weg
+    def resize(self, max_entries, max_bytes):
+        with self.lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._shrink()
+
+    def _shrink(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            self.total_bytes -= self.entries.popleft()[1]
+
+    # Eintrag nach Alter (0 = neuester)
+    def get(self, index):
+        with self.lock:
+            if 0 <= index < len(self.entries):
+                return self.entries[-1 - index][0]
+        return None
+
+    def snapshot(self):
+        with self.lock:
+            return [text for text, _ in reversed(self.entries)]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+# Zählt Besitzerwechsel der X11-Zwischenablage über XFixes (jedes Kopieren setzt den Besitzer
+# neu); ersetzt unter X11 die Änderungsnummer, die Windows selbst mitführt
+class X11SelectionWatcher:
+    XFixesSetSelectionOwnerNotifyMask = 1
+
+    def __init__(self):
+        self.sequence = None  # None = nicht geöffnet
+        self.display = None
+
+    def open(self):
+        import ctypes
+        import ctypes.util
+        x11 = ctypes.CDLL(ctypes.util.find_library('X11') or 'libX11.so.6')
+        xfixes = ctypes.CDLL(ctypes.util.find_library('Xfixes') or 'libXfixes.so.3')
+        x11.XOpenDisplay.argtypes = (ctypes.c_char_p,)
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XDefaultRootWindow.argtypes = (ctypes.c_void_p,)
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XInternAtom.argtypes = (ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int)
+        x11.XInternAtom.restype = ctypes.c_ulong
+        for function in (x11.XConnectionNumber, x11.XPending, x11.XFlush, x11.XCloseDisplay):
+            function.argtypes = (ctypes.c_void_p,)
+        x11.XNextEvent.argtypes = (ctypes.c_void_p, ctypes.c_void_p)
+        xfixes.XFixesQueryExtension.argtypes = (ctypes.c_void_p, ctypes.POINTER(ctypes.c_int),
+                                                ctypes.POINTER(ctypes.c_int))
+        xfixes.XFixesSelectSelectionInput.argtypes = (ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong,
+                                                      ctypes.c_ulong)
+        display = x11.XOpenDisplay(None)
+        if not display:
+            raise OSError("keine Verbindung zum X-Server")
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not xfixes.XFixesQueryExtension(display, ctypes.byref(event_base), ctypes.byref(error_base)):
+            x11.XCloseDisplay(display)
+            raise OSError("XFixes nicht verfügbar")
+        clipboard = x11.XInternAtom(display, b'CLIPBOARD', 0)
+        xfixes.XFixesSelectSelectionInput(display, x11.XDefaultRootWindow(display), clipboard,
+                                          self.XFixesSetSelectionOwnerNotifyMask)
+        x11.XFlush(display)
+        self.x11 = x11
+        self.display = display
+        self.fd = x11.XConnectionNumber(display)
+        self.notify_type = event_base.value  # XFixesSelectionNotify = Basis + 0
+        self.event = (ctypes.c_int * 48)()  # Platz für ein XEvent (24 longs)
+        self.sequence = 0
+
+    # Wartet höchstens timeout Sekunden auf einen Besitzerwechsel (True = Zwischenablage geändert)
+    def wait(self, timeout):
+        if not self.x11.XPending(self.display):
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if not ready:
+                return False
+        changed = False
+        while self.x11.XPending(self.display):
+            self.x11.XNextEvent(self.display, self.event)
+            changed = changed or self.event[0] == self.notify_type
+        if changed:
+            self.sequence += 1
+        return changed
+
+    def close(self):
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+        self.display = None
+        self.sequence = None
+
+x11_selection_watcher = X11SelectionWatcher()
+
+# Funktion zum Lesen der Änderungsnummer der Zwischenablage (Windows bzw. X11 mit XFixes,
+# sonst None)
+def clipboard_sequence():
+    if sys.platform != 'win32':
+        return x11_selection_watcher.sequence
+    try:
+        import ctypes
+        return ctypes.windll.user32.GetClipboardSequenceNumber()
+    except Exception:
+        return None
+
+# Liest die Zwischenablage im Hintergrund, damit der Hotkey ohne Subprozess-Aufruf
+# sofort aus dem Speicher tippen kann. Gelesen wird nur nach einem Änderungssignal; ohne
+# Signal (weder Windows noch X11 mit XFixes) läuft der Monitor nicht, da sein Wert dann
+# nie als aktuell gelten kann
+class ClipboardMonitor:
+    def __init__(self, history):
+        self.history = history
+        self.latest = None
+        self.latest_sequence = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="TypeTool-Clipboard", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.thread = None
+        self.latest = None
+
+    def run(self):
+        watcher = None
+        if sys.platform != 'win32':
+            try:
+                x11_selection_watcher.open()
+                watcher = x11_selection_watcher
+            except (OSError, AttributeError) as e:
+                logger.info("Kein Änderungssignal der Zwischenablage, Vorab-Lesen und Verlauf deaktiviert: %s", e)
+                return
+        try:
+            while True:
+                self.poll()
+                interval = config.get('clipboard_poll_interval', 0.25)
+                if watcher is None:
+                    # Windows: die Änderungsnummer abzufragen kostet keinen Lesezugriff
+                    if self.stop_event.wait(interval):
+                        return
+                    continue
+                while not watcher.wait(interval):
+                    if self.stop_event.is_set():
+                        return
+                if self.stop_event.is_set():
+                    return
+        finally:
+            if watcher is not None:
+                watcher.close()
 
-# Logging konfigurieren
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('typetool.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
+    def poll(self):
+        sequence = clipboard_sequence()
+        if sequence is not None and sequence == self.latest_sequence:
+            return
+        try:
+            text = clipboard_backend.paste()
+        except Exception as e:
+            logger.warning("Zwischenablage konnte nicht gelesen werden: %s", e)
+            return
+        self.latest_sequence = sequence
+        if text != self.latest:
+            self.latest = text
+            if text and text.strip() and self.history.add(text) and tray_icon:
+                tray_icon.update_menu()
 
-# Pfad zur Konfigurationsdatei
-config_file = 'config.json'
+    # Vorab gelesener Inhalt, falls er nachweislich aktuell ist (sonst None). Ohne
+    # Änderungsnummer (alles außer Windows) gibt es keinen sicheren Nachweis: eine Kopie
+    # kurz vor dem Hotkey würde sonst den vorherigen Inhalt tippen lassen
+    def current(self):
+        if not self.running or self.latest is None:
+            return None
+        sequence = clipboard_sequence()
+        if sequence is None or sequence != self.latest_sequence:
+            return None
+        return self.latest
 
-# Standardkonfiguration
-default_config = {
-    'enter_key_enabled': False,  # Standardmäßig deaktiviert
-    'hotkey': 'ctrl+b',
-    'toggle_enter_hotkey': 'ctrl+alt+b',
-    'typing_delay': 0.001,  # Schnellere Tippgeschwindigkeit
-    'logging_enabled': True
-}
+clipboard_history = ClipboardHistory(config.get('clipboard_history_size', 10),
+                                     config.get('clipboard_history_max_bytes', 1024 * 1024))
+clipboard_monitor = ClipboardMonitor(clipboard_history)
 
-# Funktion zum Laden der Konfiguration
-def load_config():
-    if os.path.exists(config_file):
-        with open(config_file, 'r', encoding='utf-8') as file:
-            loaded_config = json.load(file)
-            # Merge mit default_config um neue Einstellungen hinzuzufügen
-            merged_config = default_config.copy()
-            merged_config.update(loaded_config)
-            return merged_config
-    else:
-        return default_config
+# Funktion zum Lesen der Zwischenablage (vorab gelesener Wert, sonst direkt)
+def read_clipboard():
+    start = time.perf_counter()
+    text = clipboard_monitor.current()
+    if text is None:
+        text = clipboard_backend.paste()
+    metrics.clipboard_fetch.observe(time.perf_counter() - start)
+    return text
 
-# Funktion zum Speichern der Konfiguration
-def save_config(config):
-    with open(config_file, 'w', encoding='utf-8') as file:
-        json.dump(config, file, indent=2, ensure_ascii=False)
+# Planer für Tippaufträge: ein einziger, langlebiger Worker-Thread arbeitet eine
+# Warteschlange ab. Was bei einem neuen Auftrag während eines laufenden passiert,
+# bestimmt typing_policy (cancel = abbrechen, queue = einreihen, replace = ersetzen)
+TYPING_POLICIES = ('cancel', 'queue', 'replace')
 
-# Konfiguration laden
-config = load_config()
-press_enter = config.get('enter_key_enabled', False)
-hotkey = config.get('hotkey', 'ctrl+b')
-toggle_enter_hotkey = config.get('toggle_enter_hotkey', 'ctrl+alt+b')
-typing_delay = config.get('typing_delay', 0.01)
-tray_icon = None  # Globale Variable für das Tray-Icon
-running = True
+class TypingScheduler:
+    def __init__(self):
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.worker = None
+        self.running = False
+        self.current = None
+        self.completed = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
 
-# Funktion zum Erstellen des Tray-Icons
-def create_image():
-    width = 64
-    height = 64
-    image = Image.new('RGB', (width, height), (255, 255, 255))
-    dc = ImageDraw.Draw(image)
-    font = ImageFont.truetype("arial", 14)
-    text = "Type\nTool"
-    text_bbox = dc.textbbox((0, 0), text, font=font)
-    text_width = text_bbox[2] - text_bbox[0]
-    text_height = text_bbox[3] - text_bbox[1]
-    text_x = (width - text_width) // 2
-    text_y = (height - text_height) // 2
-    dc.text((text_x, text_y), text, fill='black', font=font, align="center")
-    return image
+    @property
+    def policy(self):
+        policy = config.get('typing_policy', 'cancel')
+        return policy if policy in TYPING_POLICIES else 'cancel'
 
-# Event zum Abbrechen des Tippvorgangs
-stop_typing_event = threading.Event()
+    @property
+    def busy(self):
+        return self.current is not None or bool(self.pending)
 
-# Funktion zum Schreiben von Text (angepasst mit konfigurierbarer Geschwindigkeit)
-def type_text(text):
-    stop_typing_event.clear()
-    logger.info(f"Tippe Text: {text[:50]}{'...' if len(text) > 50 else ''}")
-    
-    # Zeige Vorschau-Fenster an
-    if config.get('show_preview_window', True):
-        show_preview_window(text)
-    
-    for char in text:
-        if stop_typing_event.is_set():
-            break
-        keyboard.write(char)
-        time.sleep(typing_delay)  # Konfigurierbare Geschwindigkeit
-    if press_enter and not stop_typing_event.is_set():
-        keyboard.press_and_release('enter')
-        logger.info("Enter-Taste gedrückt")
+    @property
+    def depth(self):
+        return len(self.pending)
+
+    def start(self):
+        with self.condition:
+            if self.worker is not None and self.worker.is_alive():
+                return
+            self.running = True
+            self.worker = threading.Thread(target=self.run, name="TypeTool-Worker", daemon=True)
+            self.worker.start()
+
+    def stop(self, timeout=2):
+        with self.condition:
+            self.running = False
+            self.pending.clear()
+            self.condition.notify_all()
+            worker = self.worker
+            self.worker = None
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout)
+
+    # Neuen Auftrag annehmen; delay gibt dem Zielfenster Zeit, den Fokus zu bekommen
+    def submit(self, job, delay=0.0):
+        # Die Kalibrierung tippt am Scheduler vorbei und braucht das Zielfeld für sich allein
+        if calibration_active.is_set():
+            with self.condition:
+                self.rejected += 1
+            logger.warning("Kalibrierung läuft, Tippauftrag abgelehnt")
+            show_popup("Kalibrierung läuft!")
+            return False
+        # Ohne Verzögerung gilt das Fenster, das beim Hotkey aktiv ist; sonst wird
+        # das Profil erst beim Start ermittelt (der Fokus wechselt noch)
+        if not delay and job.settings is None:
+            job.settings = resolve_job_settings()
+        # Genau eine Sampling-Entscheidung pro Auftrag (beim Hotkey schon in toggle_typing)
+        if not job.trace_sampled:
+            job.trace = start_trace()
+            job.trace_sampled = True
+        job.submitted_at = time.perf_counter()
+        job.not_before = job.submitted_at + max(0.0, delay)
+        with self.condition:
+            if job.trace is not None:
+                job.trace.mark('queued', depth=len(self.pending), delay_ms=round(delay * 1000, 3))
+            if config.get('typing_coalesce', True) and self.is_duplicate(job):
+                self.coalesced += 1
+                logger.info("Doppelter Tippauftrag verworfen (%d Zeichen)", job.length)
+                return False
+            policy = self.policy
+            if policy == 'replace':
+                # Wartende Aufträge verwerfen und den laufenden abbrechen
+                self.pending.clear()
+                if self.current is not None:
+                    stop_typing_event.set()
+                    self.current.cancel()
+            elif policy == 'cancel' and self.busy:
+                self.rejected += 1
+                return False
+            if len(self.pending) >= max(1, int(config.get('typing_queue_size', 10))):
+                self.rejected += 1
+                logger.warning("Tippwarteschlange voll, Auftrag verworfen")
+                return False
+            self.pending.append(job)
+            self.condition.notify_all()
+            depth = len(self.pending)
+        self.start()
+        if depth > 1 or self.current is not None:
+            logger.info("Tippauftrag eingereiht (Warteschlange: %d)", depth)
+        update_tray_title()
+        return True
+
+    # Gleicher Inhalt wartet schon oder wird gerade getippt
+    def is_duplicate(self, job):
+        if self.current is not None and self.current.active and self.current.key == job.key:
+            return True
+        return any(pending is job or pending.key == job.key for pending in self.pending)
+
+    # Wartende Aufträge verwerfen (liefert die Anzahl)
+    def clear(self):
+        with self.condition:
+            dropped = len(self.pending)
+            self.pending.clear()
+            self.condition.notify_all()
+        if dropped:
+            update_tray_title()
+        return dropped
+
+    def wait_idle(self, timeout=None):
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.busy, timeout)
 
-# Funktion zum Starten des Tippvorgangs in einem Thread
-typing_thread = None
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                job = self.pending[0]
+                remaining = job.not_before - time.perf_counter()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+                self.pending.popleft()
+                self.current = job
+                depth = len(self.pending)
+            # Wartezeit ab dem frühestmöglichen Start (ohne absichtliche Verzögerung)
+            wait = time.perf_counter() - job.not_before
+            self.last_wait = wait
+            self.max_wait = max(self.max_wait, wait)
+            logger.info("Tippauftrag gestartet nach %.0f ms Wartezeit (Warteschlange: %d)", wait * 1000, depth)
+            if job.trace is not None:
+                job.trace.mark('started', wait_ms=round(wait * 1000, 3))
+            update_tray_title()
+            try:
+                run_typing_job(job)
+            except Exception as e:
+                logger.error("Fehler beim Tippen: %s", e)
+            finally:
+                with self.condition:
+                    self.current = None
+                    self.completed += 1
+                    self.condition.notify_all()
+                update_tray_title()
+
+    def stats(self):
+        return {
+            'policy': self.policy,
+            'depth': self.depth,
+            'busy': self.busy,
+            'completed': self.completed,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'last_wait_ms': self.last_wait * 1000,
+            'max_wait_ms': self.max_wait * 1000,
+        }
 
+typing_scheduler = TypingScheduler()
+
+# Funktion zum Starten bzw. Abbrechen des Tippvorgangs per Hotkey
 def toggle_typing():
-    global typing_thread
-    if typing_thread and typing_thread.is_alive():
-        stop_typing_event.set()
-        logger.info("Tippvorgang abgebrochen")
+    hotkey_time = time.perf_counter()
+    if typing_scheduler.busy and typing_scheduler.policy == 'cancel':
+        cancel_typing()
     else:
-        stop_typing_event.clear()
         try:
-            text = pyperclip.paste()
+            trace = start_trace(hotkey_time)
+            if trace is not None:
+                trace.mark('hotkey')
+            text = read_clipboard()
+            if trace is not None:
+                trace.mark('clipboard_read')
             if not text or not text.strip():
                 logger.warning("Zwischenablage ist leer oder enthält nur Leerzeichen")
                 show_popup("Zwischenablage ist leer!")
                 return
-            typing_thread = threading.Thread(target=type_text, args=(text,))
-            typing_thread.start()
+            start_typing(text, hotkey_time=hotkey_time, trace=trace)
         except pyperclip.PyperclipException as e:
-            logger.error(f"Fehler beim Zugriff auf die Zwischenablage: {e}")
+            logger.error("Fehler beim Zugriff auf die Zwischenablage: %s", e)
             show_popup("Fehler beim Zugriff auf Zwischenablage!")
 
+# Funktion zum Tippen eines älteren Eintrags aus dem Verlauf (1 = vorletzter Eintrag)
+def type_history_entry(index, delay=0.0):
+    text = clipboard_history.get(index)
+    if text is None:
+        show_popup("Kein Eintrag im Verlauf!")
+        return
+    # Verzögerung gibt den Fokus erst an das Zielfenster zurück (z.B. nach dem Tray-Menü)
+    start_typing(text, delay)
+
+def start_typing(text, delay=0.0, hotkey_time=None, trace=None):
+    job = TypingJob(text=text)
+    job.hotkey_time = hotkey_time
+    job.trace = trace
+    job.trace_sampled = hotkey_time is not None
+    return typing_scheduler.submit(job, delay)
+
+def start_typing_file(path, delay=0.0):
+    return typing_scheduler.submit(TypingJob(path=path), delay)
+
+# Funktion zum Abbrechen des laufenden (auch pausierten) Tippvorgangs samt Warteschlange
+def cancel_typing(icon=None, item=None):
+    job = current_job
+    # ESC ist global gebunden: ohne laufenden oder wartenden Auftrag nichts tun
+    if not typing_scheduler.busy and (job is None or not job.active) and not calibration_active.is_set():
+        return
+    stop_typing_event.set()
+    if job is not None:
+        job.cancel()
+    dropped = typing_scheduler.clear()
+    logger.info("Tippvorgang abgebrochen%s", f" ({dropped} wartende Aufträge verworfen)" if dropped else "")
+
+# Funktion zum Pausieren bzw. Fortsetzen (Hotkey und Tray-Menü); ein abgebrochener
+# Auftrag wird ab dem zuletzt gesendeten Zeichen neu gestartet
+def toggle_pause(icon=None, item=None):
+    job = current_job
+    if job is None:
+        return
+    if job.pause():
+        show_popup("Tippvorgang pausiert")
+    elif job.resume():
+        logger.info("Tippvorgang fortgesetzt ab Zeichen %d von %d", job.offset, job.length)
+    elif not typing_scheduler.busy and job.restart():
+        # Aus dem Tray-Menü erst den Fokus an das Zielfenster zurückgeben
+        typing_scheduler.submit(job, 0.5 if icon is not None else 0.0)
+
 # Funktion zum Beenden des Programms
 def cleanup_and_exit():
     global running
+    # Nur einmal aufräumen (wird auch von atexit aufgerufen)
+    if not running:
+        return
     running = False
     logger.info("Programm wird beendet...")
     
+    # Ausstehende Konfigurationsänderungen schreiben
+    config_watcher.stop()
+    config_store.flush()
+    
     # Entferne alle Hotkeys
     try:
         keyboard.unhook_all()
         logger.info("Alle Hotkeys entfernt")
     except Exception as e:
-        logger.error(f"Fehler beim Entfernen der Hotkeys: {e}")
+        logger.error("Fehler beim Entfernen der Hotkeys: %s", e)
     
-    # Beende Tray-Icon
+    # Beende Tray-Icon und UI-Thread
     if tray_icon:
         tray_icon.stop()
+    stop_ui_thread()
     
-    # Entferne Lock-Datei
-    try:
-        if os.path.exists('typetool.lock'):
-            os.remove('typetool.lock')
-            logger.info("Lock-Datei entfernt")
-    except Exception as e:
-        logger.error(f"Fehler beim Entfernen der Lock-Datei: {e}")
+    # Fensterüberwachung beenden und Metriken ein letztes Mal schreiben
+    active_window_monitor.stop()
+    metrics_exporter.stop()
+    
+    # IPC-Server beenden und Lock freigeben
+    if ipc_server:
+        ipc_server.stop()
+    release_instance_lock()
     
     logger.info("Programm beendet")
+    stop_tracing()
+    stop_logging()
     sys.exit(0)
 
 def on_quit(icon, item):
@@ -162,11 +2591,11 @@ def toggle_enter(icon=None, item=None):
     global press_enter
     press_enter = not press_enter
     config['enter_key_enabled'] = press_enter
-    save_config(config)
+    config_store.save()
     if tray_icon:
         update_menu(tray_icon)
     show_popup(f"Enter nach Text: {'An' if press_enter else 'Aus'}")
-    logger.info(f"Enter-Taste umgeschaltet: {'An' if press_enter else 'Aus'}")
+    logger.info("Enter-Taste umgeschaltet: %s", 'An' if press_enter else 'Aus')
 
 # Funktion zum Ändern der Hotkeys (ohne Neustart)
 def change_hotkey(icon=None, item=None):
@@ -203,20 +2632,12 @@ def change_hotkey(icon=None, item=None):
             return "break"
 
         def save_new_hotkeys():
-            global hotkey, toggle_enter_hotkey
             new_hotkey_value = new_hotkey.get()
             new_toggle_enter_hotkey_value = new_toggle_enter_hotkey.get()
-            if new_hotkey_value:
-                keyboard.remove_hotkey(hotkey)
-                hotkey = new_hotkey_value
-                config['hotkey'] = hotkey
-                keyboard.add_hotkey(hotkey, toggle_typing)
-            if new_toggle_enter_hotkey_value:
-                keyboard.remove_hotkey(toggle_enter_hotkey)
-                toggle_enter_hotkey = new_toggle_enter_hotkey_value
-                config['toggle_enter_hotkey'] = toggle_enter_hotkey
-                keyboard.add_hotkey(toggle_enter_hotkey, toggle_enter)
-            save_config(config)
+            rebind_hotkeys(new_hotkey_value, new_toggle_enter_hotkey_value)
+            config['hotkey'] = hotkey
+            config['toggle_enter_hotkey'] = toggle_enter_hotkey
+            config_store.save()
             root.destroy()
             show_popup("Hotkeys erfolgreich geändert!")
 
@@ -224,7 +2645,12 @@ def change_hotkey(icon=None, item=None):
             new_hotkey.set(default_config['hotkey'])
             new_toggle_enter_hotkey.set(default_config['toggle_enter_hotkey'])
 
-        root = tk.Tk()
+        # Dialog nur einmal öffnen, bei erneutem Aufruf nach vorne holen
+        if focus_ui_window('hotkey_dialog'):
+            return
+
+        root = tk.Toplevel(ui_root)
+        ui_windows['hotkey_dialog'] = root
         root.title("Hotkeys ändern")
         root.geometry("400x340")
         root.configure(bg="#f0f0f0")
@@ -235,7 +2661,7 @@ def change_hotkey(icon=None, item=None):
         label_hotkey = tk.Label(root, text="Neuer Hotkey:", bg="#f0f0f0", font=("Helvetica", 12))
         label_hotkey.pack(pady=10)
 
-        new_hotkey = tk.StringVar(value=hotkey)
+        new_hotkey = tk.StringVar(root, value=hotkey)
         entry_hotkey = tk.Entry(root, textvariable=new_hotkey, font=("Helvetica", 12))
         entry_hotkey.pack(pady=5)
         entry_hotkey.focus_set()
@@ -244,7 +2670,7 @@ def change_hotkey(icon=None, item=None):
         label_toggle_enter_hotkey = tk.Label(root, text="Hotkey für Enter drücken:", bg="#f0f0f0", font=("Helvetica", 12))
         label_toggle_enter_hotkey.pack(pady=10)
 
-        new_toggle_enter_hotkey = tk.StringVar(value=toggle_enter_hotkey)
+        new_toggle_enter_hotkey = tk.StringVar(root, value=toggle_enter_hotkey)
         entry_toggle_enter_hotkey = tk.Entry(root, textvariable=new_toggle_enter_hotkey, font=("Helvetica", 12))
         entry_toggle_enter_hotkey.pack(pady=5)
         entry_toggle_enter_hotkey.bind('<KeyPress>', on_entry_toggle_enter_hotkey)
@@ -255,9 +2681,7 @@ def change_hotkey(icon=None, item=None):
         button_reset = tk.Button(root, text="Auf Standard zurücksetzen", command=reset_to_default, font=("Helvetica", 12), bg="#f44336", fg="white")
         button_reset.pack(pady=5)
 
-        root.mainloop()
-
-    threading.Thread(target=show_hotkey_window, daemon=True).start()
+    run_on_ui(show_hotkey_window)
 
 # Funktion zum Einstellen der Tippgeschwindigkeit
 def change_typing_speed(icon=None, item=None):
@@ -269,18 +2693,22 @@ def change_typing_speed(icon=None, item=None):
                     global typing_delay
                     typing_delay = new_delay
                     config['typing_delay'] = typing_delay
-                    save_config(config)
+                    config_store.save()
                     show_popup(f"Tippgeschwindigkeit geändert: {typing_delay}s")
-                    logger.info(f"Tippgeschwindigkeit geändert: {typing_delay}s")
+                    logger.info("Tippgeschwindigkeit geändert: %ss", typing_delay)
                     root.destroy()
                 else:
                     show_popup("Bitte einen Wert zwischen 0.001 und 1.0 eingeben!")
             except ValueError:
                 show_popup("Bitte eine gültige Zahl eingeben!")
 
-        root = tk.Tk()
+        if focus_ui_window('speed_dialog'):
+            return
+
+        root = tk.Toplevel(ui_root)
+        ui_windows['speed_dialog'] = root
         root.title("Tippgeschwindigkeit ändern")
-        root.geometry("300x200")
+        root.geometry("420x230")
         root.configure(bg="#f0f0f0")
         root.resizable(False, False)
 
@@ -288,11 +2716,28 @@ def change_typing_speed(icon=None, item=None):
                         bg="#f0f0f0", font=("Helvetica", 12))
         label.pack(pady=20)
 
-        speed_var = tk.StringVar(value=str(typing_delay))
+        speed_var = tk.StringVar(root, value=str(typing_delay))
         entry = tk.Entry(root, textvariable=speed_var, font=("Helvetica", 12), width=10)
         entry.pack(pady=10)
         entry.focus_set()
 
+        # Umrechnung in Zeichen pro Sekunde und zuletzt gemessener Wert
+        rate_label = tk.Label(root, text="", bg="#f0f0f0", font=("Helvetica", 9), fg="#555555")
+        rate_label.pack()
+
+        def update_rate_label(*args):
+            try:
+                target = f"= {1.0 / float(speed_var.get()):.0f} Zeichen/s"
+            except (ValueError, ZeroDivisionError):
+                target = ""
+            achieved = last_typing_stats.get('chars_per_sec')
+            if achieved:
+                target += f" (zuletzt erreicht: {achieved:.0f} Zeichen/s)"
+            rate_label.config(text=target)
+
+        speed_var.trace_add('write', update_rate_label)
+        update_rate_label()
+
         button_save = tk.Button(root, text="Speichern", command=save_speed, 
                                font=("Helvetica", 12), bg="#4CAF50", fg="white")
         button_save.pack(pady=10)
@@ -300,23 +2745,255 @@ def change_typing_speed(icon=None, item=None):
         root.bind('<Return>', lambda e: save_speed())
         root.bind('<Escape>', lambda e: root.destroy())
 
-        root.mainloop()
+    run_on_ui(show_speed_window)
+
+# Kalibrierung der Tippgeschwindigkeit: tippt einen bekannten Prüftext mit verschiedenen
+# Verzögerungen, liest ihn zurück und sucht per Binärsuche die kleinste Verzögerung,
+# bei der kein Zeichen verloren geht
+CALIBRATION_PROBE = "TypeTool Kalibrierung 0123456789 ÄÖÜ äöü ß @#+-*/ The Quick Brown Fox "
+calibration_thread = None
+
+def calibration_probe(length):
+    return (CALIBRATION_PROBE * (length // len(CALIBRATION_PROBE) + 1))[:length]
+
+# Lokales Testfenster als Stellvertreter für das Zielfeld
+class StandInField:
+    name = 'testfenster'
+    applies_result = False  # Das Tk-Textfeld nimmt jede Geschwindigkeit an, sagt also nichts über das Ziel
+
+    def open(self):
+        call_on_ui(self.open_ui, timeout=2.0)
+
+    def open_ui(self):
+        window = ui_windows.get('calibration_field')
+        if window is None or not window.winfo_exists():
+            window = tk.Toplevel(ui_root)
+            ui_windows['calibration_field'] = window
+            window.title("TypeTool Kalibrierung")
+            window.geometry("520x200")
+            window.text = tk.Text(window, font=("Helvetica", 11), wrap="word")
+            window.text.pack(fill="both", expand=True)
+            window.protocol("WM_DELETE_WINDOW", cancel_typing)
+        window.deiconify()
+        window.lift()
+        window.attributes('-topmost', True)
+        window.text.focus_force()
+
+    def clear(self):
+        call_on_ui(lambda: ui_windows['calibration_field'].text.delete('1.0', 'end'))
+
+    def read(self):
+        return call_on_ui(lambda: ui_windows['calibration_field'].text.get('1.0', 'end-1c'))
+
+    def close(self):
+        window = ui_windows.get('calibration_field')
+        if window is not None:
+            run_on_ui(window.withdraw)
+
+# Fokussiertes Zielfeld; gelesen wird per Strg+A/Strg+C über die Zwischenablage
+class TargetField:
+    name = 'zielfeld'
+    applies_result = True
+    SETTLE_TIMEOUT = 1.0  # Sekunden, die das Ziel zum Kopieren bekommt
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.saved = None
+        self.profile = None
+
+    def open(self):
+        # Profil der Zielanwendung, in dem das Ergebnis gespeichert wird
+        profiles = config.get('profiles')
+        self.profile = match_profile(active_window_monitor.get(), profiles) if profiles else None
+        try:
+            self.saved = clipboard_backend.paste()
+        except pyperclip.PyperclipException:
+            self.saved = None
+
+    def clear(self):
+        self.backend.press_key('ctrl+a')
+        self.backend.press_key('backspace')
+
+    def read(self):
+        # Marker in die Zwischenablage legen, um veraltete Inhalte zu erkennen
+        marker = f"typetool-{secrets.token_hex(8)}"
+        clipboard_backend.copy(marker)
+        self.backend.press_key('ctrl+a')
+        self.backend.press_key('ctrl+c')
+        deadline = time.perf_counter() + self.SETTLE_TIMEOUT
+        while time.perf_counter() < deadline:
+            text = clipboard_backend.paste()
+            if text != marker:
+                return text
+            time.sleep(0.02)
+        return ''
+
+    def close(self):
+        self.clear()
+        if self.saved is not None:
+            clipboard_backend.copy(self.saved)
+
+# Funktion zum Ermitteln der Taktung eines Profils (Blockgröße, batch_delay; globale Werte,
+# vom Profil überschrieben wie bei resolve_job_settings)
+def profile_pacing(profile):
+    settings = {'typing_batch_size': config.get('typing_batch_size', 8), 'batch_delay': config.get('batch_delay')}
+    if profile is not None:
+        settings.update((key, profile[key]) for key in settings if key in profile)
+    return max(1, int(settings['typing_batch_size'])), settings['batch_delay']
+
+# Ein Durchlauf: Feld leeren, Prüftext mit fester Verzögerung pro Zeichen tippen, Ergebnis
+# vergleichen. batch_size wie beim späteren Tippen: 1 ohne batch_delay, sonst Blöcke, deren
+# Abstand der Verzögerung aller Zeichen im Block entspricht
+def calibration_trial(field, backend, plan, probe, delay, batch_size=1):
+    field.clear()
+    time.sleep(0.05)
+    pacer = TypingPacer(delay)
+    pacer.start()
+    try:
+        for start in range(0, len(plan), batch_size):
+            if stop_typing_event.is_set():
+                return False
+            stop = min(start + batch_size, len(plan))
+            backend.send(plan, start, stop)
+            pacer.wait(stop - start)
+    finally:
+        pacer.stop()
+    # Dem Ziel Zeit geben, gepufferte Eingaben zu verarbeiten (z.B. Remote-Sitzungen)
+    time.sleep(0.2)
+    result = field.read()
+    if result != probe:
+        logger.debug("Kalibrierung: %.4fs verliert Zeichen (%d von %d angekommen)", delay, len(result), len(probe))
+        return False
+    return True
+
+# Binärsuche nach der kleinsten fehlerfreien Verzögerung (None = nicht gefunden/abgebrochen)
+def calibrate_typing_delay(field, backend, batch_size=1):
+    probe = calibration_probe(max(10, int(config.get('calibration_probe_length', 200))))
+    plan = get_keystroke_plan(probe, backend)
+    trials = max(1, int(config.get('calibration_trials', 2)))
+    low = float(config.get('calibration_min_delay', 0.001))
+    high = float(config.get('calibration_max_delay', 0.05))
+
+    def passes(delay):
+        ok = all(calibration_trial(field, backend, plan, probe, delay, batch_size) for _ in range(trials))
+        logger.info("Kalibrierung: %.4fs pro Zeichen %s", delay, 'fehlerfrei' if ok else 'mit Verlusten')
+        return ok
+
+    if not passes(high):
+        return None
+    if passes(low):
+        return low
+    for _ in range(max(1, int(config.get('calibration_steps', 6)))):
+        if stop_typing_event.is_set():
+            return None
+        middle = (low + high) / 2
+        if passes(middle):
+            high = middle
+        else:
+            low = middle
+    return None if stop_typing_event.is_set() else high
+
+def run_calibration(field):
+    global typing_delay
+    backend = output_backend
+    typing_active.set()
+    set_tray_state('typing')
+    # Prüftexte und Marker sollen nicht im Verlauf landen
+    monitor_running = clipboard_monitor.running
+    if monitor_running:
+        clipboard_monitor.stop()
+    try:
+        field.open()
+        # Mit der Taktung kalibrieren, die das Zielprofil später auch verwendet
+        batch_size, batch_delay = profile_pacing(getattr(field, 'profile', None))
+        delay = calibrate_typing_delay(field, backend, 1 if batch_delay is None else batch_size)
+    except Exception as e:
+        logger.error("Kalibrierung fehlgeschlagen: %s", e)
+        show_popup("Kalibrierung fehlgeschlagen!")
+        return
+    finally:
+        try:
+            field.close()
+        except Exception as e:
+            logger.debug("Kalibrierfeld konnte nicht geschlossen werden: %s", e)
+        if monitor_running:
+            clipboard_monitor.start()
+        typing_active.clear()
+        set_tray_state('idle')
+    if delay is None:
+        logger.warning("Kalibrierung ohne Ergebnis (abgebrochen oder auch langsam nicht fehlerfrei)")
+        show_popup("Kalibrierung ohne Ergebnis!")
+        return
+    margin = max(0.0, float(config.get('calibration_margin', 0.25)))
+    calibrated_delay = round(min(1.0, delay * (1.0 + margin)), 4)
+    calibration = {
+        'field': field.name,
+        'backend': backend.name,
+        'fastest_delay': round(delay, 5),
+        'margin': margin,
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    # Das Testfenster liefert nur einen Richtwert; die Einstellungen bleiben unverändert
+    if not field.applies_result:
+        calibration['suggested_delay'] = calibrated_delay
+        config['calibration'] = calibration
+        config_store.save()
+        logger.info("Kalibrierung im Testfenster: %.4fs wären möglich, Verzögerung bleibt %.4fs",
+                    calibrated_delay, typing_delay)
+        show_popup(f"Testfenster: {calibrated_delay}s möglich (nicht übernommen, Zielfeld kalibrieren)")
+        return
+    # Im Zielfeld gilt das Ergebnis für das passende Anwendungsprofil, sonst global. Tippt
+    # das Profil in Blöcken, wird die Pause pro Block gespeichert statt der pro Zeichen
+    profile = field.profile
+    target = profile if profile is not None else config
+    if batch_delay is None:
+        key, value = 'typing_delay', calibrated_delay
+    else:
+        key, value = 'batch_delay', round(calibrated_delay * batch_size, 4)
+    target[key] = value
+    target['calibration'] = calibration
+    if profile is None and key == 'typing_delay':
+        typing_delay = calibrated_delay
+    config_store.save()
+    logger.info("Kalibrierung: schnellste fehlerfreie Verzögerung %.4fs, gespeichert %s=%.4fs%s", delay, key, value,
+                f" für Profil {profile.get('name', '?')}" if profile is not None else "")
+    show_popup(f"Kalibriert: {calibrated_delay}s ({1.0 / calibrated_delay:.0f} Zeichen/s)")
+
+# Funktion zum Starten der Kalibrierung (Testfenster oder fokussiertes Zielfeld)
+def start_calibration(target=False):
+    global calibration_thread
+    if typing_scheduler.busy or calibration_active.is_set():
+        show_popup("Es läuft bereits ein Tippvorgang!")
+        return
+    calibration_active.set()
+    stop_typing_event.clear()
+    if target:
+        # Zeit zum Fokussieren des Zielfelds nach dem Schließen des Tray-Menüs
+        show_popup("Kalibrierung startet in 3 s - Zielfeld fokussieren (ESC bricht ab)")
+        field, delay = TargetField(output_backend), 3.0
+    else:
+        field, delay = StandInField(), 0.0
+
+    def run():
+        try:
+            # ESC während der Wartezeit bricht ebenfalls ab
+            if not stop_typing_event.wait(delay):
+                run_calibration(field)
+        finally:
+            calibration_active.clear()
 
-    threading.Thread(target=show_speed_window, daemon=True).start()
+    calibration_thread = threading.Thread(target=run, name="TypeTool-Calibration", daemon=True)
+    calibration_thread.start()
 
 # Funktion zum Umschalten des Loggings
 def toggle_logging(icon=None, item=None):
     global config
     config['logging_enabled'] = not config.get('logging_enabled', True)
-    save_config(config)
+    config_store.save()
     
     # Aktualisiere Logging-Level
-    if config['logging_enabled']:
-        logging.getLogger().setLevel(logging.INFO)
-        logger.info("Logging aktiviert")
-    else:
-        logging.getLogger().setLevel(logging.ERROR)
-        logger.info("Logging deaktiviert")
+    apply_logging_level()
+    logger.info("Logging %s", 'aktiviert' if config['logging_enabled'] else 'deaktiviert')
     
     if tray_icon:
         update_menu(tray_icon)
@@ -326,27 +3003,312 @@ def toggle_logging(icon=None, item=None):
 def toggle_preview(icon=None, item=None):
     global config
     config['show_preview_window'] = not config.get('show_preview_window', True)
-    save_config(config)
+    config_store.save()
     
     if tray_icon:
         update_menu(tray_icon)
     show_popup(f"Vorschau-Fenster: {'An' if config['show_preview_window'] else 'Aus'}")
-    logger.info(f"Vorschau-Fenster umgeschaltet: {'An' if config['show_preview_window'] else 'Aus'}")
+    logger.info("Vorschau-Fenster umgeschaltet: %s", 'An' if config['show_preview_window'] else 'Aus')
+
+# Funktion zum Setzen des Logging-Levels passend zu logging_enabled
+def apply_logging_level():
+    if config.get('logging_enabled', True):
+        logging.getLogger().setLevel(logging.INFO)
+    else:
+        logging.getLogger().setLevel(logging.ERROR)
+
+# Funktion zum Neu-Registrieren geänderter Hotkeys
+def rebind_hotkeys(new_hotkey=None, new_toggle_enter_hotkey=None):
+    global hotkey, toggle_enter_hotkey
+    # Erst den neuen Hotkey binden: schlägt das fehl, bleibt der alte aktiv
+    if new_hotkey and new_hotkey != hotkey:
+        keyboard.add_hotkey(new_hotkey, toggle_typing)
+        try:
+            keyboard.remove_hotkey(hotkey)
+        except (KeyError, ValueError):
+            pass
+        hotkey = new_hotkey
+    if new_toggle_enter_hotkey and new_toggle_enter_hotkey != toggle_enter_hotkey:
+        keyboard.add_hotkey(new_toggle_enter_hotkey, toggle_enter)
+        try:
+            keyboard.remove_hotkey(toggle_enter_hotkey)
+        except (KeyError, ValueError):
+            pass
+        toggle_enter_hotkey = new_toggle_enter_hotkey
+    if tray_icon:
+        tray_icon.title = tray_title()
+
+# Einstellungen mit Hotkeys (werden vor dem Neubinden gemeinsam geprüft)
+HOTKEY_SETTINGS = ('hotkey', 'toggle_enter_hotkey', 'pause_hotkey', 'history_hotkeys')
+LOG_SETTINGS = ('log_file', 'log_max_bytes', 'log_backup_count', 'log_rotate_hours')
+
+# Funktion zum Prüfen von Hotkeys, ohne sie zu binden (Liste der ungültigen)
+def invalid_hotkeys(combinations):
+    invalid = []
+    for combination in combinations:
+        try:
+            if not isinstance(combination, str) or not combination:
+                raise ValueError(combination)
+            keyboard.parse_hotkey(combination)
+        except (ValueError, TypeError, KeyError):
+            invalid.append(combination)
+    return invalid
+
+# Funktion zum Sammeln der Hotkeys aus den geänderten Einstellungen
+def changed_hotkeys(changes):
+    combinations = []
+    for key in HOTKEY_SETTINGS:
+        if key not in changes:
+            continue
+        value = config[key]
+        if key == 'history_hotkeys':
+            combinations.extend(value if isinstance(value, list) else [value])
+        elif value is not None or key != 'pause_hotkey':
+            combinations.append(value)
+    return combinations
+
+# Funktion zum Übernehmen einer extern geänderten config.json (nur geänderte Teile)
+def reload_config():
+    global press_enter, typing_delay, output_backend, clipboard_backend
+    previous_hotkeys = {key: config.get(key) for key in HOTKEY_SETTINGS}
+    try:
+        changes = config_store.reload()
+    except (OSError, ValueError) as e:
+        logger.warning("Geänderte Konfiguration konnte nicht gelesen werden: %s", e)
+        return
+    if not changes:
+        return
+    logger.info("Konfiguration neu geladen, geändert: %s", ', '.join(sorted(changes)))
+    
+    # Alle Hotkeys vor dem Neubinden prüfen; ein ungültiger lässt die bisherige Belegung stehen
+    invalid = invalid_hotkeys(changed_hotkeys(changes))
+    if invalid:
+        logger.error("Ungültige Hotkeys in config.json (%s), bisherige Belegung bleibt aktiv",
+                     ', '.join(map(str, invalid)))
+        show_popup("Ungültige Hotkeys, Belegung unverändert!")
+        for key in HOTKEY_SETTINGS:
+            if key in changes:
+                config[key] = previous_hotkeys[key]
+                del changes[key]
+    if 'hotkey' in changes or 'toggle_enter_hotkey' in changes:
+        rebind_hotkeys(changes.get('hotkey'), changes.get('toggle_enter_hotkey'))
+    if 'pause_hotkey' in changes:
+        register_pause_hotkey()
+    if 'typing_delay' in changes:
+        typing_delay = config['typing_delay']
+    if 'enter_key_enabled' in changes:
+        press_enter = config['enter_key_enabled']
+    if changes.keys() & set(LOG_SETTINGS):
+        setup_logging(config)
+    elif 'logging_enabled' in changes:
+        apply_logging_level()
+    if 'config_hot_reload' in changes:
+        if config['config_hot_reload']:
+            config_watcher.start()
+        else:
+            config_watcher.stop()
+    if 'output_backend' in changes:
+        output_backend.close()
+        output_backend = create_output_backend(config['output_backend'])
+    if 'plan_cache_max_entries' in changes or 'plan_cache_max_bytes' in changes:
+        keystroke_plan_cache.resize(config['plan_cache_max_entries'], config['plan_cache_max_bytes'])
+    if tray_icon and changes.keys() & {'show_preview_window', 'enter_key_enabled'}:
+        update_menu(tray_icon)
+    if 'clipboard_backend' in changes:
+        clipboard_backend = create_clipboard_backend(config['clipboard_backend'])
+    if 'history_hotkeys' in changes:
+        register_history_hotkeys()
+    if 'clipboard_history_size' in changes or 'clipboard_history_max_bytes' in changes:
+        clipboard_history.resize(config['clipboard_history_size'], config['clipboard_history_max_bytes'])
+    if 'clipboard_monitor_enabled' in changes:
+        if config['clipboard_monitor_enabled']:
+            clipboard_monitor.start()
+        else:
+            clipboard_monitor.stop()
+    if 'profiles' in changes:
+        if config['profiles']:
+            active_window_monitor.start()
+        else:
+            active_window_monitor.stop()
+    if changes.keys() & {'trace_enabled', 'trace_file', 'trace_max_bytes', 'log_backup_count'}:
+        setup_tracing(config)
+    if changes.keys() & {'metrics_http_port', 'metrics_textfile', 'metrics_interval'}:
+        metrics_exporter.stop()
+        metrics_exporter.start()
+    if changes.keys() & {'icon_theme', 'icon_size'}:
+        tray_icon_images.clear()
+        prepare_tray_icons()
+        if tray_icon:
+            tray_icon.icon = tray_icon_images[tray_icon_state or 'idle']
+        if ui_root is not None:
+            run_on_ui(set_window_icons)
+
+config_watcher = ConfigWatcher(config_file, reload_config)
+
+# Funktion zum Leeren des Tastenplan-Caches (z.B. nach sensiblen Inhalten)
+def clear_keystroke_cache(icon=None, item=None):
+    keystroke_plan_cache.clear()
+    with layout_tables_lock:
+        layout_tables.clear()
+    show_popup("Tastencache geleert")
+    logger.info("Tastenplan-Cache geleert")
+
+# Funktion zum Vergessen des zuletzt getippten Textes (z.B. nach einem Passwort): entfernt
+# nur dessen Tastenpläne, alle anderen Einträge im Cache bleiben erhalten
+def forget_last_typed(icon=None, item=None):
+    global current_job
+    job = current_job
+    if job is None or job.text is None or job.active:
+        show_popup("Kein abgeschlossener Text zum Vergessen")
+        return
+    keystroke_plan_cache.evict(job.text)
+    # Ohne Referenz kann der Auftrag auch nicht mehr fortgesetzt werden
+    current_job = None
+    show_popup("Letzter Text vergessen")
+    logger.info("Tastenpläne des zuletzt getippten Textes entfernt")
 
 # Funktion zum Neustarten des Programms
 def restart_program():
     python = sys.executable
     script = os.path.abspath(sys.argv[0])
     starter = os.path.join(os.path.dirname(script), "starter.py")
-    subprocess.Popen([python, starter, script])
+    subprocess.Popen([python, starter, script, str(os.getpid())])
     sys.exit(0)
 
+# Funktion zum Registrieren der globalen Hotkeys
+def register_hotkeys():
+    keyboard.add_hotkey('esc', cancel_typing)
+    keyboard.add_hotkey(hotkey, toggle_typing)
+    keyboard.add_hotkey(toggle_enter_hotkey, toggle_enter)
+    register_pause_hotkey()
+    register_history_hotkeys()
+    logger.info("Alle Hotkeys erfolgreich initialisiert")
+
+# Hotkey zum Pausieren/Fortsetzen (über Handle, damit er einzeln neu gebunden werden kann)
+pause_hotkey_handle = None
+
+def register_pause_hotkey():
+    global pause_hotkey_handle
+    if pause_hotkey_handle is not None:
+        try:
+            keyboard.remove_hotkey(pause_hotkey_handle)
+        except (KeyError, ValueError):
+            pass
+        pause_hotkey_handle = None
+    combination = config.get('pause_hotkey')
+    if combination:
+        pause_hotkey_handle = keyboard.add_hotkey(combination, toggle_pause)
+
+# Hotkeys für ältere Verlaufseinträge (der n-te Hotkey tippt den n-letzten Eintrag)
+history_hotkey_handles = []
+
+def register_history_hotkeys():
+    unregister_history_hotkeys()
+    for index, combination in enumerate(config.get('history_hotkeys', []), start=1):
+        history_hotkey_handles.append(keyboard.add_hotkey(combination, type_history_entry, args=(index,)))
+
+def unregister_history_hotkeys():
+    for handle in history_hotkey_handles:
+        try:
+            keyboard.remove_hotkey(handle)
+        except (KeyError, ValueError):
+            pass
+    history_hotkey_handles.clear()
+
+# Funktion zum Starten von Hotkeys, UI-Thread und Konfigurationsüberwachung
+def start_services():
+    register_hotkeys()
+    startup_profiler.mark("hotkeys")
+    
+    # Externe Änderungen an config.json live übernehmen
+    if config.get('config_hot_reload', True):
+        config_watcher.start()
+    
+    # Zwischenablage im Hintergrund vorab lesen
+    if config.get('clipboard_monitor_enabled', False):
+        clipboard_monitor.start()
+    
+    # Aktives Fenster nur verfolgen, wenn Profile konfiguriert sind
+    if config.get('profiles'):
+        active_window_monitor.start()
+    
+    metrics_exporter.start()
+
+# Funktion zum Anhalten aller Dienste (laufender Tippvorgang wird abgebrochen)
+def stop_services():
+    global pause_hotkey_handle
+    cancel_typing()
+    typing_scheduler.stop()
+    keyboard.unhook_all()
+    pause_hotkey_handle = None
+    history_hotkey_handles.clear()
+    config_watcher.stop()
+    clipboard_monitor.stop()
+    active_window_monitor.stop()
+    metrics_exporter.stop()
+    stop_ui_thread()
+
+# Funktion für den Neustart im laufenden Prozess: baut Hotkeys, UI-Thread und
+# Konfiguration neu auf, ohne Python und die Bibliotheken neu zu laden
+def soft_restart():
+    global output_backend, clipboard_backend
+    logger.info("Soft-Neustart...")
+    stop_services()
+    config_store.flush()
+    config_store.load()
+    apply_config_globals()
+    setup_logging(config)
+    setup_tracing(config)
+    clipboard_history.resize(config.get('clipboard_history_size', 10),
+                             config.get('clipboard_history_max_bytes', 1024 * 1024))
+    output_backend.close()
+    output_backend = create_output_backend(config.get('output_backend', 'keyboard'))
+    clipboard_backend = create_clipboard_backend(config.get('clipboard_backend', 'auto'))
+    tray_icon_images.clear()
+    keystroke_plan_cache.clear()
+    keystroke_plan_cache.resize(config.get('plan_cache_max_entries', 64),
+                                config.get('plan_cache_max_bytes', 4 * 1024 * 1024))
+    start_services()
+
 # Funktion zum Neustarten über das Tray-Menü
 def on_restart(icon, item):
+    global restart_started
+    if config.get('soft_restart', True):
+        # Die Hauptschleife baut nach dem Stoppen des Tray-Icons alles neu auf
+        restart_started = time.perf_counter()
+        soft_restart_requested.set()
+        icon.stop()
+        return
     # Tray-Icon sauber stoppen, dann Neustart auslösen
     icon.stop()
     restart_program()
 
+# Funktion zum Erzeugen der Verlaufseinträge im Tray-Menü (wird bei jedem Öffnen aufgerufen)
+def history_menu_items():
+    items = []
+    for index, text in enumerate(clipboard_history.snapshot()):
+        label = text.replace('\n', ' ').replace('\r', '').strip()
+        label = label[:30] + ('...' if len(label) > 30 else '')
+        items.append(pystray.MenuItem(label, history_menu_action(index)))
+    if not items:
+        items.append(pystray.MenuItem("(leer)", None, enabled=False))
+    items.append(pystray.Menu.SEPARATOR)
+    items.append(pystray.MenuItem("Verlauf leeren", clear_clipboard_history))
+    return items
+
+# pystray erwartet Aktionen mit höchstens zwei Parametern
+def history_menu_action(index):
+    return lambda icon, item: type_history_entry(index, delay=0.5)
+
+# Funktion zum Leeren des Verlaufs (inkl. zwischengespeicherter Tastenpläne)
+def clear_clipboard_history(icon=None, item=None):
+    clipboard_history.clear()
+    keystroke_plan_cache.clear()
+    if tray_icon:
+        tray_icon.update_menu()
+    show_popup("Verlauf geleert")
+    logger.info("Zwischenablage-Verlauf geleert")
+
 # Funktion zum Aktualisieren des Tray-Menüs
 def update_menu(icon):
     icon.menu = pystray.Menu(
@@ -354,31 +3316,252 @@ def update_menu(icon):
         pystray.MenuItem("Enter nach Text: " + ("An" if press_enter else "Aus"), toggle_enter),
         pystray.MenuItem("Hotkeys ändern", change_hotkey),
         pystray.MenuItem("Tippgeschwindigkeit ändern", change_typing_speed),
+        pystray.MenuItem("Geschwindigkeit kalibrieren", pystray.Menu(
+            pystray.MenuItem("Mit Testfenster", lambda icon, item: start_calibration()),
+            pystray.MenuItem("Im Zielfeld (Start in 3 s)", lambda icon, item: start_calibration(target=True)))),
+        pystray.MenuItem("Tastencache leeren", clear_keystroke_cache),
+        pystray.MenuItem("Letzten Text vergessen", forget_last_typed,
+                         visible=lambda item: current_job is not None and current_job.text is not None),
+        pystray.MenuItem(lambda item: "Tippen fortsetzen" if current_job and current_job.resumable else "Tippen pausieren",
+                         toggle_pause, visible=lambda item: current_job is not None and (current_job.active or current_job.resumable)),
+        pystray.MenuItem("Tippen abbrechen", cancel_typing,
+                         visible=lambda item: current_job is not None and current_job.active),
+        pystray.MenuItem("Verlauf", pystray.Menu(history_menu_items),
+                         visible=lambda item: config.get('clipboard_monitor_enabled', False)),
         pystray.Menu.SEPARATOR,
         pystray.MenuItem("Neustarten", on_restart),
         pystray.MenuItem("Beenden", on_quit)
     )
 
+# Ein einziger UI-Thread besitzt das (versteckte) Tk-Hauptfenster; alle anderen
+# Threads schicken ihre Aufträge über diese Warteschlange, da Tk nicht threadsicher ist
+ui_queue = queue.Queue()
+ui_root = None
+ui_thread = None
+ui_windows = {}  # Wiederverwendbare Fenster (Popup, Vorschau, Warnung, Dialoge)
+ui_start_lock = threading.Lock()
+# Andere Threads rufen nie Tcl auf; der UI-Thread fragt die Warteschlange selbst ab,
+# nach Aufträgen kurz getaktet, im Leerlauf schrittweise seltener
+UI_POLL_INTERVAL = 15  # Millisekunden zwischen zwei Abfragen nach einem Auftrag
+UI_IDLE_POLL_INTERVAL = 100  # Längster Abstand im Leerlauf
+ui_poll_interval = UI_POLL_INTERVAL
+
+# Funktion zum Starten des UI-Threads (wartet, bis das Hauptfenster existiert)
+def start_ui_thread():
+    global ui_thread
+    with ui_start_lock:
+        if ui_thread is not None and ui_thread.is_alive():
+            return
+        ready = threading.Event()
+        ui_thread = threading.Thread(target=run_ui_loop, args=(ready,), name="TypeTool-UI", daemon=True)
+        ui_thread.start()
+        ready.wait(5)
+
+def run_ui_loop(ready):
+    global ui_root
+    try:
+        ui_root = tk.Tk()
+        ui_root.withdraw()
+    except Exception as e:
+        logger.error("Fehler beim Starten des UI-Threads: %s", e)
+        ready.set()
+        return
+    ready.set()
+    ui_root.after(0, poll_ui_queue)
+    # Erst nach dem ersten Popup, damit dessen Anzeige nicht auf ImageTk wartet
+    ui_root.after_idle(set_window_icons)
+    ui_root.mainloop()
+    ui_windows.clear()
+    overlay_animator.reset()
+    ui_root.destroy()
+    ui_root = None
+
+# Funktion zum Abarbeiten der Warteschlange im UI-Thread (Anzahl Aufträge, None beim Beenden)
+def process_ui_queue():
+    handled = 0
+    while True:
+        try:
+            func, args = ui_queue.get_nowait()
+        except queue.Empty:
+            break
+        if func is None:
+            ui_root.quit()
+            return None
+        handled += 1
+        try:
+            func(*args)
+        except Exception as e:
+            logger.error("Fehler im UI-Thread: %s", e)
+    return handled
+
+# Funktion zum regelmäßigen Abfragen der Warteschlange (Abstand verdoppelt sich im Leerlauf)
+def poll_ui_queue():
+    global ui_poll_interval
+    handled = process_ui_queue()
+    if handled is None:
+        return
+    if handled:
+        ui_poll_interval = UI_POLL_INTERVAL
+    else:
+        ui_poll_interval = min(ui_poll_interval * 2, UI_IDLE_POLL_INTERVAL)
+    ui_root.after(ui_poll_interval, poll_ui_queue)
+
+# Funktion zum Ausführen einer Funktion im UI-Thread (von jedem Thread aus)
+def run_on_ui(func, *args):
+    if ui_thread is None or not ui_thread.is_alive():
+        start_ui_thread()  # Erst hier wird tkinter geladen
+    ui_queue.put((func, args))
+
+# Funktion zum Ausführen im UI-Thread mit Rückgabewert (wartet höchstens timeout Sekunden)
+def call_on_ui(func, *args, timeout=1.0):
+    if threading.current_thread() is ui_thread:
+        return func(*args)
+    done = threading.Event()
+    result = {}
+
+    def call():
+        try:
+            result['value'] = func(*args)
+        except Exception as e:
+            result['error'] = e
+        finally:
+            done.set()
+
+    run_on_ui(call)
+    if ui_root is None:
+        raise RuntimeError("UI-Thread läuft nicht")
+    if not done.wait(timeout):
+        raise TimeoutError("UI-Thread antwortet nicht")
+    if 'error' in result:
+        raise result['error']
+    return result['value']
+
+# Funktion zum Beenden des UI-Threads
+def stop_ui_thread():
+    if ui_thread and ui_thread.is_alive() and threading.current_thread() is not ui_thread:
+        ui_queue.put((None, ()))
+        ui_thread.join(timeout=2)
+
+# Funktion zum Holen eines bestehenden Fensters in den Vordergrund (True, falls vorhanden)
+def focus_ui_window(name):
+    window = ui_windows.get(name)
+    if window is not None and window.winfo_exists():
+        window.deiconify()
+        window.lift()
+        window.focus_force()
+        return True
+    return False
+
+# Funktion zum Holen oder Erzeugen eines wiederverwendbaren, rahmenlosen Overlay-Fensters
+def get_overlay_window(name, build):
+    window = ui_windows.get(name)
+    if window is None or not window.winfo_exists():
+        window = tk.Toplevel(ui_root)
+        window.withdraw()
+        window.overrideredirect(True)
+        window.attributes("-topmost", True)
+        window.hide_job = None
+        build(window)
+        ui_windows[name] = window
+    return window
+
+# Animationen der Overlays laufen im UI-Thread über after(). Der Fortschritt hängt an der
+# verstrichenen Zeit, daher werden bei Last Frames übersprungen statt nachgeholt.
+class OverlayAnimator:
+    FRAME_INTERVAL = 16    # Millisekunden zwischen zwei Frames
+    FRAME_BUDGET = 0.004   # Maximale Rechenzeit pro Frame in Sekunden
+
+    def __init__(self):
+        self.skipped_frames = 0
+        self.reset()
+
+    def reset(self):
+        self.animations = {}  # Fenster -> (Startzeit, Dauer, Start-Alpha, Ziel-Alpha)
+        self.job = None
+        self.last_tick = None
+
+    def fade(self, window, alpha, duration):
+        self.animations[window] = (time.perf_counter(), duration, 0.0, alpha)
+        window.attributes("-alpha", 0.0)
+        if self.job is None:
+            self.last_tick = time.perf_counter()
+            self.job = ui_root.after(self.FRAME_INTERVAL, self.tick)
+
+    def cancel(self, window):
+        self.animations.pop(window, None)
+
+    def tick(self):
+        self.job = None
+        now = time.perf_counter()
+        late_frames = int((now - self.last_tick) * 1000 / self.FRAME_INTERVAL) - 1
+        if late_frames > 0:
+            self.skipped_frames += late_frames
+        self.last_tick = now
+        # Sobald getippt wird, alle Animationen sofort auf den Endzustand setzen
+        finish = typing_active.is_set()
+        for window, (start, duration, start_alpha, end_alpha) in list(self.animations.items()):
+            if not finish and time.perf_counter() - now > self.FRAME_BUDGET:
+                break  # Rest im nächsten Frame
+            if not window.winfo_exists():
+                del self.animations[window]
+                continue
+            progress = 1.0 if finish or duration <= 0 else min(1.0, (now - start) / duration)
+            window.attributes("-alpha", start_alpha + (end_alpha - start_alpha) * progress)
+            if progress >= 1.0:
+                del self.animations[window]
+        if self.animations:
+            self.job = ui_root.after(self.FRAME_INTERVAL, self.tick)
+
+overlay_animator = OverlayAnimator()
+
+# Funktion zum Festlegen der Einblenddauer beim Absenden des Auftrags (nicht erst im UI-Thread):
+# während getippt wird oder ohne Animationen erscheint das Overlay sofort
+def overlay_fade_duration(duration):
+    if typing_active.is_set() or not config.get('animations_enabled', True):
+        return 0.0
+    return duration
+
+# Funktion zum Einblenden eines Overlays, das nach einer Zeit automatisch verschwindet
+def show_overlay(window, duration_ms, alpha=1.0, fade_duration=0.0):
+    if window.hide_job:
+        window.after_cancel(window.hide_job)
+    window.deiconify()
+    window.lift()
+    window.hide_job = window.after(duration_ms, lambda: hide_overlay(window))
+    if fade_duration:
+        overlay_animator.fade(window, alpha, fade_duration)
+    else:
+        overlay_animator.cancel(window)
+        window.attributes("-alpha", alpha)
+
+def hide_overlay(window):
+    overlay_animator.cancel(window)
+    if window.hide_job:
+        window.after_cancel(window.hide_job)
+        window.hide_job = None
+    window.withdraw()
+
 # Funktion zum Anzeigen eines Popups
 def show_popup(message):
-    def create_popup():
-        try:
-            root = tk.Tk()
-            root.overrideredirect(1)
-            root.attributes("-topmost", True)
-            root.geometry(f"+{root.winfo_screenwidth()-200}+{root.winfo_screenheight()-100}")
-            label = tk.Label(root, text=message, bg="yellow", fg="black", font=("Helvetica", 12))
-            label.pack()
-            root.after(2000, root.destroy)
-            root.mainloop()
-        except Exception as e:
-            logger.error(f"Fehler beim Erstellen des Popups: {e}")
-    
-    threading.Thread(target=create_popup, daemon=True).start()
+    run_on_ui(show_popup_ui, message)
+
+def show_popup_ui(message):
+    def build(window):
+        window.label = tk.Label(window, bg="yellow", fg="black", font=("Helvetica", 12))
+        window.label.pack()
+
+    start = time.perf_counter()
+    window = get_overlay_window('popup', build)
+    window.label.config(text=message)
+    window.geometry(f"+{window.winfo_screenwidth()-200}+{window.winfo_screenheight()-100}")
+    show_overlay(window, 2000)
+    metrics.popup_creation.observe(time.perf_counter() - start, 'popup')
 
 # Funktion zum Anzeigen des Vorschau-Fensters
-def show_preview_window(text):
-    text_length = len(text)
+def show_preview_window(text, text_length=None):
+    # Bei langen Texten wird nur ein Präfix übergeben, die Länge kommt separat
+    if text_length is None:
+        text_length = len(text)
     
     # Bei 50+ Zeichen nur Warnung in der Mitte anzeigen
     if text_length >= 50:
@@ -386,187 +3569,358 @@ def show_preview_window(text):
         return
     
     # Normale Vorschau für weniger als 50 Zeichen
-    def create_preview():
-        try:
-            preview_root = tk.Tk()
-            preview_root.title("")  # Kein Titel
-            preview_root.overrideredirect(True)  # Kein Fensterrahmen
-            preview_root.attributes("-topmost", True)
-            preview_root.attributes("-alpha", 0.9)  # Leicht transparent
-            preview_root.configure(bg="#2c2c2c")  # Dunkler Hintergrund
-            
-            # Dynamische Fenstergröße basierend auf Textlänge
-            if text_length <= 30:
-                width, height = 250, 70
-            elif text_length <= 40:
-                width, height = 300, 85
-            else:
-                width, height = 350, 100
-            
-            preview_root.geometry(f"{width}x{height}+20+20")  # Oben links
-            
-            # Text-Vorschau
-            text_frame = tk.Frame(preview_root, bg="#2c2c2c")
-            text_frame.pack(fill="both", expand=True, padx=8, pady=4)
-            
-            preview_label = tk.Label(text_frame, 
-                                   text=text,
-                                   bg="#2c2c2c", fg="#ffffff", font=("Consolas", 11),
-                                   wraplength=width-20, justify="left", anchor="nw")
-            preview_label.pack(fill="both", expand=True)
-            
-            # Zeichenanzahl (unauffällig)
-            count_label = tk.Label(text_frame, 
-                                 text=f"{text_length} Zeichen",
-                                 bg="#2c2c2c", fg="#888888", font=("Segoe UI", 8))
-            count_label.pack(anchor="se")
-            
-            # Automatisch schließen nach 4.5 Sekunden
-            preview_root.after(4500, preview_root.destroy)
-            
-            # Schließen bei Klick
-            preview_root.bind('<Button-1>', lambda e: preview_root.destroy())
-            preview_root.bind('<FocusOut>', lambda e: preview_root.destroy())
-            
-            # Sanfte Animation (Fade-in)
-            preview_root.attributes("-alpha", 0.0)
-            preview_root.update()
-            
-            def fade_in():
-                for i in range(10):
-                    alpha = i * 0.1
-                    preview_root.attributes("-alpha", alpha)
-                    preview_root.update()
-                    time.sleep(0.02)
-            
-            threading.Thread(target=fade_in, daemon=True).start()
-            
-            preview_root.mainloop()
-        except Exception as e:
-            logger.error(f"Fehler beim Erstellen des Vorschau-Fensters: {e}")
+    run_on_ui(show_preview_ui, text, overlay_fade_duration(0.2))
+
+def show_preview_ui(text, fade_duration=0.2):
+    def build(window):
+        window.configure(bg="#2c2c2c")  # Dunkler Hintergrund
+        
+        # Text-Vorschau
+        text_frame = tk.Frame(window, bg="#2c2c2c")
+        text_frame.pack(fill="both", expand=True, padx=8, pady=4)
+        
+        window.preview_label = tk.Label(text_frame,
+                                        bg="#2c2c2c", fg="#ffffff", font=("Consolas", 11),
+                                        justify="left", anchor="nw")
+        window.preview_label.pack(fill="both", expand=True)
+        
+        # Zeichenanzahl (unauffällig)
+        window.count_label = tk.Label(text_frame,
+                                      bg="#2c2c2c", fg="#888888", font=("Segoe UI", 8))
+        window.count_label.pack(anchor="se")
+        
+        # Schließen bei Klick
+        window.bind('<Button-1>', lambda e: hide_overlay(window))
+        window.bind('<FocusOut>', lambda e: hide_overlay(window))
+
+    start = time.perf_counter()
+    text_length = len(text)
+    window = get_overlay_window('preview', build)
+    
+    # Dynamische Fenstergröße basierend auf Textlänge
+    if text_length <= 30:
+        width, height = 250, 70
+    elif text_length <= 40:
+        width, height = 300, 85
+    else:
+        width, height = 350, 100
     
-    threading.Thread(target=create_preview, daemon=True).start()
+    window.geometry(f"{width}x{height}+20+20")  # Oben links
+    window.preview_label.config(text=text, wraplength=width-20)
+    window.count_label.config(text=f"{text_length} Zeichen")
+    
+    # Automatisch schließen nach 4.5 Sekunden, leicht transparent mit Fade-in
+    show_overlay(window, 4500, alpha=0.9, fade_duration=fade_duration)
+    metrics.popup_creation.observe(time.perf_counter() - start, 'preview')
 
 # Funktion zum Anzeigen der Warnung bei 50+ Zeichen
 def show_warning_popup(text_length):
-    def create_warning():
-        try:
-            warning_root = tk.Tk()
-            warning_root.title("")
-            warning_root.overrideredirect(True)
-            warning_root.attributes("-topmost", True)
-            warning_root.attributes("-alpha", 0.95)
-            warning_root.configure(bg="#ff6b35")
-            
-            # Zentriere das Fenster
-            warning_width, warning_height = 400, 80
-            screen_width = warning_root.winfo_screenwidth()
-            screen_height = warning_root.winfo_screenheight()
-            x = (screen_width - warning_width) // 2
-            y = (screen_height - warning_height) // 2
-            warning_root.geometry(f"{warning_width}x{warning_height}+{x}+{y}")
-            
-            # Warnungstext
-            warning_label = tk.Label(warning_root, 
-                                   text=f"⚠ {text_length} Zeichen werden getippt!\nESC zum Abbrechen",
-                                   bg="#ff6b35", fg="white", font=("Segoe UI", 12, "bold"),
-                                   justify="center")
-            warning_label.pack(expand=True)
-            
-            # ESC zum Abbrechen
-            def on_escape(event):
-                if event.keysym == 'Escape':
-                    stop_typing_event.set()
-                    warning_root.destroy()
-                    show_popup("Tippvorgang abgebrochen!")
-            
-            warning_root.bind('<KeyPress>', on_escape)
-            warning_root.focus_set()
-            
-            # Automatisch schließen nach 3 Sekunden
-            warning_root.after(3000, warning_root.destroy)
-            
-            # Schließen bei Klick
-            warning_root.bind('<Button-1>', lambda e: warning_root.destroy())
-            
-            # Sanfte Animation
-            warning_root.attributes("-alpha", 0.0)
-            warning_root.update()
-            
-            def fade_in():
-                for i in range(15):
-                    alpha = i * 0.067
-                    warning_root.attributes("-alpha", alpha)
-                    warning_root.update()
-                    time.sleep(0.02)
-            
-            threading.Thread(target=fade_in, daemon=True).start()
-            
-            warning_root.mainloop()
-        except Exception as e:
-            logger.error(f"Fehler beim Erstellen der Warnung: {e}")
+    run_on_ui(show_warning_ui, text_length, overlay_fade_duration(0.3))
+
+def show_warning_ui(text_length, fade_duration=0.3):
+    def build(window):
+        window.configure(bg="#ff6b35")
+        
+        # Zentriere das Fenster
+        warning_width, warning_height = 400, 80
+        x = (window.winfo_screenwidth() - warning_width) // 2
+        y = (window.winfo_screenheight() - warning_height) // 2
+        window.geometry(f"{warning_width}x{warning_height}+{x}+{y}")
+        
+        # Warnungstext
+        window.warning_label = tk.Label(window,
+                                        bg="#ff6b35", fg="white", font=("Segoe UI", 12, "bold"),
+                                        justify="center")
+        window.warning_label.pack(expand=True)
+        
+        # ESC zum Abbrechen
+        def on_escape(event):
+            if event.keysym == 'Escape':
+                cancel_typing()
+                hide_overlay(window)
+                show_popup("Tippvorgang abgebrochen!")
+        
+        window.bind('<KeyPress>', on_escape)
+        
+        # Schließen bei Klick
+        window.bind('<Button-1>', lambda e: hide_overlay(window))
+
+    start = time.perf_counter()
+    window = get_overlay_window('warning', build)
+    window.warning_label.config(text=f"⚠ {text_length} Zeichen werden getippt!\nESC zum Abbrechen")
     
-    threading.Thread(target=create_warning, daemon=True).start()
+    # Automatisch schließen nach 3 Sekunden
+    show_overlay(window, 3000, alpha=0.95, fade_duration=fade_duration)
+    window.focus_set()
+    metrics.popup_creation.observe(time.perf_counter() - start, 'warning')
+
+# Funktion für den Tooltip des Tray-Icons
+def tray_title():
+    title = f"TypeTool - {hotkey} zum Tippen, {toggle_enter_hotkey} für Enter"
+    if typing_scheduler.depth:
+        title += f" ({typing_scheduler.depth} wartend)"
+    return title
+
+# Funktion zum Aktualisieren des Tray-Titels (zeigt die Länge der Warteschlange)
+def update_tray_title():
+    if tray_icon is None:
+        return
+    try:
+        tray_icon.title = tray_title()
+    except Exception as e:
+        logger.debug("Tray-Titel konnte nicht gesetzt werden: %s", e)
 
 # Funktion zum Einrichten des Tray-Icons
 def setup_tray():
-    global tray_icon
+    global tray_icon, tray_icon_state
     tray_icon = pystray.Icon("TypeTool")
     tray_icon.icon = create_image()
-    tray_icon.title = f"TypeTool - {hotkey} zum Tippen, {toggle_enter_hotkey} für Enter"
+    tray_icon_state = 'idle'
+    tray_icon.title = tray_title()
     update_menu(tray_icon)
-    tray_icon.run()
+    tray_icon.run(setup=on_tray_ready)
+
+# Wird aufgerufen, sobald das Tray-Icon bereit ist
+def on_tray_ready(icon):
+    global restart_started
+    icon.visible = True
+    startup_profiler.mark("tray")
+    startup_profiler.report()
+    
+    # UI-Thread (und damit tkinter) im Hintergrund vorwärmen, Hotkeys sind bereits aktiv
+    threading.Thread(target=start_ui_thread, daemon=True).start()
+    if restart_started is not None:
+        duration = (time.perf_counter() - restart_started) * 1000
+        restart_started = None
+        logger.info("Soft-Neustart abgeschlossen in %.0f ms", duration)
+        show_popup(f"Neu gestartet in {duration:.0f} ms")
 
 # Signal-Handler für sauberes Beenden
 def signal_handler(signum, frame):
-    logger.info(f"Signal {signum} empfangen, beende Programm...")
+    logger.info("Signal %s empfangen, beende Programm...", signum)
     cleanup_and_exit()
 
-# Einzelinstanz-Überprüfung
-def check_single_instance():
+# Einzelinstanz-Schutz: exklusive Sperre auf der Lock-Datei (flock bzw. msvcrt), die das
+# Betriebssystem beim Prozessende automatisch freigibt. Die Datei enthält PID, Port und
+# Token des IPC-Servers, damit weitere Aufrufe Befehle an die laufende Instanz senden können.
+lock_file = 'typetool.lock'
+LOCK_OFFSET = 1 << 20  # Gesperrtes Byte hinter dem Inhalt, damit andere die Datei lesen können
+instance_lock = None
+ipc_server = None
+
+def acquire_instance_lock():
+    global instance_lock
+    handle = os.fdopen(os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o600), 'r+b')
     try:
-        import psutil
-    except ImportError:
-        logger.warning("psutil nicht verfügbar, Einzelinstanz-Schutz deaktiviert")
-        return True
-    
-    lock_file = 'typetool.lock'
-    
+        if sys.platform == 'win32':
+            import msvcrt
+            handle.seek(LOCK_OFFSET)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    instance_lock = handle
+    return True
+
+def write_instance_info(port, token):
+    instance_lock.seek(0)
+    instance_lock.truncate()
+    instance_lock.write(json.dumps({'pid': os.getpid(), 'port': port, 'token': token}).encode('utf-8'))
+    instance_lock.flush()
+
+# Die Datei bleibt bestehen (Löschen wäre bei flock ein Wettlauf), nur der Inhalt wird geleert
+def release_instance_lock():
+    global instance_lock
+    if instance_lock is None:
+        return
     try:
-        # Prüfe ob Lock-Datei existiert
-        if os.path.exists(lock_file):
-            # Lese PID aus Lock-Datei
-            with open(lock_file, 'r') as f:
-                pid = int(f.read().strip())
-            
-            # Prüfe ob Prozess noch läuft
+        instance_lock.seek(0)
+        instance_lock.truncate()
+        instance_lock.close()
+        logger.info("Lock-Datei freigegeben")
+    except OSError as e:
+        logger.error("Fehler beim Freigeben der Lock-Datei: %s", e)
+    instance_lock = None
+
+# Funktion zum Lesen von PID, Port und Token der laufenden Instanz
+def read_instance_info(timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with open(lock_file, 'rb') as file:
+                return json.loads(file.read().decode('utf-8'))
+        except (OSError, ValueError):
+            # Die andere Instanz hat die Sperre, aber ihre Daten evtl. noch nicht geschrieben
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+# Funktion zum Senden eines Befehls an die laufende Instanz
+def send_ipc_command(command, args=None, timeout=5.0):
+    info = read_instance_info()
+    request = {'token': info['token'], 'command': command, 'args': args or {}}
+    with socket.create_connection(('127.0.0.1', info['port']), timeout=timeout) as connection:
+        connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with connection.makefile('rb') as reply:
+            return json.loads(reply.readline().decode('utf-8'))
+
+# Lokaler IPC-Server (nur 127.0.0.1), eine JSON-Zeile pro Anfrage und Antwort
+class IpcServer:
+    MAX_REQUEST = 16 * 1024 * 1024
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.token = secrets.token_hex(16)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve, name="TypeTool-IPC", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def serve(self):
+        while True:
             try:
-                process = psutil.Process(pid)
-                if process.is_running() and 'TypeTool' in ' '.join(process.cmdline()):
-                    logger.warning(f"TypeTool läuft bereits mit PID {pid}")
-                    show_popup("TypeTool läuft bereits! Nur eine Instanz erlaubt.")
-                    return False
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                # Prozess existiert nicht mehr, Lock-Datei ist veraltet
-                os.remove(lock_file)
-        
-        # Erstelle Lock-Datei mit aktueller PID
-        with open(lock_file, 'w') as f:
-            f.write(str(os.getpid()))
-        
-        logger.info(f"Lock-Datei erstellt: {lock_file}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Fehler bei Einzelinstanz-Überprüfung: {e}")
-        return True  # Bei Fehlern trotzdem starten
+                connection, _ = self.sock.accept()
+            except OSError:
+                return  # Socket wurde geschlossen
+            with connection:
+                self.handle(connection)
+
+    def handle(self, connection):
+        try:
+            connection.settimeout(5)
+            with connection.makefile('rb') as stream:
+                request = json.loads(stream.readline(self.MAX_REQUEST).decode('utf-8'))
+            if not isinstance(request, dict) or not isinstance(request.get('args') or {}, dict):
+                reply = {'ok': False, 'message': "Ungültige Anfrage: Objekt mit args-Objekt erwartet"}
+            elif not secrets.compare_digest(str(request.get('token', '')), self.token):
+                reply = {'ok': False, 'message': "Ungültiges Token"}
+            else:
+                reply = self.handler(request.get('command'), request.get('args') or {})
+        except (OSError, ValueError) as e:
+            reply = {'ok': False, 'message': f"Ungültige Anfrage: {e}"}
+        except Exception as e:
+            # Ein fehlerhafter Befehl darf den IPC-Thread nicht beenden
+            logger.exception("Fehler beim Ausführen eines IPC-Befehls")
+            reply = {'ok': False, 'message': f"Interner Fehler: {e}"}
+        try:
+            connection.sendall(json.dumps(reply).encode('utf-8') + b'\n')
+        except OSError:
+            pass
+
+# Funktion zum Ausführen eines Befehls, der von einem weiteren Aufruf weitergeleitet wurde
+def handle_ipc_command(command, args):
+    logger.info("IPC-Befehl empfangen: %s", command)
+    if command == 'ping':
+        show_popup("TypeTool läuft bereits! Nur eine Instanz erlaubt.")
+        return {'ok': True, 'message': "TypeTool läuft bereits"}
+    if command == 'type':
+        # Optionale Wartezeit, damit das Zielfenster fokussiert werden kann
+        delay = args.get('delay', 0)
+        if isinstance(delay, bool) or not isinstance(delay, (int, float)) or not 0 <= delay <= 3600:
+            return {'ok': False, 'message': "Ungültige Wartezeit (Sekunden zwischen 0 und 3600 erwartet)"}
+        if not isinstance(args.get('file', ''), str) or not isinstance(args.get('text', ''), str):
+            return {'ok': False, 'message': "Datei und Text müssen Zeichenketten sein"}
+        if 'file' in args:
+            # Dateien werden gestreamt und nie komplett geladen
+            try:
+                accepted = start_typing_file(args['file'], delay)
+            except (OSError, ValueError) as e:
+                return {'ok': False, 'message': f"Datei konnte nicht gelesen werden: {e}"}
+            description = args['file']
+        else:
+            text = args.get('text', '')
+            if not text:
+                return {'ok': False, 'message': "Kein Text zum Tippen"}
+            accepted = start_typing(text, delay)
+            description = f"{len(text)} Zeichen"
+        if not accepted:
+            return {'ok': False, 'message': "Es läuft bereits ein Tippvorgang"}
+        return {'ok': True, 'message': f"{description} werden getippt (Warteschlange: {typing_scheduler.depth})"}
+    if command == 'status':
+        return {'ok': True, 'message': json.dumps(typing_scheduler.stats()), 'stats': typing_scheduler.stats()}
+    if command == 'reload':
+        reload_config()
+        return {'ok': True, 'message': "Konfiguration neu geladen"}
+    if command == 'quit':
+        # Hauptschleife beenden; das Aufräumen übernimmt atexit im Hauptthread
+        if tray_icon:
+            tray_icon.stop()
+        return {'ok': True, 'message': "TypeTool wird beendet"}
+    return {'ok': False, 'message': f"Unbekannter Befehl: {command}"}
+
+# Einzelinstanz-Überprüfung (startet bei Erfolg den IPC-Server)
+def check_single_instance():
+    global ipc_server
+    if not acquire_instance_lock():
+        return False
+    try:
+        ipc_server = IpcServer(handle_ipc_command)
+        ipc_server.start()
+        write_instance_info(ipc_server.port, ipc_server.token)
+        logger.info("Lock-Datei erstellt: %s (IPC-Port %s)", lock_file, ipc_server.port)
+    except OSError as e:
+        # Ohne IPC läuft TypeTool trotzdem, nur Weiterleiten ist nicht möglich
+        logger.error("IPC-Server konnte nicht gestartet werden: %s", e)
+    return True
+
+# Funktion zum Auswerten der Kommandozeile (Befehle an die laufende Instanz)
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="TypeTool")
+    parser.add_argument('--type-file', metavar='PFAD', help="Datei von der laufenden Instanz tippen lassen")
+    parser.add_argument('--delay', type=float, default=0.0, help="Wartezeit vor dem Tippen in Sekunden")
+    parser.add_argument('--reload-config', action='store_true', help="Konfiguration neu laden")
+    parser.add_argument('--quit', action='store_true', help="Laufende Instanz beenden")
+    parser.add_argument('--status', action='store_true', help="Zustand der Tippwarteschlange anzeigen")
+    parser.add_argument('--profile-startup', action='store_true', help="Startzeit nach Phasen ausgeben")
+    return parser.parse_args()
+
+# Funktion zum Ermitteln des weiterzuleitenden Befehls (None = normaler Start)
+def ipc_command_from_arguments(arguments):
+    if arguments.quit:
+        return 'quit', {}
+    if arguments.reload_config:
+        return 'reload', {}
+    if arguments.status:
+        return 'status', {}
+    if arguments.type_file:
+        return 'type', {'file': os.path.abspath(arguments.type_file), 'delay': arguments.delay}
+    return None, {}
 
 # Hauptprogramm
 if __name__ == "__main__":
     try:
-        # Einzelinstanz-Überprüfung
+        startup_profiler.mark("module")
+        arguments = parse_arguments()
+        command, command_args = ipc_command_from_arguments(arguments)
+        
+        # Einzelinstanz-Überprüfung; läuft TypeTool schon, wird der Befehl weitergeleitet
         if not check_single_instance():
+            try:
+                reply = send_ipc_command(command or 'ping', command_args)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error("Laufende Instanz nicht erreichbar: %s", e)
+                sys.exit(1)
+            print(reply.get('message', ''))
+            sys.exit(0 if reply.get('ok') else 1)
+        if command:
+            print("TypeTool läuft nicht")
+            release_instance_lock()
             sys.exit(1)
+        startup_profiler.mark("instance lock")
         
         # Signal-Handler registrieren
         signal.signal(signal.SIGINT, signal_handler)
@@ -576,22 +3930,29 @@ if __name__ == "__main__":
         atexit.register(cleanup_and_exit)
         
         logger.info("TypeTool wird gestartet...")
-        logger.info(f"Konfiguration: Enter={press_enter}, Hotkey={hotkey}, Toggle={toggle_enter_hotkey}")
-        
-        # Hotkeys hinzufügen
-        keyboard.add_hotkey('esc', lambda: stop_typing_event.set())
-        keyboard.add_hotkey(hotkey, toggle_typing)
-        keyboard.add_hotkey(toggle_enter_hotkey, toggle_enter)
+        logger.info("Konfiguration: Enter=%s, Hotkey=%s, Toggle=%s", press_enter, hotkey, toggle_enter_hotkey)
         
-        logger.info("Alle Hotkeys erfolgreich initialisiert")
+        # Hotkeys, UI-Thread und Konfigurationsüberwachung starten
+        start_services()
         
-        # Tray-Icon einrichten
-        setup_tray()
+        # Tray-Icon einrichten; nach einem Soft-Neustart wird es neu aufgebaut
+        while True:
+            setup_tray()
+            if not soft_restart_requested.is_set():
+                break
+            soft_restart_requested.clear()
+            try:
+                soft_restart()
+            except Exception as e:
+                # Rückfall auf den vollständigen Neustart über starter.py
+                logger.error("Soft-Neustart fehlgeschlagen, starte Prozess neu: %s", e)
+                restart_program()
+        cleanup_and_exit()
         
     except KeyboardInterrupt:
         logger.info("Programm durch Benutzer beendet")
         cleanup_and_exit()
     except Exception as e:
-        logger.error(f"Unerwarteter Fehler: {e}")
+        logger.error("Unerwarteter Fehler: %s", e)
         show_popup(f"Unerwarteter Fehler: {e}")
         cleanup_and_exit()
\ No newline at end of file
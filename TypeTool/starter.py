@@ -3,6 +3,25 @@ import os
 import time
 import subprocess
 
+def wait_for_exit(pid, timeout=5.0):
+    """Wartet (begrenzt) darauf, dass der alte Prozess beendet ist"""
+    if sys.platform == 'win32':
+        import ctypes
+        SYNCHRONIZE = 0x00100000
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if handle:
+            kernel32.WaitForSingleObject(handle, int(timeout * 1000))
+            kernel32.CloseHandle(handle)
+        return
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return
+        time.sleep(0.02)
+
 if len(sys.argv) < 2:
     print("Usage: starter.py <script>")
     sys.exit(1)
@@ -10,5 +29,10 @@ if len(sys.argv) < 2:
 script = sys.argv[1]
 python = sys.executable
 
-time.sleep(0.7)  # Warten, bis der alte Prozess wirklich beendet ist
-subprocess.Popen([python, script])
\ No newline at end of file
+# Warten, bis der alte Prozess (unser Elternprozess) wirklich beendet ist
+start = time.perf_counter()
+parent_pid = os.getppid()
+if parent_pid > 1:
+    wait_for_exit(parent_pid)
+print(f"Alter Prozess nach {(time.perf_counter() - start) * 1000:.0f} ms beendet")
+subprocess.Popen([python, script])
@@ -0,0 +1,189 @@
+# Benchmark für TypeTool: misst Latenz, Durchsatz, Jitter und Abbruchzeit ohne Desktop
+import sys
+import os
+import time
+import json
+import argparse
+import platform
+import statistics
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import TypeTool
+
+# Textgrößen für die Durchsatzmessung (10 Zeichen bis 1 MB)
+THROUGHPUT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+
+# Ersatz für pyperclip, liefert einen festen Text
+class FakeClipboard:
+    PyperclipException = TypeTool.pyperclip.PyperclipException
+
+    def __init__(self, text=''):
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+    def copy(self, text):
+        self.text = text
+
+def make_text(size):
+    sample = "TypeTool Benchmark 0123456789 äöü ß\n"
+    return (sample * (size // len(sample) + 1))[:size]
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def wait_for_job():
+    TypeTool.typing_scheduler.wait_idle()
+
+def wait_for_first_key(backend, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while len(backend) == 0:
+        if time.perf_counter() > deadline:
+            raise RuntimeError("Kein Tastendruck innerhalb des Zeitlimits")
+        time.sleep(0)
+    return backend.timestamps[0]
+
+# Zeit vom Hotkey (toggle_typing) bis zum ersten gesendeten Tastendruck
+def bench_hotkey_latency(backend, clipboard, repeat):
+    clipboard.text = make_text(20)
+    latencies = []
+    for _ in range(repeat):
+        backend.reset()
+        start = time.perf_counter()
+        TypeTool.toggle_typing()
+        latencies.append(wait_for_first_key(backend) - start)
+        wait_for_job()
+    return {
+        'repeat': repeat,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies) * 1000,
+    }
+
+# Dauerhafter Durchsatz ohne künstliche Verzögerung
+def bench_throughput(backend, max_size):
+    TypeTool.typing_delay = 0.0
+    results = []
+    for size in THROUGHPUT_SIZES:
+        if size > max_size:
+            break
+        text = make_text(size)
+        backend.reset()
+        TypeTool.type_text(text)
+        stats = dict(TypeTool.last_typing_stats)
+        if backend.text() != text:
+            raise RuntimeError(f"Ausgabe weicht vom Text ab (Größe {size})")
+        results.append({
+            'size': size,
+            'duration_s': stats['duration'],
+            'chars_per_sec': stats['chars_per_sec'],
+        })
+    return results
+
+# Abweichung der Abstände zwischen Tastendrücken vom eingestellten typing_delay
+def bench_jitter(backend, typing_delay, chars):
+    TypeTool.typing_delay = typing_delay
+    TypeTool.config['typing_batch_size'] = 1
+    backend.reset()
+    TypeTool.type_text(make_text(chars))
+    timestamps = backend.timestamps
+    intervals = [b - a for a, b in zip(timestamps, timestamps[1:])]
+    deviations = [abs(interval - typing_delay) for interval in intervals]
+    return {
+        'typing_delay_s': typing_delay,
+        'chars': chars,
+        'mean_interval_ms': statistics.mean(intervals) * 1000,
+        'stdev_interval_ms': statistics.pstdev(intervals) * 1000,
+        'p50_deviation_ms': percentile(deviations, 0.5) * 1000,
+        'p99_deviation_ms': percentile(deviations, 0.99) * 1000,
+        'max_deviation_ms': max(deviations) * 1000,
+        'achieved_chars_per_sec': TypeTool.last_typing_stats['chars_per_sec'],
+    }
+
+# Zeit von stop_typing_event.set() bis zum letzten gesendeten Tastendruck
+def bench_cancel_latency(backend, clipboard, repeat):
+    TypeTool.typing_delay = 0.001
+    clipboard.text = make_text(100000)
+    latencies = []
+    for _ in range(repeat):
+        backend.reset()
+        TypeTool.toggle_typing()
+        wait_for_first_key(backend)
+        time.sleep(0.05)
+        stop_time = time.perf_counter()
+        TypeTool.stop_typing_event.set()
+        wait_for_job()
+        latencies.append(max(0.0, backend.timestamps[-1] - stop_time))
+    return {
+        'repeat': repeat,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'max_ms': max(latencies) * 1000,
+    }
+
+# Latenz eines paste()-Aufrufs je Zwischenablage-Backend (echte Zwischenablage)
+def bench_clipboard(repeat):
+    results = {}
+    for name, backend_class in TypeTool.clipboard_backends.items():
+        try:
+            backend = backend_class()
+            backend.paste()  # Aufwärmen (z.B. UI-Thread starten)
+            if not getattr(backend, 'available', True):
+                raise RuntimeError("Backend nicht verfügbar")
+            latencies = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                backend.paste()
+                latencies.append(time.perf_counter() - start)
+            results[name] = {
+                'mean_ms': statistics.mean(latencies) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+            }
+        except Exception as e:
+            results[name] = {'error': str(e)}
+    return results
+
+def run(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    clipboard_latency = bench_clipboard(args.repeat)
+    backend = TypeTool.RecordingBackend()
+    clipboard = FakeClipboard()
+    TypeTool.output_backend = backend
+    TypeTool.pyperclip = clipboard
+    TypeTool.clipboard_backend = TypeTool.PyperclipClipboard()
+    TypeTool.press_enter = False
+    TypeTool.config['show_preview_window'] = False
+    batch_size = TypeTool.config.get('typing_batch_size', 8)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'typing_batch_size': batch_size,
+        'clipboard_latency': clipboard_latency,
+        'hotkey_latency': bench_hotkey_latency(backend, clipboard, args.repeat),
+        'throughput': bench_throughput(backend, args.max_size),
+        'jitter': bench_jitter(backend, args.jitter_delay, args.jitter_chars),
+    }
+    TypeTool.config['typing_batch_size'] = batch_size
+    results['cancel_latency'] = bench_cancel_latency(backend, clipboard, args.repeat)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TypeTool Benchmark")
+    parser.add_argument('--output', default='benchmark.json', help="Pfad für die JSON-Ergebnisse")
+    parser.add_argument('--repeat', type=int, default=20, help="Wiederholungen für Latenzmessungen")
+    parser.add_argument('--max-size', type=int, default=THROUGHPUT_SIZES[-1], help="Größte Textgröße für den Durchsatz")
+    parser.add_argument('--jitter-delay', type=float, default=0.002, help="typing_delay für die Jitter-Messung")
+    parser.add_argument('--jitter-chars', type=int, default=500, help="Zeichenanzahl für die Jitter-Messung")
+    args = parser.parse_args()
+
+    results = run(args)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print(json.dumps(results, indent=2))
@@ -1,46 +1,82 @@
 import sys
-import os
 import time
+import json
+import socket
 import subprocess
 import psutil
-import signal
-
-def find_and_kill_old_processes():
-    """Findet und beendet alte TypeTool-Prozesse"""
-    current_pid = os.getpid()
-    killed_count = 0
-    
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+
+LOCK_FILE = 'typetool.lock'
+SHUTDOWN_TIMEOUT = 5.0  # Sekunden, die der alten Instanz zum Beenden bleiben
+
+def read_instance_info():
+    """Liest PID, IPC-Port und Token der laufenden Instanz aus der Lock-Datei"""
+    try:
+        with open(LOCK_FILE, 'rb') as file:
+            return json.loads(file.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+def request_shutdown(info):
+    """Bittet die alte Instanz per IPC, sich zu beenden"""
+    request = {'token': info['token'], 'command': 'quit', 'args': {}}
+    try:
+        with socket.create_connection(('127.0.0.1', info['port']), timeout=2) as connection:
+            connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with connection.makefile('rb') as reply:
+                reply.readline()
+        return True
+    except (OSError, KeyError):
+        # Die Instanz beendet sich evtl. gerade selbst (Neustart über das Tray-Menü)
+        return False
+
+def stop_old_instance(old_pid=None):
+    """Beendet die alte TypeTool-Instanz aus der Lock-Datei und wartet auf ihr Ende"""
+    info = read_instance_info()
+    if not info or 'pid' not in info or (old_pid and info['pid'] != old_pid):
+        # Beim Neustart hat die alte Instanz die Lock-Datei evtl. schon geleert
+        if not old_pid:
+            return
+        info = {'pid': old_pid}
+    try:
+        proc = psutil.Process(info['pid'])
+        # Nur die eigene TypeTool-Instanz anfassen, nie fremde Prozesse
+        if not any('TypeTool' in arg for arg in proc.cmdline()):
+            return
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return
+
+    start = time.perf_counter()
+    if 'token' in info:
+        request_shutdown(info)
+    try:
+        proc.wait(timeout=SHUTDOWN_TIMEOUT)
+    except psutil.TimeoutExpired:
+        print(f"Alte Instanz reagiert nicht, beende PID {proc.pid}")
+        proc.terminate()
         try:
-            # Prüfe ob es ein Python-Prozess mit TypeTool ist
-            if proc.info['name'] and 'python' in proc.info['name'].lower():
-                cmdline = proc.info['cmdline']
-                if cmdline and any('TypeTool' in arg for arg in cmdline):
-                    if proc.info['pid'] != current_pid:
-                        print(f"Beende alten TypeTool-Prozess: PID {proc.info['pid']}")
-                        proc.terminate()
-                        killed_count += 1
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
-    
-    if killed_count > 0:
-        time.sleep(1)  # Warten bis Prozesse beendet sind
-        print(f"{killed_count} alte Prozesse beendet")
+            proc.wait(timeout=SHUTDOWN_TIMEOUT)
+        except psutil.TimeoutExpired:
+            proc.kill()
+    except psutil.NoSuchProcess:
+        pass
+    print(f"Alte Instanz (PID {proc.pid}) nach {(time.perf_counter() - start) * 1000:.0f} ms beendet")
 
 if len(sys.argv) < 2:
-    print("Usage: starter.py <script>")
+    print("Usage: starter.py <script> [alte PID]")
     sys.exit(1)
 
 script = sys.argv[1]
+old_pid = int(sys.argv[2]) if len(sys.argv) > 2 else None
 python = sys.executable
 
-# Beende alte Prozesse
-find_and_kill_old_processes()
+# Beende die alte Instanz
+handover_start = time.perf_counter()
+stop_old_instance(old_pid)
 
 # Starte neuen Prozess
 try:
     subprocess.Popen([python, script])
-    print("TypeTool gestartet")
+    print(f"TypeTool gestartet (Übergabe in {(time.perf_counter() - handover_start) * 1000:.0f} ms)")
 except Exception as e:
     print(f"Fehler beim Starten: {e}")
-    sys.exit(1)
\ No newline at end of file
+    sys.exit(1)
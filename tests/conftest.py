@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# TypeTool liegt als einzelnes Skript im Wurzelverzeichnis
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Beim Import legt TypeTool Konfiguration, Log und Icon-Cache im Arbeitsverzeichnis an
+os.chdir(tempfile.mkdtemp(prefix='typetool-tests-'))
+
+import TypeTool  # noqa: E402
+
+
+# Einstellungen für Aufträge ohne Vorschaufenster, Enter und Verzögerung
+@pytest.fixture
+def job_settings():
+    return {
+        'profile': None,
+        'typing_delay': 0.0,
+        'typing_batch_size': 8,
+        'batch_delay': None,
+        'enter_key_enabled': False,
+        'show_preview_window': False,
+    }
+
+
+# Aufzeichnendes Backend statt echter Tastendrücke
+@pytest.fixture
+def recording_backend(monkeypatch):
+    backend = TypeTool.RecordingBackend()
+    monkeypatch.setattr(TypeTool, 'output_backend', backend)
+    return backend
+
+
+# Eigener Scheduler pro Test, damit Warteschlange und Zähler nicht durchsickern
+@pytest.fixture
+def scheduler():
+    scheduler = TypeTool.TypingScheduler()
+    yield scheduler
+    scheduler.stop()
@@ -0,0 +1,30 @@
+import TypeTool
+
+
+def test_recording_backend_records_ranges_and_named_keys():
+    backend = TypeTool.RecordingBackend()
+    plan = backend.compile('hallo', 'recording:default')
+    backend.send(plan, 0, 2)
+    backend.send(plan, 2, 5)
+    backend.press_key('enter')
+    backend.press_key('tab')
+    assert backend.text() == 'hallo\n<tab>'
+    assert len(backend) == len(backend.timestamps) == 7
+    assert list(backend.timestamps) == sorted(backend.timestamps)
+    backend.reset()
+    assert backend.text() == ''
+
+
+def test_job_runs_through_configured_backend(recording_backend, job_settings):
+    job_settings['enter_key_enabled'] = True
+    job = TypeTool.TypingJob(text='über €')
+    job.settings = job_settings
+    TypeTool.run_typing_job(job)
+    assert job.state == TypeTool.JOB_DONE
+    assert recording_backend.text() == 'über €\n'
+    assert TypeTool.last_typing_stats['chars'] == 6
+
+
+def test_unknown_backend_falls_back_to_keyboard():
+    assert isinstance(TypeTool.create_output_backend('gibt-es-nicht'), TypeTool.KeyboardBackend)
+    assert isinstance(TypeTool.create_output_backend('recording'), TypeTool.RecordingBackend)
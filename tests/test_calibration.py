@@ -0,0 +1,68 @@
+import pytest
+
+import TypeTool
+
+
+# Backend, das die Größe jedes gesendeten Blocks festhält
+class BlockRecorder(TypeTool.RecordingBackend):
+    def __init__(self):
+        super().__init__()
+        self.blocks = []
+
+    def send(self, plan, start, stop):
+        self.blocks.append(stop - start)
+        super().send(plan, start, stop)
+
+
+# Zielfeld, das alles Getippte fehlerfrei annimmt
+class PerfectField:
+    name = 'zielfeld'
+    applies_result = True
+
+    def __init__(self, backend, profile):
+        self.backend = backend
+        self.profile = profile
+
+    def open(self):
+        pass
+
+    def clear(self):
+        self.backend.reset()
+
+    def read(self):
+        return self.backend.text()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def calibration_env(monkeypatch):
+    backend = BlockRecorder()
+    monkeypatch.setattr(TypeTool, 'output_backend', backend)
+    monkeypatch.setattr(TypeTool, 'keystroke_plan_cache', TypeTool.KeystrokePlanCache(4, 1 << 20))
+    monkeypatch.setattr(TypeTool, 'show_popup', lambda message: None)
+    monkeypatch.setattr(TypeTool.config_store, 'save', lambda: None)
+    monkeypatch.setattr(TypeTool, 'typing_delay', TypeTool.typing_delay)
+    for key, value in {'calibration_probe_length': 20, 'calibration_trials': 1, 'calibration_steps': 1,
+                       'calibration_min_delay': 0.001, 'calibration_max_delay': 0.002,
+                       'calibration_margin': 0.0, 'typing_batch_size': 8, 'batch_delay': None}.items():
+        monkeypatch.setitem(TypeTool.config, key, value)
+    TypeTool.stop_typing_event.clear()
+    return backend
+
+
+def test_trials_use_the_profiles_block_pacing(calibration_env):
+    profile = {'name': 'Remote', 'typing_batch_size': 4, 'batch_delay': 0.01}
+    TypeTool.run_calibration(PerfectField(calibration_env, profile))
+    assert set(calibration_env.blocks) == {4}
+    # Gespeichert wird die Pause pro Block, die das Profil tatsächlich verwendet
+    assert profile['batch_delay'] == pytest.approx(0.001 * 4)
+    assert 'typing_delay' not in profile
+
+
+def test_trials_pace_each_key_without_batch_delay(calibration_env):
+    profile = {'name': 'Editor', 'typing_batch_size': 4}
+    TypeTool.run_calibration(PerfectField(calibration_env, profile))
+    assert set(calibration_env.blocks) == {1}
+    assert profile['typing_delay'] == pytest.approx(0.001)
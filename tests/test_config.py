@@ -0,0 +1,157 @@
+import json
+import time
+
+import pytest
+
+import TypeTool
+
+
+def write_config(path, data):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+
+
+def test_save_is_debounced(tmp_path, monkeypatch):
+    monkeypatch.setattr(TypeTool.ConfigStore, 'DEBOUNCE', 0.05)
+    path = tmp_path / 'config.json'
+    write_config(path, {'hotkey': 'ctrl+b'})
+    store = TypeTool.ConfigStore(str(path))
+    store.data['hotkey'] = 'ctrl+y'
+    store.save()
+    store.save()
+    # Erst nach dem Debounce-Fenster auf der Platte
+    assert TypeTool.read_config_file(str(path))['hotkey'] == 'ctrl+b'
+    deadline = time.perf_counter() + 5
+    while TypeTool.read_config_file(str(path))['hotkey'] != 'ctrl+y':
+        assert time.perf_counter() < deadline
+        time.sleep(0.01)
+    assert not store.dirty
+
+
+def test_flush_writes_atomically(tmp_path):
+    path = tmp_path / 'config.json'
+    write_config(path, {'hotkey': 'ctrl+b'})
+    store = TypeTool.ConfigStore(str(path))
+    store.data['hotkey'] = 'ctrl+y'
+    store.save()
+    store.flush()
+    assert TypeTool.read_config_file(str(path))['hotkey'] == 'ctrl+y'
+    assert store.disk_data['hotkey'] == 'ctrl+y'
+    assert [entry.name for entry in tmp_path.iterdir()] == ['config.json']
+    # Ohne ausstehende Änderung schreibt flush nichts
+    write_config(path, {'hotkey': 'extern'})
+    store.flush()
+    assert TypeTool.read_config_file(str(path))['hotkey'] == 'extern'
+
+
+def test_reload_returns_only_keys_changed_on_disk(tmp_path):
+    path = tmp_path / 'config.json'
+    write_config(path, {'hotkey': 'ctrl+b', 'typing_delay': 0.01})
+    store = TypeTool.ConfigStore(str(path))
+    store.data['typing_delay'] = 0.01
+    store.disk_data = dict(TypeTool.read_config_file(str(path)))
+
+    write_config(path, {'hotkey': 'ctrl+q', 'typing_delay': 0.01})
+    assert store.reload() == {'hotkey': 'ctrl+q'}
+    assert store.data['hotkey'] == 'ctrl+q'
+    # Unverändert gelesen ergibt keinen Unterschied
+    assert store.reload() == {}
+
+
+def test_reload_keeps_unsaved_changes(tmp_path):
+    path = tmp_path / 'config.json'
+    write_config(path, {'hotkey': 'ctrl+b'})
+    store = TypeTool.ConfigStore(str(path))
+    store.disk_data = dict(TypeTool.read_config_file(str(path)))
+    store.data['enter_key_enabled'] = True  # noch nicht gespeichert
+
+    write_config(path, {'hotkey': 'ctrl+q'})
+    store.reload()
+    assert store.data['enter_key_enabled'] is True
+
+
+def test_own_writes_are_not_reported_as_changes(tmp_path):
+    path = tmp_path / 'config.json'
+    write_config(path, {'hotkey': 'ctrl+b'})
+    store = TypeTool.ConfigStore(str(path))
+    store.data['hotkey'] = 'ctrl+y'
+    store.save()
+    store.flush()
+    assert TypeTool.read_config_file(str(path))['hotkey'] == 'ctrl+y'
+    assert store.reload() == {}
+
+
+# Zeichnet Hotkey-Aufrufe auf, statt sie beim Betriebssystem zu registrieren
+class HotkeyRecorder:
+    def __init__(self):
+        self.calls = []
+
+    def add(self, combination, callback, *args, **kwargs):
+        self.calls.append(('add', combination))
+        return combination
+
+    def remove(self, combination):
+        self.calls.append(('remove', combination))
+
+
+@pytest.fixture
+def live_store(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    write_config(path, {'hotkey': 'ctrl+b', 'toggle_enter_hotkey': 'ctrl+alt+b'})
+    store = TypeTool.ConfigStore(str(path))
+    store.data.clear()
+    store.data.update(TypeTool.read_config_file(str(path)))
+    store.disk_data = dict(store.data)
+    monkeypatch.setattr(TypeTool, 'config_store', store)
+    monkeypatch.setattr(TypeTool, 'config', store.data)
+    monkeypatch.setattr(TypeTool, 'hotkey', 'ctrl+b')
+    monkeypatch.setattr(TypeTool, 'toggle_enter_hotkey', 'ctrl+alt+b')
+    monkeypatch.setattr(TypeTool, 'typing_delay', TypeTool.typing_delay)
+    monkeypatch.setattr(TypeTool, 'tray_icon', None)
+    monkeypatch.setattr(TypeTool, 'show_popup', lambda message: None)
+    recorder = HotkeyRecorder()
+    monkeypatch.setattr(TypeTool.keyboard, 'add_hotkey', recorder.add)
+    monkeypatch.setattr(TypeTool.keyboard, 'remove_hotkey', recorder.remove)
+    monkeypatch.setattr(TypeTool.keyboard, 'parse_hotkey', parse_hotkey)
+    return path, store, recorder
+
+
+# Wie keyboard.parse_hotkey: unbekannte Tastennamen sind ein ValueError
+def parse_hotkey(combination):
+    known = {'ctrl', 'alt', 'shift', 'b', 'p', 'q', '1', '2'}
+    for part in combination.split('+'):
+        if part not in known:
+            raise ValueError(f"Key {part!r} is not mapped to any known key.")
+    return combination
+
+
+def test_reload_binds_new_hotkey_before_removing_old(live_store):
+    path, store, recorder = live_store
+    write_config(path, {'hotkey': 'ctrl+q', 'toggle_enter_hotkey': 'ctrl+alt+b'})
+    TypeTool.reload_config()
+    assert recorder.calls == [('add', 'ctrl+q'), ('remove', 'ctrl+b')]
+    assert TypeTool.hotkey == 'ctrl+q'
+
+
+def test_reload_keeps_all_bindings_when_one_hotkey_is_invalid(live_store):
+    path, store, recorder = live_store
+    write_config(path, {'hotkey': 'ctrl+q', 'toggle_enter_hotkey': 'ctrl+alt+b',
+                        'history_hotkeys': ['ctrl+alt+1', 'ctrl+gibtsnicht'], 'typing_delay': 0.05})
+    TypeTool.reload_config()
+    assert recorder.calls == []
+    assert TypeTool.hotkey == 'ctrl+b'
+    assert store.data['hotkey'] == 'ctrl+b'
+    assert store.data['history_hotkeys'] == []
+    # Andere Änderungen werden trotzdem übernommen
+    assert TypeTool.typing_delay == 0.05
+
+
+def test_reload_applies_log_and_hot_reload_settings(live_store, monkeypatch, tmp_path):
+    path, store, recorder = live_store
+    calls = []
+    monkeypatch.setattr(TypeTool, 'setup_logging', lambda config: calls.append(('logging', config['log_file'])))
+    monkeypatch.setattr(TypeTool.config_watcher, 'stop', lambda: calls.append(('watcher', 'stop')))
+    write_config(path, {'hotkey': 'ctrl+b', 'toggle_enter_hotkey': 'ctrl+alt+b',
+                        'log_file': str(tmp_path / 'neu.log'), 'config_hot_reload': False})
+    TypeTool.reload_config()
+    assert calls == [('logging', str(tmp_path / 'neu.log')), ('watcher', 'stop')]
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import TypeTool
+
+
+def test_history_keeps_newest_entries():
+    history = TypeTool.ClipboardHistory(max_entries=3, max_bytes=1024)
+    for text in ('a', 'b', 'c', 'd'):
+        assert history.add(text)
+    assert history.snapshot() == ['d', 'c', 'b']
+    assert history.get(0) == 'd'
+    assert history.get(3) is None
+
+
+def test_history_skips_repeated_entry():
+    history = TypeTool.ClipboardHistory(max_entries=3, max_bytes=1024)
+    assert history.add('gleich')
+    assert not history.add('gleich')
+    assert history.snapshot() == ['gleich']
+
+
+def test_history_byte_cap_counts_utf8():
+    history = TypeTool.ClipboardHistory(max_entries=10, max_bytes=10)
+    assert not history.add('x' * 11)  # größer als der gesamte Verlauf
+    assert history.add('ääää')  # 8 Bytes
+    assert history.add('öö')  # 4 Bytes, verdrängt den älteren Eintrag
+    assert history.snapshot() == ['öö']
+    assert history.total_bytes == 4
+
+
+def test_history_clear():
+    history = TypeTool.ClipboardHistory(max_entries=3, max_bytes=1024)
+    history.add('a')
+    history.clear()
+    assert history.snapshot() == []
+    assert history.total_bytes == 0
+
+
+# Zwischenablage, die jeden Lesezugriff zählt
+class CountingClipboard:
+    def __init__(self, text):
+        self.text = text
+        self.reads = 0
+
+    def paste(self):
+        self.reads += 1
+        if isinstance(self.text, Exception):
+            raise self.text
+        return self.text
+
+
+# Änderungssignal wie XFixes, aber von Hand ausgelöst
+class FakeSelectionWatcher:
+    def __init__(self, available=True):
+        self.available = available
+        self.sequence = None
+        self.changed = threading.Event()
+
+    def open(self):
+        if not self.available:
+            raise OSError("kein X-Server")
+        self.sequence = 0
+
+    def wait(self, timeout):
+        if not self.changed.wait(timeout):
+            return False
+        self.changed.clear()
+        self.sequence += 1
+        return True
+
+    def close(self):
+        self.sequence = None
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.01)
+
+
+def test_monitor_reads_only_after_change_signal(monkeypatch):
+    clipboard = CountingClipboard('erster')
+    watcher = FakeSelectionWatcher()
+    monkeypatch.setattr(TypeTool, 'clipboard_backend', clipboard)
+    monkeypatch.setattr(TypeTool, 'x11_selection_watcher', watcher)
+    monkeypatch.setitem(TypeTool.config, 'clipboard_poll_interval', 0.01)
+    monitor = TypeTool.ClipboardMonitor(TypeTool.ClipboardHistory(max_entries=3, max_bytes=1024))
+    monitor.start()
+    try:
+        wait_until(lambda: monitor.current() == 'erster')
+        time.sleep(0.1)
+        assert clipboard.reads == 1
+
+        clipboard.text = 'zweiter'
+        watcher.changed.set()
+        wait_until(lambda: monitor.current() == 'zweiter')
+        assert clipboard.reads == 2
+        assert monitor.history.snapshot() == ['zweiter', 'erster']
+    finally:
+        monitor.stop()
+    assert watcher.sequence is None
+
+
+def test_monitor_does_not_run_without_change_signal(monkeypatch):
+    clipboard = CountingClipboard('text')
+    monkeypatch.setattr(TypeTool, 'clipboard_backend', clipboard)
+    monkeypatch.setattr(TypeTool, 'x11_selection_watcher', FakeSelectionWatcher(available=False))
+    monitor = TypeTool.ClipboardMonitor(TypeTool.ClipboardHistory(max_entries=3, max_bytes=1024))
+    monitor.start()
+    monitor.thread.join(timeout=5)
+    assert not monitor.running
+    assert monitor.current() is None
+    assert clipboard.reads == 0
+
+
+def test_monitor_poll_survives_backend_errors(monkeypatch):
+    monkeypatch.setattr(TypeTool, 'clipboard_backend', CountingClipboard(RuntimeError("kaputt")))
+    monitor = TypeTool.ClipboardMonitor(TypeTool.ClipboardHistory(max_entries=3, max_bytes=1024))
+    monitor.poll()
+    assert monitor.latest is None
@@ -0,0 +1,78 @@
+import json
+import socket
+
+import pytest
+
+import TypeTool
+
+
+@pytest.fixture
+def ipc_server(monkeypatch, scheduler, recording_backend):
+    monkeypatch.setattr(TypeTool, 'typing_scheduler', scheduler)
+    monkeypatch.setattr(TypeTool, 'typing_delay', 0.0)
+    monkeypatch.setattr(TypeTool, 'press_enter', False)
+    monkeypatch.setitem(TypeTool.config, 'show_preview_window', False)
+    monkeypatch.setitem(TypeTool.config, 'profiles', [])
+    server = TypeTool.IpcServer(TypeTool.handle_ipc_command)
+    server.start()
+    yield server
+    server.stop()
+
+
+# Sendet eine rohe Anfrage und liest die Antwortzeile
+def exchange(server, payload):
+    with socket.create_connection(('127.0.0.1', server.port), timeout=5) as connection:
+        connection.sendall(payload)
+        with connection.makefile('rb') as reply:
+            return json.loads(reply.readline().decode('utf-8'))
+
+
+def request(server, command, args=None, token=None):
+    message = {'token': server.token if token is None else token, 'command': command, 'args': args or {}}
+    return exchange(server, json.dumps(message).encode('utf-8') + b'\n')
+
+
+def test_type_command_is_typed_by_the_running_instance(ipc_server, scheduler, recording_backend):
+    reply = request(ipc_server, 'type', {'text': 'über IPC'})
+    assert reply['ok']
+    assert scheduler.wait_idle(timeout=10)
+    assert recording_backend.text() == 'über IPC'
+    assert request(ipc_server, 'status')['stats']['completed'] == 1
+
+
+def test_wrong_token_is_rejected(ipc_server, recording_backend):
+    reply = request(ipc_server, 'type', {'text': 'nein'}, token='falsch')
+    assert reply == {'ok': False, 'message': "Ungültiges Token"}
+    assert recording_backend.text() == ''
+
+
+@pytest.mark.parametrize('payload', [
+    b'kein json\n',
+    b'[1, 2]\n',
+    b'{"token": "x", "args": [1]}\n',
+    b'\xff\xfe\n',
+])
+def test_malformed_requests_keep_the_server_alive(ipc_server, payload):
+    assert not exchange(ipc_server, payload)['ok']
+    assert request(ipc_server, 'unbekannt') == {'ok': False, 'message': "Unbekannter Befehl: unbekannt"}
+
+
+@pytest.mark.parametrize('args', [{'text': 'x', 'delay': -1}, {'text': 'x', 'delay': True}, {'text': 5}, {}])
+def test_invalid_type_arguments_are_rejected(ipc_server, args):
+    assert not request(ipc_server, 'type', args)['ok']
+
+
+def test_failing_handler_does_not_end_the_server():
+    def handler(command, args):
+        if command == 'kaputt':
+            raise RuntimeError("Absturz")
+        return {'ok': True, 'message': command}
+
+    server = TypeTool.IpcServer(handler)
+    server.start()
+    try:
+        reply = request(server, 'kaputt')
+        assert not reply['ok'] and 'Absturz' in reply['message']
+        assert request(server, 'weiter') == {'ok': True, 'message': 'weiter'}
+    finally:
+        server.stop()
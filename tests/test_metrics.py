@@ -0,0 +1,40 @@
+import TypeTool
+
+
+def sample(text, name):
+    for line in text.splitlines():
+        if line.startswith(name + ' '):
+            return float(line.split()[-1])
+    return None
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = TypeTool.MetricHistogram('test_seconds', "Test", (0.1, 1.0), ('state',))
+    histogram.observe(0.05, 'done')
+    histogram.observe(0.5, 'done')
+    histogram.observe(5.0, 'done')
+    lines = []
+    histogram.render(lines)
+    assert lines == [
+        'test_seconds_bucket{state="done",le="0.1"} 1',
+        'test_seconds_bucket{state="done",le="1.0"} 2',
+        'test_seconds_bucket{state="done",le="+Inf"} 3',
+        'test_seconds_sum{state="done"} 5.55',
+        'test_seconds_count{state="done"} 3',
+    ]
+
+
+def test_typed_job_is_counted(monkeypatch, scheduler, recording_backend, job_settings):
+    metrics = TypeTool.Metrics()
+    monkeypatch.setattr(TypeTool, 'metrics', metrics)
+    job = TypeTool.TypingJob(text='metrik')
+    job.settings = job_settings
+    assert scheduler.submit(job)
+    assert scheduler.wait_idle(timeout=10)
+    assert recording_backend.text() == 'metrik'
+
+    rendered = metrics.render()
+    assert sample(rendered, 'typetool_jobs_total{state="done"}') == 1
+    assert sample(rendered, 'typetool_typed_chars_total') == 6
+    assert sample(rendered, 'typetool_job_duration_seconds_count{state="done"}') == 1
+    assert '# TYPE typetool_queue_depth gauge' in rendered
@@ -0,0 +1,32 @@
+import TypeTool
+
+
+def type_job(scheduler, settings, text):
+    job = TypeTool.TypingJob(text=text)
+    job.settings = settings
+    assert scheduler.submit(job)
+    assert scheduler.wait_idle(timeout=10)
+    return job
+
+
+def gaps(backend):
+    timestamps = backend.timestamps
+    return [b - a for a, b in zip(timestamps, timestamps[1:])]
+
+
+def test_typing_delay_paces_every_keystroke(scheduler, recording_backend, job_settings):
+    job_settings['typing_delay'] = 0.004
+    type_job(scheduler, job_settings, 'x' * 40)
+    assert recording_backend.text() == 'x' * 40
+    # Ohne batch_delay keine Blöcke ohne Abstand, auch bei typing_batch_size 8 (nur einzelne
+    # Nachzügler, wenn der Pacer einen verspäteten Tastendruck aufholt)
+    bursts = [gap for gap in gaps(recording_backend) if gap < 0.001]
+    assert len(bursts) < 15
+
+
+def test_batch_delay_sends_blocks(scheduler, recording_backend, job_settings):
+    job_settings['batch_delay'] = 0.004
+    type_job(scheduler, job_settings, 'x' * 40)
+    assert recording_backend.text() == 'x' * 40
+    bursts = [gap for gap in gaps(recording_backend) if gap < 0.001]
+    assert len(bursts) >= 30
@@ -0,0 +1,53 @@
+import TypeTool
+
+
+def test_cache_hits_and_evicts_least_recently_used():
+    cache = TypeTool.KeystrokePlanCache(max_entries=2, max_bytes=1 << 20)
+    compile_plan = TypeTool.compile_unicode_plan
+    first = cache.get('eins', 'x', compile_plan)
+    assert cache.get('eins', 'x', compile_plan) is first
+    cache.get('zwei', 'x', compile_plan)
+    cache.get('eins', 'x', compile_plan)  # 'eins' ist jetzt der jüngste Eintrag
+    cache.get('drei', 'x', compile_plan)
+    keys = {key[0] for key in cache.entries}
+    assert keys == {cache.text_hash('eins'), cache.text_hash('drei')}
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_cache_respects_byte_limit_and_resize():
+    plan_bytes = TypeTool.compile_unicode_plan('a' * 10, 'x').nbytes
+    cache = TypeTool.KeystrokePlanCache(max_entries=10, max_bytes=plan_bytes * 2)
+    for text in ('a' * 10, 'b' * 10, 'c' * 10):
+        cache.get(text, 'x', TypeTool.compile_unicode_plan)
+    assert len(cache.entries) == 2
+    assert cache.total_bytes == plan_bytes * 2
+    # Zu große Pläne werden kompiliert, aber nicht gespeichert
+    cache.get('d' * 100, 'x', TypeTool.compile_unicode_plan)
+    assert len(cache.entries) == 2
+    cache.resize(1, plan_bytes * 2)
+    assert len(cache.entries) == 1
+    assert cache.total_bytes == plan_bytes
+
+
+def test_evict_removes_every_layout_of_a_text():
+    cache = TypeTool.KeystrokePlanCache(max_entries=10, max_bytes=1 << 20)
+    for layout in ('keyboard:00000407', 'keyboard:00000409'):
+        cache.get('geheim', layout, TypeTool.compile_unicode_plan)
+    cache.get('bleibt', 'keyboard:00000407', TypeTool.compile_unicode_plan)
+    cache.evict('geheim')
+    assert [key[0] for key in cache.entries] == [cache.text_hash('bleibt')]
+    assert cache.total_bytes == cache.entries[next(iter(cache.entries))].nbytes
+
+
+def test_forget_last_typed_evicts_only_its_plans(monkeypatch):
+    cache = TypeTool.KeystrokePlanCache(max_entries=10, max_bytes=1 << 20)
+    monkeypatch.setattr(TypeTool, 'keystroke_plan_cache', cache)
+    monkeypatch.setattr(TypeTool, 'show_popup', lambda *args, **kwargs: None)
+    job = TypeTool.TypingJob(text='passwort')
+    job.finish()
+    monkeypatch.setattr(TypeTool, 'current_job', job)
+    cache.get('passwort', 'x', TypeTool.compile_unicode_plan)
+    cache.get('anderes', 'x', TypeTool.compile_unicode_plan)
+    TypeTool.forget_last_typed()
+    assert [key[0] for key in cache.entries] == [cache.text_hash('anderes')]
+    assert TypeTool.current_job is None
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+
+import pytest
+
+import TypeTool
+
+PROFILES = [
+    {'name': 'TeamViewer', 'match': {'process': r'teamviewer'}, 'typing_delay': 0.02},
+    {'name': 'Browser-Konsole', 'match': {'class': r'^firefox$', 'title': r'konsole'}},
+    {'name': 'Ohne Kriterien', 'match': {}},
+]
+
+
+def test_match_by_process_ignores_case():
+    window = ('TV_CClientWindowClass', 'Remote', 'TeamViewer.exe')
+    assert TypeTool.match_profile(window, PROFILES)['name'] == 'TeamViewer'
+
+
+def test_all_criteria_must_match():
+    assert TypeTool.match_profile(('firefox', 'Web-Konsole', 'firefox'), PROFILES)['name'] == 'Browser-Konsole'
+    assert TypeTool.match_profile(('firefox', 'Startseite', 'firefox'), PROFILES) is None
+
+
+def test_no_window_or_invalid_pattern():
+    assert TypeTool.match_profile(None, PROFILES) is None
+    broken = [{'name': 'Kaputt', 'match': {'title': '('}}, PROFILES[0]]
+    assert TypeTool.match_profile(('x', 'y', 'teamviewer'), broken)['name'] == 'TeamViewer'
+
+
+# xprop-Ersatz: meldet ein fokussiertes Fenster und danach einen Titelwechsel; einfache
+# Abfragen werden mitgezählt
+FAKE_XPROP = """#!/bin/sh
+if [ "$1" = "-spy" ] && [ "$2" = "-root" ]; then
+  echo "_NET_ACTIVE_WINDOW(WINDOW): window id # 0x2a"
+  exec sleep 30
+fi
+if [ "$1" = "-spy" ]; then
+  echo '_NET_WM_NAME(UTF8_STRING) = "erster"'
+  sleep 0.2
+  echo '_NET_WM_NAME(UTF8_STRING) = "zweiter"'
+  exec sleep 30
+fi
+echo "$@" >> "$(dirname "$0")/queries"
+echo 'WM_CLASS(STRING) = "term", "Terminal"'
+echo '_NET_WM_NAME(UTF8_STRING) = "erster"'
+"""
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="nur X11")
+def test_x11_monitor_follows_title_changes_without_polling(tmp_path, monkeypatch):
+    xprop = tmp_path / 'xprop'
+    xprop.write_text(FAKE_XPROP)
+    xprop.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monitor = TypeTool.ActiveWindowMonitor()
+    monitor.start()
+    try:
+        deadline = time.perf_counter() + 5
+        while monitor.value != ('Terminal', 'zweiter', ''):
+            assert time.perf_counter() < deadline, monitor.value
+            time.sleep(0.01)
+    finally:
+        monitor.stop()
+    assert not monitor.running
+    # Eigenschaften werden nur beim Fensterwechsel gelesen, Titel kommen vom Spy
+    assert (tmp_path / 'queries').read_text().splitlines() == ['-id 0x2a WM_CLASS _NET_WM_NAME _NET_WM_PID']
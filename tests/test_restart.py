@@ -0,0 +1,51 @@
+import json
+import logging
+
+import pytest
+
+import TypeTool
+
+
+@pytest.fixture
+def restart_env(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    monkeypatch.setattr(TypeTool, 'config_file', str(path))
+    monkeypatch.setattr(TypeTool.config_store, 'path', str(path))
+    # Dienste (Hotkeys, UI-Thread, Exporter) sind nicht Teil dieses Tests
+    monkeypatch.setattr(TypeTool, 'stop_services', lambda: None)
+    monkeypatch.setattr(TypeTool, 'start_services', lambda: None)
+    monkeypatch.setattr(TypeTool, 'output_backend', TypeTool.RecordingBackend())
+    monkeypatch.setattr(TypeTool, 'clipboard_backend', TypeTool.clipboard_backend)
+    history = TypeTool.ClipboardHistory(10, 1024 * 1024)
+    monkeypatch.setattr(TypeTool, 'clipboard_history', history)
+    saved = dict(TypeTool.config)
+    yield path
+    TypeTool.config.clear()
+    TypeTool.config.update(saved)
+    TypeTool.setup_logging(TypeTool.config)
+    TypeTool.setup_tracing(TypeTool.config)
+
+
+def test_soft_restart_reapplies_logging_tracing_and_history(restart_env, tmp_path):
+    for text in ('a', 'b', 'c', 'd'):
+        TypeTool.clipboard_history.add(text)
+    with open(restart_env, 'w', encoding='utf-8') as file:
+        json.dump({
+            'output_backend': 'recording',
+            'log_file': str(tmp_path / 'neu.log'),
+            'logging_enabled': False,
+            'trace_enabled': True,
+            'trace_file': str(tmp_path / 'trace.jsonl'),
+            'trace_hash_key': '00' * 16,
+            'clipboard_history_size': 2,
+        }, file)
+
+    TypeTool.soft_restart()
+
+    assert TypeTool.clipboard_history.snapshot() == ['d', 'c']
+    files = [handler.baseFilename for handler in TypeTool.log_listener.handlers
+             if isinstance(handler, logging.FileHandler)]
+    assert files == [str(tmp_path / 'neu.log')]
+    assert logging.getLogger().level == logging.ERROR
+    assert TypeTool.trace_listener is not None
+    assert TypeTool.trace_listener.handlers[0].baseFilename == str(tmp_path / 'trace.jsonl')
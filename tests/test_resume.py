@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+import TypeTool
+
+TEXT = ''.join(chr(ord('a') + i % 26) for i in range(200))
+
+
+@pytest.fixture
+def plan_cache(monkeypatch):
+    cache = TypeTool.KeystrokePlanCache(16, 1 << 20)
+    monkeypatch.setattr(TypeTool, 'keystroke_plan_cache', cache)
+    return cache
+
+
+def wait_for_keys(backend, count, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while len(backend) < count:
+        assert time.perf_counter() < deadline
+        time.sleep(0.001)
+
+
+def test_paused_job_continues_at_its_offset(scheduler, recording_backend, job_settings):
+    job_settings['typing_delay'] = 0.002
+    job = TypeTool.TypingJob(text=TEXT)
+    job.settings = job_settings
+    assert scheduler.submit(job)
+    wait_for_keys(recording_backend, 20)
+    assert job.pause()
+    time.sleep(0.05)
+    typed = len(recording_backend)
+    time.sleep(0.05)
+    # Pausiert wird zwischen zwei Blöcken: danach kommt nichts mehr an
+    assert len(recording_backend) == typed == job.offset
+    assert job.resume()
+    assert scheduler.wait_idle(timeout=10)
+    assert job.state == TypeTool.JOB_DONE
+    assert recording_backend.text() == TEXT
+
+
+def test_restarted_job_reuses_the_full_text_plan(scheduler, recording_backend, job_settings, plan_cache):
+    job_settings['typing_delay'] = 0.002
+    job = TypeTool.TypingJob(text=TEXT)
+    job.settings = job_settings
+    assert scheduler.submit(job)
+    wait_for_keys(recording_backend, 20)
+    job.cancel()
+    assert scheduler.wait_idle(timeout=10)
+    offset = job.offset
+    assert 0 < offset < len(TEXT)
+    assert recording_backend.text() == TEXT[:offset]
+
+    assert job.restart()
+    assert scheduler.submit(job)
+    assert scheduler.wait_idle(timeout=10)
+    assert job.state == TypeTool.JOB_DONE
+    assert recording_backend.text() == TEXT
+    # Kein zweiter Cache-Eintrag für den Rest des Textes
+    assert len(plan_cache.entries) == 1
+    assert plan_cache.hits == 1
+
+
+def test_expired_job_is_not_resumable(monkeypatch):
+    job = TypeTool.TypingJob(text=TEXT)
+    job.offset = 10
+    job.cancel()
+    assert job.resumable
+    monkeypatch.setitem(TypeTool.config, 'resume_timeout', 0)
+    assert not job.resumable
+    assert not job.restart()
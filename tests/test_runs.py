@@ -0,0 +1,53 @@
+import pytest
+
+import TypeTool
+from TypeTool import ACTION_DEAD, ACTION_TAP, ACTION_UNICODE
+
+
+# Feste Belegung: Kleinbuchstaben als Taste, Großbuchstaben mit Umschalt, '^' als Tottaste
+def fake_resolve_char(char, hkl=None):
+    if char.islower() and char.isascii():
+        return ord(char), (), ACTION_TAP
+    if char.isupper() and char.isascii():
+        return ord(char.lower()), (42,), ACTION_TAP
+    if char == '^':
+        return 41, (), ACTION_DEAD
+    return ord(char), (), ACTION_UNICODE
+
+
+@pytest.fixture
+def fake_layout(monkeypatch):
+    monkeypatch.setattr(TypeTool, 'resolve_char', fake_resolve_char)
+    monkeypatch.setattr(TypeTool, 'layout_tables', {})
+
+
+def test_compile_groups_runs_by_action(fake_layout):
+    plan = TypeTool.compile_keystroke_plan('abC€€^d', 'keyboard:default')
+    assert len(plan) == 7
+    assert list(plan.run_starts) == [0, 3, 5, 6]
+    assert list(plan.run_actions) == [ACTION_TAP, ACTION_UNICODE, ACTION_DEAD, ACTION_TAP]
+    # Modifikatoren werden einmal pro Kombination abgelegt
+    assert plan.modifier_sets == ((), (42,))
+    assert plan.modifier_sets[plan.events[2 * 3 + 1]] == (42,)
+    assert plan.events[3 * 3] == ord('€')
+
+
+def test_iter_runs_splits_at_batch_boundaries(fake_layout):
+    plan = TypeTool.compile_keystroke_plan('abC€€^d', 'keyboard:default')
+    assert list(plan.iter_runs(2, 6)) == [(2, 3, ACTION_TAP), (3, 5, ACTION_UNICODE), (5, 6, ACTION_DEAD)]
+    assert list(plan.iter_runs(6, 7)) == [(6, 7, ACTION_TAP)]
+
+
+def test_unicode_plan_is_one_run():
+    plan = TypeTool.compile_unicode_plan('hallo', 'recording:default')
+    assert list(plan.iter_runs(0, len(plan))) == [(0, 5, ACTION_UNICODE)]
+    assert TypeTool.compile_unicode_plan('', 'recording:default').nbytes == 0
+
+
+def test_layout_handle_keeps_full_width(monkeypatch):
+    monkeypatch.setattr(TypeTool.sys, 'platform', 'win32')
+    # Handles mit gesetztem oberen Bit (z.B. IMEs) dürfen nicht abgeschnitten werden
+    assert TypeTool.layout_handle('keyboard:fffffffff0020409') == 0xFFFFFFFFF0020409
+    assert TypeTool.layout_handle('keyboard:4070407') == 0x4070407
+    assert TypeTool.layout_handle('keyboard:0') is None
+    assert TypeTool.layout_handle('keyboard:default') is None
@@ -0,0 +1,59 @@
+import TypeTool
+
+
+# Aufträge mit langer Verzögerung bleiben in der Warteschlange, bis der Test sie prüft
+def pending_job(text, settings):
+    job = TypeTool.TypingJob(text=text)
+    job.settings = dict(settings)
+    return job
+
+
+def test_queue_policy_keeps_order(monkeypatch, scheduler, job_settings):
+    monkeypatch.setitem(TypeTool.config, 'typing_policy', 'queue')
+    for text in ('eins', 'zwei', 'drei'):
+        assert scheduler.submit(pending_job(text, job_settings), delay=60)
+    assert [job.text for job in scheduler.pending] == ['eins', 'zwei', 'drei']
+    assert scheduler.busy
+
+
+def test_cancel_policy_rejects_while_busy(monkeypatch, scheduler, job_settings):
+    monkeypatch.setitem(TypeTool.config, 'typing_policy', 'cancel')
+    assert scheduler.submit(pending_job('eins', job_settings), delay=60)
+    assert not scheduler.submit(pending_job('zwei', job_settings), delay=60)
+    assert scheduler.depth == 1
+    assert scheduler.rejected == 1
+
+
+def test_replace_policy_drops_pending_jobs(monkeypatch, scheduler, job_settings):
+    monkeypatch.setitem(TypeTool.config, 'typing_policy', 'replace')
+    scheduler.submit(pending_job('eins', job_settings), delay=60)
+    scheduler.submit(pending_job('zwei', job_settings), delay=60)
+    assert [job.text for job in scheduler.pending] == ['zwei']
+
+
+def test_duplicates_are_coalesced(monkeypatch, scheduler, job_settings):
+    monkeypatch.setitem(TypeTool.config, 'typing_policy', 'queue')
+    monkeypatch.setitem(TypeTool.config, 'typing_coalesce', True)
+    assert scheduler.submit(pending_job('gleich', job_settings), delay=60)
+    assert not scheduler.submit(pending_job('gleich', job_settings), delay=60)
+    assert scheduler.coalesced == 1
+    monkeypatch.setitem(TypeTool.config, 'typing_coalesce', False)
+    assert scheduler.submit(pending_job('gleich', job_settings), delay=60)
+    assert scheduler.depth == 2
+
+
+def test_queue_size_limit(monkeypatch, scheduler, job_settings):
+    monkeypatch.setitem(TypeTool.config, 'typing_policy', 'queue')
+    monkeypatch.setitem(TypeTool.config, 'typing_queue_size', 2)
+    results = [scheduler.submit(pending_job(str(i), job_settings), delay=60) for i in range(3)]
+    assert results == [True, True, False]
+    assert scheduler.rejected == 1
+
+
+def test_jobs_are_typed_in_order(monkeypatch, scheduler, recording_backend, job_settings):
+    monkeypatch.setitem(TypeTool.config, 'typing_policy', 'queue')
+    for text in ('erster ', 'zweiter'):
+        assert scheduler.submit(pending_job(text, job_settings))
+    assert scheduler.wait_idle(timeout=10)
+    assert recording_backend.text() == 'erster zweiter'
+    assert scheduler.completed == 2
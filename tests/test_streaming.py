@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+import TypeTool
+
+TEXT = ''.join(chr(ord('a') + i % 26) for i in range(500)) + 'äöü€'
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setitem(TypeTool.config, 'stream_chunk_size', 16)
+    monkeypatch.setitem(TypeTool.config, 'stream_queue_size', 2)
+    monkeypatch.setitem(TypeTool.config, 'streaming_threshold', 100)
+    cache = TypeTool.KeystrokePlanCache(16, 1 << 20)
+    monkeypatch.setattr(TypeTool, 'keystroke_plan_cache', cache)
+    return cache
+
+
+def producers():
+    return [thread for thread in threading.enumerate() if thread.name == 'TypeTool-Producer']
+
+
+def test_text_chunks_start_at_offset():
+    assert list(TypeTool.iter_text_chunks('abcdefg', 3)) == ['abc', 'def', 'g']
+    assert list(TypeTool.iter_text_chunks('abcdefg', 3, offset=2)) == ['cde', 'fg']
+
+
+def test_file_chunks_count_characters_not_bytes(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_text('äöü€abc', encoding='utf-8')
+    assert TypeTool.count_file_chars(str(path), chunk_size=2) == 7
+    assert ''.join(TypeTool.iter_file_chunks(str(path), 2, offset=3)) == '€abc'
+    assert list(TypeTool.iter_file_chunks(str(path), 2, offset=10)) == []
+
+
+def test_file_job_is_streamed(tmp_path, small_chunks, scheduler, recording_backend, job_settings):
+    path = tmp_path / 'text.txt'
+    path.write_text(TEXT, encoding='utf-8')
+    job = TypeTool.TypingJob(path=str(path))
+    assert job.length == len(TEXT)
+    job.settings = job_settings
+    assert scheduler.submit(job)
+    assert scheduler.wait_idle(timeout=10)
+    assert recording_backend.text() == TEXT
+    # Gestreamte Pläne landen nie im Plan-Cache
+    assert not small_chunks.entries
+
+
+def test_cancelled_stream_stops_producer_and_resumes(small_chunks, scheduler, recording_backend, job_settings):
+    job_settings['typing_delay'] = 0.001
+    job = TypeTool.TypingJob(text=TEXT)
+    job.settings = job_settings
+    assert scheduler.submit(job)
+    deadline = time.perf_counter() + 5
+    while len(recording_backend) < 50:
+        assert time.perf_counter() < deadline
+        time.sleep(0.001)
+    job.cancel()
+    assert scheduler.wait_idle(timeout=10)
+    assert not producers()
+    assert recording_backend.text() == TEXT[:job.offset]
+
+    assert job.restart()
+    assert scheduler.submit(job)
+    assert scheduler.wait_idle(timeout=10)
+    assert recording_backend.text() == TEXT
+    assert not small_chunks.entries
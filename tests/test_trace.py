@@ -0,0 +1,70 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+
+import TypeTool
+
+HASH_KEY = '00112233445566778899aabbccddeeff'
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / 'trace.jsonl'
+    settings = {'trace_enabled': True, 'trace_file': str(path), 'trace_hash_key': HASH_KEY,
+                'trace_max_bytes': 1 << 20, 'log_backup_count': 1}
+    TypeTool.setup_tracing(settings)
+    yield path
+    TypeTool.stop_tracing()
+
+
+def read_traces(path):
+    # stop_tracing leert die Warteschlange des Schreibers
+    TypeTool.stop_tracing()
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_job_writes_one_jsonl_line_with_phases(trace_file, scheduler, recording_backend, job_settings):
+    job = TypeTool.TypingJob(text='geheimes Passwort')
+    job.settings = job_settings
+    assert scheduler.submit(job)
+    assert scheduler.wait_idle(timeout=10)
+
+    [trace] = read_traces(trace_file)
+    content = trace_file.read_text(encoding='utf-8')
+    assert trace['state'] == TypeTool.JOB_DONE
+    assert trace['source'] == 'text'
+    assert trace['length'] == len(job.text)
+    assert trace['backend'] == 'recording'
+    phases = [event['phase'] for event in trace['phases']]
+    assert phases == ['queued', 'started', 'first_key', TypeTool.JOB_DONE]
+    times = [event['t_ms'] for event in trace['phases']]
+    assert times == sorted(times)
+    # Nur ein Hash mit geheimem Schlüssel, nie der Inhalt selbst
+    expected = hmac.new(bytes.fromhex(HASH_KEY), job.text.encode('utf-8'), hashlib.sha256).hexdigest()
+    assert trace['content_hash'] == expected
+    assert 'Passwort' not in content
+
+
+def test_cancelled_job_records_offset(trace_file, scheduler, recording_backend, job_settings):
+    job = TypeTool.TypingJob(text='abc')
+    job.settings = job_settings
+    job.trace = TypeTool.start_trace()
+    job.trace_sampled = True
+    job.offset = 2
+    job.cancel()
+    TypeTool.finish_trace(job, backend='recording')
+    [trace] = read_traces(trace_file)
+    assert trace['state'] == TypeTool.JOB_CANCELLED
+    assert trace['phases'][-1] == {'phase': TypeTool.JOB_CANCELLED, 't_ms': trace['phases'][-1]['t_ms'], 'offset': 2}
+
+
+def test_sample_rate_zero_writes_nothing(trace_file, monkeypatch, scheduler, recording_backend, job_settings):
+    monkeypatch.setitem(TypeTool.config, 'trace_sample_rate', 0.0)
+    job = TypeTool.TypingJob(text='ohne Trace')
+    job.settings = job_settings
+    assert scheduler.submit(job)
+    assert scheduler.wait_idle(timeout=10)
+    assert job.trace is None
+    assert not trace_file.exists() or read_traces(trace_file) == []
@@ -0,0 +1,33 @@
+import time
+
+import TypeTool
+
+
+# Tray-Icon, dessen Menüaufbau so lange dauert wie unter Windows mit vielen Einträgen
+class SlowIcon:
+    def __init__(self):
+        self.icon = None
+        self.menu_updates = 0
+
+    def update_menu(self):
+        time.sleep(0.2)
+        self.menu_updates += 1
+
+
+def test_tray_state_switch_does_not_block_caller(monkeypatch):
+    icon = SlowIcon()
+    monkeypatch.setattr(TypeTool, 'tray_icon', icon)
+    monkeypatch.setattr(TypeTool, 'tray_icon_state', None)
+    monkeypatch.setattr(TypeTool, 'tray_icon_images', {'idle': 'I', 'typing': 'T', 'paused': 'P'})
+    start = time.perf_counter()
+    TypeTool.set_tray_state('typing')
+    TypeTool.set_tray_state('paused')
+    TypeTool.set_tray_state('typing')
+    assert time.perf_counter() - start < 0.1
+
+    deadline = time.perf_counter() + 5
+    while TypeTool.tray_icon_state != 'typing' or icon.icon != 'T':
+        assert time.perf_counter() < deadline
+        time.sleep(0.01)
+    # Schnelle Wechsel werden zusammengefasst statt einzeln nachgespielt
+    assert icon.menu_updates <= 2